@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 import math
+import numpy as np
 from typing import Dict, Tuple, Optional, List
 import pandas as pd
 from binance.client import Client
@@ -115,8 +116,10 @@ class ConfluenceEngine:
             tf_data = {tf: self.get_full_data(symbol, tf) for tf in config.analysis_timeframes}
             if not any(df is not None and not df.empty for df in tf_data.values()): return None
 
-            tf_scores = {tf: self._calculate_tactical_score(data)[0] for tf, data in tf_data.items() if data is not None}
-            tf_score_breakdowns = {tf: self._calculate_tactical_score(data)[1] for tf, data in tf_data.items() if data is not None}
+            # 타임프레임별 점수/내역은 한 번 계산해서 나눠 쓴다 (전략 analyze 중복 호출 방지)
+            tf_results = {tf: self._calculate_tactical_score(data) for tf, data in tf_data.items() if data is not None}
+            tf_scores = {tf: res[0] for tf, res in tf_results.items()}
+            tf_score_breakdowns = {tf: res[1] for tf, res in tf_results.items()}
             tf_rows = {tf: data.iloc[-1] for tf, data in tf_data.items() if data is not None}
 
             weights = dict(zip(config.analysis_timeframes, config.tf_vote_weights))
@@ -141,6 +144,13 @@ class ConfluenceEngine:
             all_scores.update(strategy.analyze(df))
         return sum(all_scores.values()), all_scores
 
+    def _calculate_tactical_score_vectorized(self, df: pd.DataFrame) -> np.ndarray:
+        """각 봉 시점의 _calculate_tactical_score(df.iloc[:i+1])[0] 값을 길이 N 배열로 한 번에 계산"""
+        scores = np.zeros(len(df), dtype=float)
+        for strategy in self.strategies:
+            scores += strategy.analyze_vectorized(df)
+        return scores
+
     def extract_atr(self, tf_rows: dict, primary_tf: str = "4h") -> float:
         row = tf_rows.get(primary_tf)
         if row is None or not hasattr(row, 'get'): return 0.0
@@ -8,6 +8,7 @@ from enum import Enum
 from dataclasses import dataclass
 from typing import Optional, Dict, Any, Tuple
 
+import numpy as np
 import pandas as pd
 import yfinance as yf
 
@@ -272,3 +273,57 @@ class MacroAnalyzer:
         if total <= -5:
             return MacroRegime.BEAR, total, scores
         return MacroRegime.SIDEWAYS, total, scores
+
+    # -------------------- 전 구간 일괄 진단(벡터화) --------------------
+    def diagnose_macro_regime_series(self, index, macro_data: dict) -> pd.Series:
+        """
+        diagnose_macro_regime_for_date를 index 전체에 한 번에 적용 (결과: 'BULL'/'BEAR'/'SIDEWAYS').
+        각 시점의 '그 날짜 이하 마지막 값'은 searchsorted로 정렬된 거시 인덱스에서 찾는다.
+        """
+        days = pd.DatetimeIndex(index)
+        if days.tz is not None:
+            days = days.tz_localize(None)
+        days = days.normalize()
+        total = np.zeros(len(days), dtype=float)
+
+        def last_le_pos(df_or_s):
+            # .loc[:day].iloc[-1] 의 위치 (없으면 -1)
+            return pd.DatetimeIndex(df_or_s.index).searchsorted(days, side="right") - 1
+
+        def cols_ok(df, cols):
+            return isinstance(df, pd.DataFrame) and len(df) > 0 and set(cols).issubset(set(df.columns))
+
+        nd = macro_data.get("nasdaq")
+        if cols_ok(nd, ("Close", "SMA_200")):
+            pos = last_le_pos(nd)
+            has = pos >= 0
+            close = nd["Close"].to_numpy(dtype=float)[pos]
+            sma = nd["SMA_200"].to_numpy(dtype=float)[pos]
+            total += np.where(has, np.where(close > sma, 5, -5), 0)
+
+        vx = macro_data.get("vix")
+        if cols_ok(vx, ("Close", "SMA_20")):
+            pos = last_le_pos(vx)
+            has = pos >= 0
+            close = vx["Close"].to_numpy(dtype=float)[pos]
+            sma = vx["SMA_20"].to_numpy(dtype=float)[pos]
+            total += np.where(has, np.select(
+                [close > 30, (close > 20) & (close > sma), close < 15], [-5, -3, 3], 0), 0)
+
+        hy = macro_data.get("hy_spread")
+        if isinstance(hy, pd.Series) and len(hy) >= 50:
+            pos = last_le_pos(hy)
+            has = pos >= 0
+            val = hy.to_numpy(dtype=float)[pos]
+            hy50 = hy.rolling(50).mean().to_numpy(dtype=float)[pos]
+            total += np.where(has, np.where(val > hy50, -5, 3), 0)
+
+        yc = macro_data.get("t10y2y")
+        if isinstance(yc, pd.Series) and len(yc) > 0:
+            pos = last_le_pos(yc)
+            has = pos >= 0
+            val = yc.to_numpy(dtype=float)[pos]
+            total += np.where(has, np.select([val < 0, val < 0.25], [-7, -3], 2), 0)
+
+        regimes = np.select([total >= 5, total <= -5], ["BULL", "BEAR"], "SIDEWAYS")
+        return pd.Series(regimes, index=index, name="Regime")
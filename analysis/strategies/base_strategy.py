@@ -1,6 +1,7 @@
 # analysis/strategies/base_strategy.py (수정)
 
 from abc import ABC, abstractmethod
+import numpy as np
 import pandas as pd
 
 class BaseStrategy(ABC):
@@ -22,3 +23,20 @@ class BaseStrategy(ABC):
         (예: 1.0 = 매수, -1.0 = 매도, 0 = 관망)
         """
         pass
+
+    def analyze_vectorized(self, data: pd.DataFrame) -> np.ndarray:
+        """
+        전체 프레임에 대해 각 봉 시점의 analyze() 점수 합계를 한 번에 계산합니다 (길이 N 배열).
+        기본 구현은 접두 구간마다 analyze()를 호출하므로, 전략별로 컬럼 연산 버전을 재정의하세요.
+        """
+        out = np.zeros(len(data), dtype=float)
+        for i in range(len(data)):
+            out[i] = sum(self.analyze(data.iloc[:i + 1]).values())
+        return out
+
+    @staticmethod
+    def _column(data: pd.DataFrame, name: str) -> pd.Series:
+        """컬럼이 없으면 전부 NaN인 Series (last.get(col) → None 과 같은 효과)"""
+        if name in data.columns:
+            return data[name]
+        return pd.Series(np.nan, index=data.index)
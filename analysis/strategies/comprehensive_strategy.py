@@ -1,5 +1,6 @@
 # analysis/strategies/comprehensive_strategy.py (추천 지표 5종 추가 최종본)
 
+import numpy as np
 import pandas as pd
 from .base_strategy import BaseStrategy
 
@@ -104,4 +105,78 @@ class ComprehensiveStrategy(BaseStrategy):
             if last[chop_col] < self.p.get("chop_trending_th", 40): scores["CHOP_Trend"] = self.p.get("score_chop_trending", 3)
             elif last[chop_col] > self.p.get("chop_sideways_th", 60): scores["CHOP_Trend"] = self.p.get("score_chop_sideways", -3)
 
-        return scores
\ No newline at end of file
+        return scores
+
+    def analyze_vectorized(self, data: pd.DataFrame) -> np.ndarray:
+        """analyze()와 같은 규칙을 컬럼 연산으로 전체 봉에 한 번에 적용 (prev = shift(1))"""
+        col = lambda name: self._column(data, name)
+        p = self.p
+        close = data["close"]
+        total = np.zeros(len(data), dtype=float)
+
+        def add(up, v_up, down=None, v_down=0):
+            nonlocal total
+            conds, vals = [up], [v_up]
+            if down is not None:
+                conds.append(down)
+                vals.append(v_down)
+            total = total + np.select(conds, vals, 0)
+
+        # 추세 확인
+        macd, macds = col("MACD_12_26_9"), col("MACDs_12_26_9")
+        ok = macd.notna() & macds.notna()
+        add(ok & (macd > macds), p.get("score_macd_cross_up", 2), ok & ~(macd > macds), p.get("score_macd_cross_down", -2))
+
+        adx = col("ADX_14")
+        add(adx > p.get("adx_threshold", 25), p.get("score_adx_strong", 3))
+
+        isa, isb = col("ISA_9"), col("ISB_26")
+        add((close > isa) & (close > isb), p.get("score_ichimoku_bull", 4),
+            (close < isa) & (close < isb), p.get("score_ichimoku_bear", -4))
+
+        psar_up, psar_down = col("PSARl_0.02_0.2").notna(), col("PSARs_0.02_0.2").notna()
+        add(psar_up, p.get("score_psar_bull", 3), ~psar_up & psar_down, p.get("score_psar_bear", -3))
+
+        vip, vim = col("VTXP_14"), col("VTXM_14")
+        ok = vip.notna() & vim.notna()
+        add(ok & (vip > vim), p.get("score_vortex_bull", 2), ok & ~(vip > vim), p.get("score_vortex_bear", -2))
+
+        trix, trixs = col("TRIX_30_9"), col("TRIXs_30_9")
+        add((trix > trixs) & (trix.shift(1) < trixs.shift(1)), p.get("score_trix_cross_up", 4),
+            (trix < trixs) & (trix.shift(1) > trixs.shift(1)), p.get("score_trix_cross_down", -4))
+
+        # 과매수/과매도 및 변동성
+        bbl, bbu, bbb = col("BBL_20_2.0"), col("BBU_20_2.0"), col("BBB_20_2.0")
+        ok = bbl.notna() & bbu.notna() & bbb.notna()
+        add(ok & (close > bbu), p.get("score_bb_breakout_up", 4), ok & (close < bbl), p.get("score_bb_breakout_down", -4))
+        add(ok & (bbb < bbb.rolling(90).quantile(0.1)), p.get("score_bb_squeeze", 3))
+
+        cci = col(f"CCI_{p.get('cci_length', 20)}_{p.get('cci_constant', 0.015)}")
+        add(cci > p.get("cci_overbought", 100), p.get("score_cci_overbought", -3),
+            cci < p.get("cci_oversold", -100), p.get("score_cci_oversold", 3))
+
+        stochrsi_d = col("STOCHRSId_14_14_3_3")
+        add(stochrsi_d < p.get("stochrsi_oversold", 20), p.get("score_stochrsi_oversold", 3),
+            stochrsi_d > p.get("stochrsi_overbought", 80), p.get("score_stochrsi_overbought", -3))
+
+        kcl, kcu = col("KCL_20_2"), col("KCU_20_2")
+        ok = kcl.notna() & kcu.notna()
+        add(ok & (close > kcu), p.get("score_kc_breakout_up", 4), ok & (close < kcl), p.get("score_kc_breakout_down", -4))
+
+        # 거래량 기반
+        cmf = col("CMF_20")
+        add(cmf > 0, p.get("score_cmf_positive", 2), cmf < 0, p.get("score_cmf_negative", -2))
+
+        efi = col("EFI_13")
+        add((efi > 0) & (efi.shift(1) < 0), p.get("score_efi_cross_up", 3),
+            (efi < 0) & (efi.shift(1) > 0), p.get("score_efi_cross_down", -3))
+
+        ppo, ppos = col("PPO_12_26_9"), col("PPOs_12_26_9")
+        ok = ppo.notna() & ppos.notna()
+        add(ok & (ppo > ppos), p.get("score_ppo_bull", 2), ok & ~(ppo > ppos), p.get("score_ppo_bear", -2))
+
+        chop = col("CHOP_14_1_100")
+        add(chop < p.get("chop_trending_th", 40), p.get("score_chop_trending", 3),
+            chop > p.get("chop_sideways_th", 60), p.get("score_chop_sideways", -3))
+
+        return total
@@ -1,5 +1,6 @@
 # analysis/strategies/oscillator_strategy.py (설정 파일 적용)
 
+import numpy as np
 import pandas as pd
 from .base_strategy import BaseStrategy
 
@@ -34,3 +35,23 @@ class OscillatorStrategy(BaseStrategy):
             scores["오실"] = self.p.get('score_overbought', -2)
 
         return scores
+
+    def analyze_vectorized(self, data: pd.DataFrame) -> np.ndarray:
+        mfi = self._column(data, self.mfi_col)
+        obv = self._column(data, "OBV")
+        rsi = self._column(data, self.rsi_col)
+        stoch = self._column(data, self.stoch_col)
+        valid = mfi.notna() & obv.notna() & rsi.notna() & stoch.notna()
+
+        # ewm(adjust=False)는 인과적이므로 전체 구간 값의 i번째 = 접두 구간 마지막 값
+        obv_ema = obv.ewm(span=self.p.get('obv_ema_period', 20), adjust=False).mean()
+        inflow = (mfi < self.p.get('mfi_oversold', 20)) | (obv > obv_ema)
+        outflow = (mfi > self.p.get('mfi_overbought', 80)) | (obv < obv_ema)
+        money = np.select([valid & inflow, valid & outflow],
+                          [self.p.get('score_inflow', 1), self.p.get('score_outflow', -1)], 0)
+
+        oversold = (rsi < self.p.get('rsi_oversold', 30)) & (stoch < self.p.get('stoch_oversold', 20))
+        overbought = (rsi > self.p.get('rsi_overbought', 70)) & (stoch > self.p.get('stoch_overbought', 80))
+        osc = np.select([valid & oversold, valid & overbought],
+                        [self.p.get('score_oversold', 2), self.p.get('score_overbought', -2)], 0)
+        return (money + osc).astype(float)
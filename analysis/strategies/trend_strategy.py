@@ -1,5 +1,6 @@
 # analysis/strategies/trend_strategy.py (설정 파일 적용)
 
+import numpy as np
 import pandas as pd
 from .base_strategy import BaseStrategy
 
@@ -27,3 +28,11 @@ class TrendStrategy(BaseStrategy):
             scores["추세"] = -self.score
 
         return scores
+
+    def analyze_vectorized(self, data: pd.DataFrame) -> np.ndarray:
+        close = data["close"]
+        ema_s = self._column(data, self.ema_short_col)
+        ema_l = self._column(data, self.ema_long_col)
+        up = (close > ema_s) & (ema_s > ema_l)
+        down = (close < ema_s) & (ema_s < ema_l)
+        return np.select([up, down], [self.score, -self.score], 0).astype(float)
@@ -40,7 +40,7 @@ class CommandCog(commands.Cog):
             
             print(f"[/성과] 1. '{symbol}' 백테스팅 시작... 현재 계좌 잔고 조회 중...")
             try:
-                account_info = self.bot.binance_client.futures_account()
+                account_info = await self.trading_engine.client.futures_account()
                 initial_cash = float(account_info.get('totalWalletBalance', 10000))
                 print(f"[/성과] 현재 총 자산: ${initial_cash:,.2f}")
             except Exception as e:
@@ -130,7 +130,7 @@ class CommandCog(commands.Cog):
         await view.wait()
         if view.value:
             try:
-                order = self.bot.binance_client.futures_create_order(symbol=symbol, side='BUY', type='MARKET', quantity=수량)
+                order = await self.trading_engine.client.futures_create_order(symbol=symbol, side='BUY', type='MARKET', quantity=수량)
                 await interaction.followup.send(f"✅ **수동 매수 주문 성공**\n`{symbol}` {수량} @ `${float(order.get('avgPrice', 0)):.2f}`", ephemeral=True)
             except Exception as e:
                 await interaction.followup.send(f"❌ **수동 매수 주문 실패**\n`{e}`", ephemeral=True)
@@ -145,7 +145,7 @@ class CommandCog(commands.Cog):
         await view.wait()
         if view.value:
             try:
-                order = self.bot.binance_client.futures_create_order(symbol=symbol, side='SELL', type='MARKET', quantity=수량)
+                order = await self.trading_engine.client.futures_create_order(symbol=symbol, side='SELL', type='MARKET', quantity=수량)
                 await interaction.followup.send(f"✅ **수동 매도 주문 성공**\n`{symbol}` {수량} @ `${float(order.get('avgPrice', 0)):.2f}`", ephemeral=True)
             except Exception as e:
                 await interaction.followup.send(f"❌ **수동 매도 주문 실패**\n`{e}`", ephemeral=True)
@@ -160,18 +160,21 @@ class CommandCog(commands.Cog):
         await view.wait()
         if view.value is True:
             try:
+                # ORM 객체를 로드/재부착하지 않고 PK 존재 여부만 확인 (기록은 엔진의 Core UPDATE가 처리)
                 with db_manager.get_session() as session:
-                    trade_to_close = session.execute(select(Trade).where(Trade.symbol == symbol, Trade.status == "OPEN")).scalar_one_or_none()
-                if trade_to_close:
-                    await self.trading_engine.close_position(trade_to_close, "사용자 수동 청산")
+                    open_trade_id = session.execute(
+                        select(Trade.id).where(Trade.symbol == symbol, Trade.status == "OPEN").limit(1)
+                    ).scalar()
+                if open_trade_id is not None:
+                    await self.trading_engine.close_position(symbol, "사용자 수동 청산")
                     await interaction.followup.send(f"✅ **수동 청산 주문 성공**\n`{symbol}` 포지션이 종료되었습니다.", ephemeral=True)
                 else:
-                    positions = self.bot.binance_client.futures_position_information()
+                    positions = await self.trading_engine.client.futures_position_information(symbol=symbol)
                     target_pos = next((p for p in positions if p.get('symbol') == symbol and float(p.get('positionAmt', 0)) != 0), None)
                     if target_pos:
                         quantity = abs(float(target_pos['positionAmt']))
                         side = "BUY" if float(target_pos['positionAmt']) < 0 else "SELL"
-                        self.bot.binance_client.futures_create_order(symbol=symbol, side=side, type='MARKET', quantity=quantity)
+                        await self.trading_engine.client.futures_create_order(symbol=symbol, side=side, type='MARKET', quantity=quantity)
                         await interaction.followup.send(f"✅ **수동 강제 청산 주문 성공**\n`{symbol}` 포지션이 종료되었습니다.", ephemeral=True)
                     else:
                         await interaction.followup.send(f"❌ **수동 청산 실패**\n`{symbol}`에 대한 오픈된 포지션을 찾을 수 없습니다.", ephemeral=True)
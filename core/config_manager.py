@@ -2,9 +2,24 @@
 
 import os
 import json
+import time
 from typing import Dict, List
 from dotenv import load_dotenv
 
+# ---- (옵션) orjson이 있으면 C 구현 JSON 파서 사용 ----
+try:
+    import orjson
+    _HAS_ORJSON = True
+except Exception:
+    _HAS_ORJSON = False
+
+
+def _load_json_bytes(path: str):
+    """파일을 바이트로 한 번에 읽어 파싱 (orjson 우선)"""
+    with open(path, "rb") as f:
+        raw = f.read()
+    return orjson.loads(raw) if _HAS_ORJSON else json.loads(raw)
+
 class ConfigManager:
     """
     .env 파일에서 환경 설정을, optimal_settings.json에서 전략 설정을 불러와 결합하는
@@ -39,6 +54,9 @@ class ConfigManager:
         # Database
         self.db_path = os.getenv("DB_PATH", "./runtime/trader.db")
 
+        # Logging (운영에서는 WARNING 권장 — info 라인은 포맷팅 자체를 생략)
+        self.log_level = os.getenv("LOG_LEVEL", "INFO")
+
         # --- 2. .env 또는 하드코딩된 '전략의 뼈대' 설정 ---
         # 이 값들은 최적화 대상이 아닌, 전략의 기본 구조를 정의합니다.
         self.analysis_timeframes = ["1d", "4h", "1h", "15m"]
@@ -75,6 +93,80 @@ class ConfigManager:
         }
         print("💡 모든 전략 파라미터는 이제 optimal_settings.json을 기준으로 작동합니다.")
 
+        # 설정 버전 — 값이 바뀔 때마다 증가시켜 파생 캐시(ExecPolicy 등)를 무효화
+        self.version = 0
+
+        # --- 5. optimal_settings.json (실행정책 포함) — mtime이 바뀔 때만 재파싱 ---
+        self.optimal_settings_path = "optimal_settings.json"
+        self.optimal_settings: Dict = {}
+        self._exec_policies: Dict[str, Dict[str, Dict]] = {}
+        self._optimal_mtime = None
+        self._optimal_checked_at = 0.0
+        self.reload_interval_sec = 5.0
+        self.maybe_reload(force=True)
+
+    def bump_version(self) -> int:
+        """설정이 다시 로드/변경되었음을 알리고 새 버전을 반환합니다."""
+        self.version += 1
+        return self.version
+
+    def maybe_reload(self, force: bool = False) -> bool:
+        """
+        reload_interval_sec 간격으로만 optimal_settings.json의 mtime을 확인하고,
+        바뀌었을 때만 다시 파싱한 뒤 버전을 올립니다. (재로딩 여부 반환)
+        """
+        now = time.monotonic()
+        if not force and now - self._optimal_checked_at < self.reload_interval_sec:
+            return False
+        self._optimal_checked_at = now
+        try:
+            mtime = os.stat(self.optimal_settings_path).st_mtime
+        except OSError:
+            return False
+        if mtime == self._optimal_mtime:
+            return False
+        try:
+            data = _load_json_bytes(self.optimal_settings_path)
+        except Exception as e:
+            print(f"⚠️ {self.optimal_settings_path} 파싱 실패: {e}")
+            return False
+        self._optimal_mtime = mtime
+        self.optimal_settings = data if isinstance(data, dict) else {}
+        self._exec_policies = self._build_exec_policies(self.optimal_settings)
+        self.bump_version()
+        return True
+
+    @staticmethod
+    def _build_exec_policies(settings: Dict) -> Dict[str, Dict[str, Dict]]:
+        """{regime: {symbol: entry}} → {regime: {symbol: 실행정책 dict}} (ExecPolicy 키 이름으로 정규화)"""
+        policies: Dict[str, Dict[str, Dict]] = {}
+        for regime, by_symbol in settings.items():
+            if not isinstance(by_symbol, dict):
+                continue
+            for symbol, entry in by_symbol.items():
+                if not isinstance(entry, dict):
+                    continue
+                # 에피소드 태그로 중첩된 경우 마지막 에피소드를 사용
+                if "OPEN_TH" not in entry:
+                    tagged = [v for v in entry.values() if isinstance(v, dict) and "OPEN_TH" in v]
+                    if not tagged:
+                        continue
+                    entry = tagged[-1]
+                p = {k: v for k, v in entry.items() if k.startswith("exec_") or k in ("risk_per_trade", "max_exposure_frac")}
+                if "SL_ATR_MULTIPLIER" in entry:
+                    p["sl_atr_multiplier"] = entry["SL_ATR_MULTIPLIER"]
+                if "RR_RATIO" in entry:
+                    p["risk_reward_ratio"] = entry["RR_RATIO"]
+                policies.setdefault(regime.upper(), {})[symbol] = p
+        return policies
+
+    def get_exec_policy(self, symbol: str, market_regime: str) -> Dict:
+        """
+        주어진 시장 상황에서 심볼의 실행정책 dict를 반환합니다. (미리 파싱된 dict 조회만 수행)
+        해당 시장/심볼 설정이 없으면 빈 dict → 전역 기본값 사용 (다른 시장의 리스크 설정으로 대체하지 않음)
+        """
+        return self._exec_policies.get(market_regime.upper(), {}).get(symbol, {})
+
 
     def get_strategy_params(self, symbol: str, market_regime: str) -> Dict:
         """
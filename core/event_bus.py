@@ -1,25 +1,110 @@
 import asyncio
-from typing import Any, Dict
+from dataclasses import dataclass, field
+from typing import Any, List, Optional
+
+
+# 링 버퍼 크기 (2의 거듭제곱 — 인덱스를 & mask로 계산)
+RING_SIZE = 1024
+
+
+# ---- 이벤트 페이로드 (dict 대신 고정 레이아웃 slots 객체) ----
+@dataclass(slots=True)
+class Event:
+    type: str
+    data: Any
+
+
+@dataclass(slots=True)
+class OrderOpened:
+    symbol: str
+    side: str
+    quantity: float
+    entry_price: float
+    stop_loss: float
+    take_profit: float
+    tp_ids: List[str] = field(default_factory=list)
+
+
+@dataclass(slots=True)
+class OrderClosed:
+    symbol: str
+    reason: str
+    is_partial: bool
+    exit_price: float
+    quantity: float
+
+
+@dataclass(slots=True)
+class OrderFailed:
+    symbol: str
+    error: str
+
+
+class Subscription:
+    """구독자별 읽기 커서. 느린 구독자는 덮어쓰인 만큼 건너뛴다(drop)."""
+
+    def __init__(self, bus: "EventBus") -> None:
+        self._bus = bus
+        self.cursor = bus.producer_seq
+        self.dropped = 0
+
+    async def next(self) -> Event:
+        """다음 이벤트를 기다렸다가 반환합니다."""
+        bus = self._bus
+        while self.cursor == bus.producer_seq:
+            bus._new_event.clear()
+            await bus._new_event.wait()
+        lag = bus.producer_seq - self.cursor
+        if lag > bus.capacity:
+            # 링이 한 바퀴 이상 앞서 나감 → 남아 있는 가장 오래된 이벤트부터 읽는다
+            self.dropped += lag - bus.capacity
+            self.cursor = bus.producer_seq - bus.capacity
+        event = bus._ring[self.cursor & bus._mask]
+        self.cursor += 1
+        return event
 
 
 class EventBus:
-    """Simple asynchronous event bus built on top of asyncio.Queue."""
+    """
+    미리 할당한 링 버퍼 기반 이벤트 버스 (단일 생산자 / 다중 구독자).
+    publish는 슬롯 1칸 쓰기 + 시퀀스 증가만 하며, 구독자는 각자의 커서로 읽는다.
+    """
 
-    def __init__(self) -> None:
-        self.queue: asyncio.Queue[Dict[str, Any]] = asyncio.Queue()
+    def __init__(self, capacity: int = RING_SIZE) -> None:
+        assert capacity & (capacity - 1) == 0, "capacity must be a power of two"
+        self.capacity = capacity
+        self._mask = capacity - 1
+        self._ring: List[Optional[Event]] = [None] * capacity
+        self.producer_seq = 0
+        self._new_event = asyncio.Event()
+        self._default: Optional[Subscription] = None
         print("이벤트 버스가 초기화되었습니다.")
 
-    async def publish(self, event_type: str, data: Dict[str, Any]) -> None:
-        """Publish a new event into the queue."""
-        await self.queue.put({"type": event_type, "data": data})
+    def safe_publish(self, event_type: str, data: Any) -> None:
+        """대기 없이 이벤트를 링에 기록합니다 (주문 경로용)."""
+        self._ring[self.producer_seq & self._mask] = Event(event_type, data)
+        self.producer_seq += 1
+        self._new_event.set()
+
+    async def publish(self, event_type: str, data: Any) -> None:
+        """Publish a new event into the ring."""
+        self.safe_publish(event_type, data)
+
+    def subscriber(self) -> Subscription:
+        """지금 시점부터 이벤트를 받는 독립 구독자를 만듭니다."""
+        return Subscription(self)
 
-    async def subscribe(self) -> Dict[str, Any]:
-        """Wait for and return the next available event."""
-        return await self.queue.get()
+    async def subscribe(self) -> Event:
+        """Wait for and return the next available event (기본 구독자)."""
+        if self._default is None:
+            self._default = Subscription(self)
+            # 기본 구독자는 생성 이전에 쌓인 이벤트도 링에 남아 있는 만큼 받는다
+            self._default.cursor = max(0, self.producer_seq - self.capacity)
+        return await self._default.next()
 
     def task_done(self) -> None:
-        """Mark the current event as processed."""
-        self.queue.task_done()
+        """구 asyncio.Queue 인터페이스 호환용 (링 버퍼에서는 할 일 없음)."""
+        return None
 
 
 # 단일 이벤트 버스 객체
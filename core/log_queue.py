@@ -0,0 +1,52 @@
+import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional
+
+
+_listener: Optional[QueueListener] = None
+
+# 큐 상한 — 출력(stdout)이 막혀도 이벤트 루프 메모리/지연이 무한정 늘지 않도록 제한
+LOG_QUEUE_MAXSIZE = 10_000
+
+
+class DroppingQueueHandler(QueueHandler):
+    """큐가 가득 차면 기다리지 않고 레코드를 버린다 (주문 경로는 절대 블로킹하지 않음)"""
+
+    dropped = 0
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+def setup_queue_logging(level: str = "INFO") -> QueueListener:
+    """
+    루트 로거에 QueueHandler를 달고, 실제 포맷/출력은 백그라운드 스레드(QueueListener)에서 처리합니다.
+    이벤트 루프(주문 경로)에서는 큐에 레코드를 넣는 비용만 남습니다.
+    """
+    global _listener
+    if _listener is not None:
+        return _listener
+
+    log_queue: "queue.Queue[logging.LogRecord]" = queue.Queue(LOG_QUEUE_MAXSIZE)
+    stream = logging.StreamHandler()
+    stream.setFormatter(logging.Formatter("%(asctime)s %(levelname)s [%(name)s] %(message)s"))
+
+    root = logging.getLogger()
+    root.setLevel(getattr(logging, str(level).upper(), logging.INFO))
+    root.addHandler(DroppingQueueHandler(log_queue))
+
+    _listener = QueueListener(log_queue, stream, respect_handler_level=True)
+    _listener.start()
+    return _listener
+
+
+def stop_queue_logging() -> None:
+    """남은 로그를 모두 내보내고 리스너 스레드를 종료합니다."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
@@ -8,6 +8,7 @@ from core.event_bus import event_bus
 import pandas as pd
 import requests
 import asyncio
+import logging
 
 import pandas as pd
 import requests
@@ -16,6 +17,9 @@ import requests
 from database.manager import db_manager
 from database.models import Signal, Trade, AccountSnapshot
 from analysis.core_strategy import diagnose_market_regime, MarketRegime
+from analysis.macro_analyzer import MacroRegime
+
+logger = logging.getLogger("tasks")
 
 class BackgroundTasks:
     def __init__(self, bot):
@@ -263,14 +267,17 @@ class BackgroundTasks:
             account_info = self.binance_client.futures_account()
             total_balance = float(account_info.get('totalWalletBalance', 0.0))
             if total_balance > 0:
-                with db_manager.get_session() as session:
-                    snapshot = AccountSnapshot(total_balance=total_balance)
-                    session.add(snapshot)
-                    session.commit()
-                    print(f"✅ 계좌 스냅샷 저장 완료: ${total_balance:,.2f}")
+                await db_manager.run(self._save_snapshot, total_balance)
+                print(f"✅ 계좌 스냅샷 저장 완료: ${total_balance:,.2f}")
         except Exception as e:
             print(f"🚨 일일 스냅샷 기록 중 오류 발생: {e}")
 
+    @staticmethod
+    def _save_snapshot(total_balance: float) -> None:
+        """(DB 스레드) 계좌 스냅샷 1건을 저장합니다."""
+        with db_manager.session_scope() as session:
+            session.add(AccountSnapshot(total_balance=total_balance))
+
     async def check_circuit_breaker(self) -> bool:
         """
         DB에 저장된 계좌 스냅샷을 기반으로 서킷 브레이커 발동 여부를 확인합니다.
@@ -420,12 +427,14 @@ class BackgroundTasks:
 
                     if open_trades:
                         log_message += f"{len(open_trades)}개 포지션 관리 실행. "
-                        await self.manage_open_positions(session, open_trades)
+                        await self.manage_open_positions(session, open_trades, current_macro_regime.name)
 
                     open_positions_count = session.query(Trade).filter(Trade.status == "OPEN").count()
                     symbols_in_trade = {t.symbol for t in open_trades}
 
-                    decision_reason = await self.find_new_entry_opportunities(session, open_positions_count, symbols_in_trade)
+                    decision_reason = await self.find_new_entry_opportunities(
+                        session, open_positions_count, symbols_in_trade, current_macro_regime.name
+                    )
                     log_message += decision_reason
             except Exception as e:
                 log_message += f"🚨 루프 중 심각한 오류 발생: {e}"
@@ -443,41 +452,35 @@ class BackgroundTasks:
         while True:
             try:
                 event = await event_bus.subscribe()
-                event_type = event.get("type")
-                data = event.get("data", {})
+                event_type = event.type
+                data = event.data
 
                 alerts_channel = self.bot.get_channel(self.config.alerts_channel_id)
                 if not alerts_channel:
                     print("⚠️ 알림 채널 ID를 찾을 수 없습니다. .env 파일을 확인하세요.")
                     continue
 
-                if event_type == "ORDER_SUCCESS":
-                    trade = data.get("trade")
-                    embed = discord.Embed(title="🚀 신규 포지션 진입", color=0x00FF00 if trade.side == "BUY" else 0xFF0000)
-                    embed.add_field(name="코인", value=trade.symbol, inline=True)
-                    embed.add_field(name="방향", value=trade.side, inline=True)
-                    embed.add_field(name="수량", value=f"{trade.quantity}", inline=True)
-                    embed.add_field(name="진입 가격", value=f"${trade.entry_price:,.4f}", inline=False)
-                    embed.add_field(name="손절 (SL)", value=f"${trade.stop_loss_price:,.4f}", inline=True)
-                    embed.add_field(name="익절 (TP)", value=f"${trade.take_profit_price:,.4f}", inline=True)
-                    embed.set_footer(text=f"주문 ID: {trade.binance_order_id}")
+                if event_type == "ORDER_OPEN_SUCCESS":
+                    embed = discord.Embed(title="🚀 신규 포지션 진입", color=0x00FF00 if data.side == "BUY" else 0xFF0000)
+                    embed.add_field(name="코인", value=data.symbol, inline=True)
+                    embed.add_field(name="방향", value=data.side, inline=True)
+                    embed.add_field(name="수량", value=f"{data.quantity}", inline=True)
+                    embed.add_field(name="진입 가격", value=f"${data.entry_price:,.4f}", inline=False)
+                    embed.add_field(name="손절 (SL)", value=f"${data.stop_loss:,.4f}", inline=True)
+                    embed.add_field(name="익절 (TP)", value=f"${data.take_profit:,.4f}", inline=True)
                     await alerts_channel.send(embed=embed)
 
                 elif event_type == "ORDER_CLOSE_SUCCESS":
-                    trade = data.get("trade")
-                    reason = data.get("reason")
-                    # PnL 계산을 위한 안전장치 추가
-                    initial_investment = trade.entry_price * trade.quantity
-                    pnl_percent = (trade.pnl / initial_investment * 100) if initial_investment > 0 else 0
-
-                    embed = discord.Embed(title="✅ 포지션 종료", description=f"사유: {reason}", color=0x3498DB)
-                    embed.add_field(name="코인", value=trade.symbol, inline=True)
-                    embed.add_field(name="수익 (PnL)", value=f"${trade.pnl:,.2f} ({pnl_percent:+.2f}%)", inline=True)
+                    title = "✂️ 포지션 부분 청산" if data.is_partial else "✅ 포지션 종료"
+                    embed = discord.Embed(title=title, description=f"사유: {data.reason}", color=0x3498DB)
+                    embed.add_field(name="코인", value=data.symbol, inline=True)
+                    embed.add_field(name="수량", value=f"{data.quantity}", inline=True)
+                    embed.add_field(name="청산 가격", value=f"${data.exit_price:,.4f}", inline=True)
                     await alerts_channel.send(embed=embed)
 
                 elif event_type == "ORDER_FAILURE":
-                    embed = discord.Embed(title="🚨 주문 실패", description=data.get("error"), color=0xFF0000)
-                    embed.add_field(name="코인", value=data.get("symbol"), inline=True)
+                    embed = discord.Embed(title="🚨 주문 실패", description=data.error, color=0xFF0000)
+                    embed.add_field(name="코인", value=data.symbol, inline=True)
                     await alerts_channel.send(embed=embed)
 
             except Exception as e:
@@ -489,7 +492,7 @@ class BackgroundTasks:
             try:
                 mark_price = float(self.binance_client.futures_mark_price(symbol=trade.symbol).get('markPrice', 0.0))
                 if mark_price == 0.0:
-                    print(f"[{trade.symbol}] 현재가를 가져올 수 없어 건너뜁니다.")
+                    logger.info("[%s] 현재가를 가져올 수 없어 건너뜁니다.", trade.symbol)
                     continue
 
                 # 1. 포지션의 최고(최저)가 갱신
@@ -508,13 +511,13 @@ class BackgroundTasks:
                        (trade.side == "SELL" and mark_price <= scale_out_target_price):
                         
                         quantity_to_close = trade.quantity / 2
-                        print(f"💰 [{trade.symbol}] 1차 목표 도달! 50% 분할 익절 실행.")
+                        logger.info("💰 [%s] 1차 목표 도달! 50%% 분할 익절 실행.", trade.symbol)
                         await self.trading_engine.close_position(trade, "자동 분할 익절", quantity_to_close=quantity_to_close)
                         
                         trade.is_scaled_out = True
                         trade.stop_loss_price = trade.entry_price
-                        session.commit()
-                        print(f"🛡️ [{trade.symbol}] 무위험 포지션 전환 완료. SL을 본전(${trade.entry_price:,.2f})으로 변경.")
+                        await db_manager.run(session.commit)
+                        logger.info("🛡️ [%s] 무위험 포지션 전환 완료. SL을 본전($%.2f)으로 변경.", trade.symbol, trade.entry_price)
                         continue
 
                 # 3. 추적 손절매 (Trailing Stop Loss) 로직 (분할 익절 완료 포지션에만 적용)
@@ -528,13 +531,13 @@ class BackgroundTasks:
                             new_stop_loss = trade.highest_price_since_entry - (atr * self.config.trailing_stop_atr_multiplier)
                             if new_stop_loss > trade.stop_loss_price:
                                 trade.stop_loss_price = new_stop_loss
-                                print(f"📈 [{trade.symbol}] 추적 손절(Long): SL 상향 조정 -> ${new_stop_loss:,.2f}")
+                                logger.info("📈 [%s] 추적 손절(Long): SL 상향 조정 -> $%.2f", trade.symbol, new_stop_loss)
 
                         elif trade.side == "SELL":
                             new_stop_loss = trade.highest_price_since_entry + (atr * self.config.trailing_stop_atr_multiplier)
                             if new_stop_loss < trade.stop_loss_price:
                                 trade.stop_loss_price = new_stop_loss
-                                print(f"📉 [{trade.symbol}] 추적 손절(Short): SL 하향 조정 -> ${new_stop_loss:,.2f}")
+                                logger.info("📉 [%s] 추적 손절(Short): SL 하향 조정 -> $%.2f", trade.symbol, new_stop_loss)
                 
                 # 4. 최종 익절(TP) / 손절(SL) 로직
                 if trade.take_profit_price and ((trade.side == "BUY" and mark_price >= trade.take_profit_price) or \
@@ -547,10 +550,10 @@ class BackgroundTasks:
                     await self.trading_engine.close_position(trade, f"자동 손절 (SL: ${trade.stop_loss_price:,.2f})")
                     continue
                 
-                session.commit()
+                await db_manager.run(session.commit)
 
             except Exception as e:
-                print(f"🚨 포지션 관리 중 오류 ({trade.symbol}): {e}")
+                logger.error("🚨 포지션 관리 중 오류 (%s): %s", trade.symbol, e)
                 session.rollback()
 
     async def find_new_entry_opportunities(self, session, open_positions_count, symbols_in_trade, market_regime: str):
@@ -580,13 +583,18 @@ class BackgroundTasks:
         if not valid_opportunities:
             return "탐색 완료, 신규 진입 기회 없음."
         
-        best_opportunity = sorted(valid_opportunities, key=lambda x: abs(x["avg_score"]), reverse=True)[0]
+        best_opportunity = max(valid_opportunities, key=lambda x: abs(x["avg_score"]))
+        # 최고 점수 기회의 값들을 지역 변수로 한 번만 꺼내 둔다
+        # (루프 변수 context가 아니라 선택된 기회의 context를 사용)
+        best_symbol = best_opportunity["symbol"]
+        best_context = best_opportunity["context"]
+        entry_atr = best_context['entry_atr']
         
         # Position Sizer 호출 시에도 market_regime 전달
-        leverage = self.position_sizer.get_leverage_for_symbol(best_opportunity["symbol"], self.current_aggr_level)
+        leverage = self.position_sizer.get_leverage_for_symbol(best_symbol, self.current_aggr_level)
         quantity = self.position_sizer.calculate_position_size(
-            symbol=best_opportunity["symbol"], 
-            atr=best_opportunity["context"]['entry_atr'], 
+            symbol=best_symbol, 
+            atr=entry_atr, 
             aggr_level=self.current_aggr_level,
             open_positions_count=open_positions_count,
             average_score=best_opportunity["avg_score"],
@@ -594,9 +602,11 @@ class BackgroundTasks:
         )
         
         if quantity:
-            context['signal_id'] = best_opportunity["signal_id"]
-            await self.trading_engine.place_order_with_bracket(best_opportunity["symbol"], best_opportunity["side"], quantity, leverage, context['entry_atr'], context)
+            best_context['signal_id'] = best_opportunity["signal_id"]
+            await self.trading_engine.place_order_with_bracket(
+                best_symbol, best_opportunity["side"], quantity, leverage, entry_atr, market_regime, best_context
+            )
             return f"🏆 최고 점수 신호 선택: {best_opportunity['reason']}"
         else:
-            return f"[{best_opportunity['symbol']}]: 포지션 규모 계산 실패로 진입 보류."
+            return f"[{best_symbol}]: 포지션 규모 계산 실패로 진입 보류."
         # ▲▲▲ [시즌 4 수정] ▲▲▲
@@ -1,12 +1,62 @@
+import asyncio
+import functools
 import os
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.orm import scoped_session, sessionmaker
+from sqlalchemy.pool import QueuePool
 
 from .models import Base
 from core.config_manager import config
 
 
+@functools.lru_cache(maxsize=1)
+def _get_engine(url: str):
+    """DSN당 엔진(방언 초기화 + 커넥션 풀)을 한 번만 만들고 재사용합니다."""
+    # 요청마다 새 커넥션을 맺지 않도록 커넥션 풀 사용 (pool_size ≈ 동시 작업 수 x2)
+    # LIFO: 주문이 몰릴 때 가장 최근에 반납된(따뜻한) 커넥션을 먼저 재사용
+    engine = create_engine(
+        url,
+        poolclass=QueuePool,
+        pool_size=10,
+        max_overflow=10,
+        pool_use_lifo=True,
+        pool_pre_ping=True,
+        pool_recycle=1800,
+    )
+    Base.metadata.create_all(engine)
+    added = _add_missing_columns(engine)
+    if "trades.side_sign" in added:
+        with engine.begin() as conn:
+            conn.execute(text(
+                "UPDATE trades SET side_sign = CASE WHEN side = 'BUY' THEN 1.0 ELSE -1.0 END "
+                "WHERE side_sign IS NULL"
+            ))
+    # 기존 DB 파일에도 새로 추가된 인덱스를 생성
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(engine, checkfirst=True)
+    return engine
+
+
+def _add_missing_columns(engine) -> list:
+    """기존 DB 파일에 모델에 새로 추가된(nullable) 컬럼을 ALTER TABLE로 추가합니다."""
+    added = []
+    insp = inspect(engine)
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            existing = {c["name"] for c in insp.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing:
+                    continue
+                col_type = column.type.compile(dialect=engine.dialect)
+                conn.execute(text(f'ALTER TABLE {table.name} ADD COLUMN {column.name} {col_type}'))
+                added.append(f"{table.name}.{column.name}")
+    return added
+
+
 class DatabaseManager:
     """Handle engine creation and session management for the database."""
 
@@ -15,14 +65,36 @@ class DatabaseManager:
         if db_dir and not os.path.exists(db_dir):
             os.makedirs(db_dir, exist_ok=True)
 
-        self.engine = create_engine(f"sqlite:///{config.db_path}")
-        Base.metadata.create_all(self.engine)
+        self.engine = _get_engine(f"sqlite:///{config.db_path}")
         self.Session = sessionmaker(bind=self.engine)
+        # 태스크(스레드)별로 재사용되는 세션
+        self.ScopedSession = scoped_session(self.Session)
+        # 블로킹 commit을 이벤트 루프 밖에서 처리하는 DB 전용 스레드 풀
+        # (기본 executor를 쓰는 분석 작업과 경합하지 않도록 분리)
+        self.executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="db")
         print(f"데이터베이스 매니저가 초기화되었습니다. (경로: {config.db_path})")
 
     def get_session(self):
         return self.Session()
 
+    async def run(self, fn, *args, **kwargs):
+        """동기 DB 작업을 DB 전용 스레드 풀에서 실행하고 결과를 기다립니다."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, functools.partial(fn, *args, **kwargs))
+
+    @contextmanager
+    def session_scope(self):
+        """scoped 세션을 빌려 쓰고 성공 시 commit, 실패 시 rollback 후 반납합니다."""
+        session = self.ScopedSession()
+        try:
+            yield session
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            self.ScopedSession.remove()
+
 
 # 단일 데이터베이스 매니저 객체
 db_manager = DatabaseManager()
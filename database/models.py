@@ -1,7 +1,7 @@
 # 파일명: database/models.py (V4 업그레이드)
 
 from datetime import datetime, timezone
-from sqlalchemy import Boolean, Column, DateTime, Float, ForeignKey, Integer, String
+from sqlalchemy import Boolean, Column, DateTime, Float, ForeignKey, Index, Integer, String
 from sqlalchemy.orm import declarative_base, relationship
 
 Base = declarative_base()
@@ -24,11 +24,16 @@ class Signal(Base):
 
 class Trade(Base):
     __tablename__ = "trades"
+    # 심볼별 진행 중(OPEN/PARTIAL) 최신 거래 조회용 복합 인덱스
+    __table_args__ = (
+        Index("ix_trade_symbol_status_time", "symbol", "status", "entry_time"),
+    )
     id = Column(Integer, primary_key=True)
     signal_id = Column(Integer, ForeignKey("signals.id"))
     binance_order_id = Column(Integer, unique=True)
     symbol = Column(String)
     side = Column(String)
+    side_sign = Column(Float)  # BUY=+1.0 / SELL=-1.0 — PnL을 분기 없이 (exit-entry)*qty*sign 으로 계산
     leverage = Column(Integer) # 주문 시 설정한 레버리지
     quantity = Column(Float)
     entry_price = Column(Float)
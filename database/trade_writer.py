@@ -0,0 +1,92 @@
+# 파일명: database/trade_writer.py
+# 주문/청산 DB 기록을 큐에 모아 한 트랜잭션으로 반영하는 백그라운드 writer
+# - 최대 max_batch 건 또는 max_delay 초 중 먼저 도달하는 시점에 flush
+# - 단일 소비자이므로 같은 심볼의 open → close 순서가 그대로 유지된다
+# - 배치 커밋이 실패하면 항목별 트랜잭션으로 재시도해 다른 기록은 살린다
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Callable, List, Optional, Tuple
+
+from database.manager import db_manager
+
+logger = logging.getLogger("trade_writer")
+
+
+class TradeWriter:
+    """session을 첫 인자로 받는 동기 함수(mutation)를 모아 배치 커밋합니다."""
+
+    def __init__(self, max_batch: int = 32, max_delay: float = 0.05) -> None:
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self._queue is None:
+            self._queue = asyncio.Queue()
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    def submit(self, fn: Callable, *args, **kwargs) -> None:
+        """mutation을 큐에 넣고 바로 반환 (기록은 최대 max_delay 뒤에 커밋됨)"""
+        self.start()
+        self._queue.put_nowait((fn, args, kwargs))
+
+    async def flush(self) -> None:
+        """지금까지 제출된 기록이 모두 커밋될 때까지 대기"""
+        if self._queue is not None:
+            await self._queue.join()
+
+    async def stop(self) -> None:
+        await self.flush()
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+    async def _run(self) -> None:
+        while True:
+            items: List[Tuple[Callable, tuple, dict]] = [await self._queue.get()]
+            # 첫 건 이후 max_delay 동안 더 모은 뒤 비차단으로 꺼낸다
+            # (wait_for(get)은 취소와 동시에 완료되면 취소를 삼켜 종료가 멈출 수 있음)
+            if self._queue.qsize() < self.max_batch - 1:
+                await asyncio.sleep(self.max_delay)
+            while len(items) < self.max_batch and not self._queue.empty():
+                items.append(self._queue.get_nowait())
+            try:
+                await db_manager.run(self._write, items)
+            except Exception as e:
+                logger.warning("⚠️ DB 배치 기록 실패: %s", e)
+            finally:
+                for _ in items:
+                    self._queue.task_done()
+
+    @staticmethod
+    def _write(items: List[Tuple[Callable, tuple, dict]]) -> None:
+        """(DB 스레드) 배치를 한 트랜잭션으로 커밋, 실패 시 항목별로 재시도"""
+        try:
+            with db_manager.session_scope() as session:
+                for fn, args, kwargs in items:
+                    fn(session, *args, **kwargs)
+            return
+        except Exception as e:
+            if len(items) == 1:
+                logger.warning("⚠️ DB 기록 실패: %s", e)
+                return
+            logger.warning("⚠️ DB 배치 커밋 실패, 항목별 재시도: %s", e)
+        for fn, args, kwargs in items:
+            try:
+                with db_manager.session_scope() as session:
+                    fn(session, *args, **kwargs)
+            except Exception as e:
+                logger.warning("⚠️ DB 기록 실패: %s", e)
+
+
+# 단일 writer 객체
+trade_writer = TradeWriter()
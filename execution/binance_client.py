@@ -0,0 +1,154 @@
+# 파일명: execution/binance_client.py
+# AsyncClient 확장 — 서명/페이로드 생성 경량화
+# - HMAC 키 스케줄은 1회만 만들고 요청마다 .copy()로 재사용
+# - batchOrders 페이로드 직렬화/REST 응답 파싱은 orjson 사용 (없으면 표준 json)
+# - 시장가 주문은 심볼별로 미리 만든 쿼리 템플릿에 값만 채워 서명/전송
+# - REST 소켓에 TCP_NODELAY/keepalive 옵션 적용 (유휴 중 끊긴 연결로 TLS 재협상하지 않도록)
+
+from __future__ import annotations
+
+import hashlib
+import hmac
+import socket
+import time
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import quote_plus
+
+import aiohttp
+import yarl
+from binance import AsyncClient
+from binance.exceptions import BinanceAPIException, BinanceRequestException
+from requests.adapters import HTTPAdapter
+
+# ---- (옵션) orjson이 있으면 C 구현 JSON 직렬화 사용 ----
+try:
+    import orjson
+    _HAS_ORJSON = True
+except Exception:
+    import json
+    _HAS_ORJSON = False
+
+
+def _dumps(obj) -> str:
+    if _HAS_ORJSON:
+        return orjson.dumps(obj).decode()
+    return json.dumps(obj, separators=(",", ":"))
+
+
+def _loads(raw: bytes):
+    if _HAS_ORJSON:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+# 유휴 30초 후 10초 간격으로 3회 probe — NAT/LB가 조용히 끊기 전에 연결을 살려 둔다
+KEEPALIVE_IDLE = 30
+KEEPALIVE_INTERVAL = 10
+KEEPALIVE_COUNT = 3
+
+
+def keepalive_socket_options() -> List[Tuple[int, int, int]]:
+    opts = [
+        (socket.IPPROTO_TCP, socket.TCP_NODELAY, 1),
+        (socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1),
+    ]
+    # 플랫폼별로 없는 옵션은 건너뛴다 (macOS: TCP_KEEPALIVE, Windows: 일부 미지원)
+    for name, value in (("TCP_KEEPIDLE", KEEPALIVE_IDLE),
+                        ("TCP_KEEPINTVL", KEEPALIVE_INTERVAL),
+                        ("TCP_KEEPCNT", KEEPALIVE_COUNT)):
+        if hasattr(socket, name):
+            opts.append((socket.IPPROTO_TCP, getattr(socket, name), value))
+    return opts
+
+
+def keepalive_socket_factory(addr_info) -> socket.socket:
+    """aiohttp TCPConnector(socket_factory=...)용 — keepalive 옵션이 적용된 소켓 생성"""
+    family, type_, proto, _, _ = addr_info
+    sock = socket.socket(family=family, type=type_, proto=proto)
+    for level, opt, value in keepalive_socket_options():
+        sock.setsockopt(level, opt, value)
+    return sock
+
+
+class KeepAliveHTTPAdapter(HTTPAdapter):
+    """동기 binance Client(requests)용 — 커넥션 풀의 모든 소켓에 keepalive 옵션 적용"""
+
+    def init_poolmanager(self, *args, **kwargs):
+        kwargs["socket_options"] = keepalive_socket_options()
+        super().init_poolmanager(*args, **kwargs)
+
+
+class FastAsyncClient(AsyncClient):
+    """서명 HMAC 템플릿과 orjson 기반 batchOrders를 쓰는 AsyncClient"""
+
+    _hmac_template: Optional["hmac.HMAC"] = None
+    _market_templates: Optional[Dict[str, str]] = None
+
+    def _hmac_signature(self, query_string: str) -> str:
+        assert self.API_SECRET, "API Secret required for private endpoints"
+        if self._hmac_template is None:
+            self._hmac_template = hmac.new(self.API_SECRET.encode("utf-8"), digestmod=hashlib.sha256)
+        h = self._hmac_template.copy()
+        h.update(query_string.encode("utf-8"))
+        return h.hexdigest()
+
+    async def _handle_response(self, response: aiohttp.ClientResponse):
+        # 본문을 bytes로 한 번만 읽고 바로 파싱 (text 디코드 2회 + 표준 json 생략)
+        if not str(response.status).startswith("2"):
+            raise BinanceAPIException(response, response.status, await response.text())
+        raw = await response.read()
+        if not raw:
+            return {}
+        try:
+            return _loads(raw)
+        except ValueError:
+            raise BinanceRequestException(f"Invalid Response: {raw.decode(errors='replace')}")
+
+    async def futures_place_batch_order(self, **params):
+        orders = params["batchOrders"]
+        for order in orders:
+            if "newClientOrderId" not in order:
+                order["newClientOrderId"] = self.CONTRACT_ORDER_PREFIX + self.uuid22()
+        # 서명 문자열과 전송 쿼리가 같도록 미리 URL 인코딩해 둔다 (SDK와 동일한 규칙)
+        params["batchOrders"] = quote_plus(_dumps(orders), safe="@")
+        return await self._request_futures_api(
+            "post", "batchOrders", True, data=params, force_params=True
+        )
+
+    def _market_template(self, symbol: str) -> str:
+        if self._market_templates is None:
+            self._market_templates = {}
+        tpl = self._market_templates.get(symbol)
+        if tpl is None:
+            tpl = (
+                f"symbol={quote_plus(symbol)}&type=MARKET&newOrderRespType=RESULT"
+                "&side=%s&quantity=%s&newClientOrderId=%s&timestamp=%d"
+            )
+            if self.REQUEST_RECVWINDOW:
+                tpl += f"&recvWindow={self.REQUEST_RECVWINDOW}"
+            self._market_templates[symbol] = tpl
+        return tpl
+
+    async def futures_market_order(self, symbol: str, side: str, quantity, newClientOrderId: str) -> dict:
+        """
+        시장가 주문 전용 빠른 경로 — dict 생성/정렬/urlencode 없이 템플릿 치환 + HMAC 후 바로 POST.
+        RSA/Ed25519 키를 쓰는 경우엔 SDK 경로로 되돌아간다.
+        """
+        if self.PRIVATE_KEY:
+            return await self.futures_create_order(
+                symbol=symbol, side=side, type="MARKET", quantity=quantity,
+                newOrderRespType="RESULT", newClientOrderId=newClientOrderId,
+            )
+        ts = int(time.time() * 1000 + self.timestamp_offset)
+        body = self._market_template(symbol) % (side, quantity, newClientOrderId, ts)
+        body += "&signature=" + self._hmac_signature(body)
+        uri = self._create_futures_api_uri("order")
+        async with self.session.post(
+            yarl.URL(uri, encoded=True),
+            proxy=self.https_proxy,
+            headers={"Content-Type": "application/x-www-form-urlencoded"},
+            data=body,
+            timeout=self.REQUEST_TIMEOUT,
+        ) as response:
+            self.response = response
+            return await self._handle_response(response)
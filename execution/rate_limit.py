@@ -0,0 +1,47 @@
+# 파일명: execution/rate_limit.py
+# 바이낸스 주문/가중치 한도(10 orders/s, 2400 weight/min)용 토큰 버킷
+# - aiolimiter가 설치되어 있으면 그것을, 없으면 동일 인터페이스의 간단한 구현을 사용
+
+from __future__ import annotations
+
+import asyncio
+import time
+
+# ---- (옵션) aiolimiter가 있으면 사용 ----
+try:
+    from aiolimiter import AsyncLimiter
+    _HAS_AIOLIMITER = True
+except Exception:
+    _HAS_AIOLIMITER = False
+
+    class AsyncLimiter:  # type: ignore[no-redef]
+        """max_rate 토큰이 time_period(초)마다 채워지는 토큰 버킷 (aiolimiter 호환 최소 구현)"""
+
+        def __init__(self, max_rate: float, time_period: float = 60) -> None:
+            self.max_rate = float(max_rate)
+            self.time_period = float(time_period)
+            self._rate_per_sec = self.max_rate / self.time_period
+            self._level = 0.0
+            self._last = time.monotonic()
+            self._lock = asyncio.Lock()
+
+        def _leak(self) -> None:
+            now = time.monotonic()
+            self._level = max(0.0, self._level - (now - self._last) * self._rate_per_sec)
+            self._last = now
+
+        async def acquire(self, amount: float = 1) -> None:
+            amount = min(float(amount), self.max_rate)
+            async with self._lock:
+                while True:
+                    self._leak()
+                    if self._level + amount <= self.max_rate:
+                        self._level += amount
+                        return
+                    await asyncio.sleep((self._level + amount - self.max_rate) / self._rate_per_sec)
+
+        async def __aenter__(self) -> None:
+            await self.acquire()
+
+        async def __aexit__(self, exc_type, exc, tb) -> None:
+            return None
@@ -3,36 +3,110 @@
 # - quantity 미지정 시 calc_order_qty()로 절대 수량 자동 계산 (하드코딩 제거)
 # - 레버리지→margin(=1/leverage) 반영, 거래소 필터(minNotional/stepSize/minQty) 준수
 # - 기존 DB/이벤트/브래킷/트레일링/타임스탑 로직은 유지
+# - binance.AsyncClient(aiohttp) 기반 비동기 주문 — SL/TP 브래킷은 batchOrders 1회로 전송
+# - 로그는 logging(QueueHandler) 경유 — 출력은 백그라운드 스레드에서 처리
 
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import Optional, Dict, List, Any
+import asyncio
+import functools
+import itertools
+import logging
+import time
+from collections import defaultdict
+from contextlib import AsyncExitStack
+from dataclasses import dataclass, field
+from typing import Optional, Dict, List, Any, Tuple
 from datetime import datetime, timezone
+from decimal import Decimal
 
-from binance.client import Client
+import numpy as np
+from sqlalchemy import func, insert, select, update
+from binance import AsyncClient, BinanceSocketManager
 from binance.exceptions import BinanceAPIException
 
 # 프로젝트 컴포넌트
 from core.config_manager import config        # ▶ 옵티마이저가 만든 JSON을 여기서 로드
-from core.event_bus import event_bus
-from database.manager import db_manager
+from core.event_bus import OrderClosed, OrderFailed, OrderOpened, event_bus
+from database.trade_writer import trade_writer
 from database.models import Signal, Trade
 
+from execution.rate_limit import AsyncLimiter
+
 # 공통 리스크 사이징 유틸
 from analysis.risk_sizing import calc_order_qty
 
 
+logger = logging.getLogger("trading_engine")
+
+# 바이낸스 선물 batchOrders 1회 요청당 최대 주문 수
+BATCH_ORDER_LIMIT = 5
+# 진입 방향 → 청산(브래킷) 방향
+OPPOSITE = {"BUY": "SELL", "SELL": "BUY"}
+
+# 거래소 필터 조회 실패 시 기본값
+DEFAULT_FILTERS: Dict[str, float] = {
+    "min_notional": 5.0,
+    "qty_step": 1e-6,
+    "min_qty": 1e-6,
+    "tick_size": 1e-6,
+    "price_precision": 6,
+    "qty_precision": 6,
+}
+
+# 바이낸스 선물 한도: 주문 10건/초, 요청 가중치 2400/분
+ORDER_RATE_PER_SEC = 10
+WEIGHT_PER_MIN = 2400
+
+# 트레일링 SL은 이 tick 수 이상 움직였을 때만 취소/재발행
+TRAIL_MIN_TICKS = 2
+
+# 포지션 조회 캐시 유효시간(초) — 자체 주문 발생 시 즉시 무효화
+POSITION_CACHE_TTL = 1.0
+
+# 최근 관측 가격 유효시간(초) — 넘으면 파이프라인 진입 전에 REST로 다시 조회
+LAST_PX_TTL = 2.0
+
+
+def _step_decimals(step: float) -> int:
+    """스텝(tickSize/stepSize)의 소수 자릿수. 예: 0.01 → 2, 10 → 0"""
+    return max(0, -Decimal(str(step)).normalize().as_tuple().exponent)
+
+
+def _quantize(x: float, step: float, decimals: int) -> float:
+    """x를 step 배수로 내림 — 10**decimals 스케일의 정수 연산으로 부동소수 오차 제거"""
+    scale = 10 ** decimals
+    step_units = max(1, int(round(step * scale)))
+    units = int(round(x * scale, 3)) // step_units * step_units
+    return units / scale
+
+
+def _batch_value(v: Any) -> str:
+    """batchOrders 페이로드는 문자열 값만 안전하다(불리언은 소문자)."""
+    if isinstance(v, bool):
+        return "true" if v else "false"
+    return str(v)
+
+
+# ORM unit-of-work(identity map/flush 정렬)를 거치지 않는 Trade INSERT — 컴파일 결과는 SQLAlchemy가 캐시
+_TRADE_INSERT = insert(Trade).returning(Trade.id)
+
+
+def _utc_from_ns(ts_ns: int) -> datetime:
+    """주문 시점에 잡아 둔 time.time_ns() 값을 DB 바인딩 시점에 datetime으로 변환"""
+    return datetime.fromtimestamp(ts_ns / 1e9, tz=timezone.utc)
+
+
 # -----------------------------------------------------------------------------
 # 실행 정책 설정 (모든 값은 config에서만 읽는다 — ENV 사용 안 함)
 # -----------------------------------------------------------------------------
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class ExecPolicy:
-    """실행 레벨 설정(실거래/백테스트 공용) — 전부 config에서 공급"""
+    """실행 레벨 설정(실거래/백테스트 공용) — 전부 config에서 공급 (불변/캐시 가능)"""
     sl_atr_mult: float = 1.5
     rr: float = 2.0
-    partial: List[float] = None            # 예: [0.3, 0.3, 0.4] (없으면 단일 TP)
+    partial: Tuple[float, ...] = ()        # 예: (0.3, 0.3, 0.4) (없으면 단일 TP)
     time_stop_bars: int = 0               # 0이면 비활성
     trailing_mode: str = "off"            # "off" | "atr" | "percent"
     trailing_k: float = 0.0               # atr 배수 또는 percent 값
@@ -41,16 +115,27 @@ class ExecPolicy:
     max_exposure_frac: float = 0.30       # 총노출 = 자본의 30% (레버리지 전 기준)
 
     @staticmethod
-    def from_config(symbol: str) -> "ExecPolicy":
+    def from_config(symbol: str, market_regime: str) -> "ExecPolicy":
+        """
+        (심볼, 시장 레짐, config.version) 기준으로 캐시된 실행정책을 돌려준다.
+        (틱마다 dict 순회/캐스팅/객체 생성을 반복하지 않도록 — 버전이 바뀌면 자동 무효화)
         """
-        config에서 해당 심볼의 실행정책을 불러온다.
+        # 파일이 바뀌었으면(주기적 mtime 확인) config.version이 올라가 캐시가 무효화된다
+        if hasattr(config, "maybe_reload"):
+            config.maybe_reload()
+        return _exec_policy_cached(symbol, market_regime.upper(), getattr(config, "version", 0))
+
+    @staticmethod
+    def _build(symbol: str, market_regime: str) -> "ExecPolicy":
+        """
+        config에서 해당 레짐/심볼의 실행정책을 불러온다.
         기대 키:
           - sl_atr_multiplier, risk_reward_ratio
           - exec_partial, exec_time_stop_bars, exec_trailing_mode, exec_trailing_k
           - risk_per_trade, max_exposure_frac
         모두 없으면 안전한 기본값 사용
         """
-        p = config.get_exec_policy(symbol) if hasattr(config, "get_exec_policy") else {}
+        p = config.get_exec_policy(symbol, market_regime) if hasattr(config, "get_exec_policy") else {}
         # 과거 설정 키와 호환
         sl_mult = p.get("sl_atr_multiplier", getattr(config, "sl_atr_multiplier", 1.5))
         rr = p.get("risk_reward_ratio", getattr(config, "risk_reward_ratio", 2.0))
@@ -66,7 +151,7 @@ class ExecPolicy:
         return ExecPolicy(
             sl_atr_mult=float(sl_mult),
             rr=float(rr),
-            partial=partial or [],
+            partial=tuple(float(x) for x in (partial or ())),
             time_stop_bars=time_stop,
             trailing_mode=trailing_mode,
             trailing_k=trailing_k,
@@ -75,6 +160,23 @@ class ExecPolicy:
         )
 
 
+@dataclass(slots=True)
+class BracketState:
+    """심볼별 살아있는 브래킷 상태 (트레일/타임스탑/정리용)"""
+    sl_id: Optional[int] = None
+    sl_price: float = 0.0
+    tp_ids: List[str] = field(default_factory=list)
+    entry_price: float = 0.0
+    side: str = "BUY"
+    bars_held: int = 0
+    quantity: float = 0.0
+
+
+@functools.lru_cache(maxsize=256)
+def _exec_policy_cached(symbol: str, market_regime: str, version: int) -> ExecPolicy:
+    return ExecPolicy._build(symbol, market_regime)
+
+
 # -----------------------------------------------------------------------------
 # TradingEngine — 단일 소스: 멀티 TP, 트레일링, 타임스탑, 브래킷 동기화
 # -----------------------------------------------------------------------------
@@ -89,23 +191,61 @@ class TradingEngine:
     - quantity가 미지정이면 calc_order_qty()로 **절대 수량** 자동 계산
     """
 
-    def __init__(self, client: Client):
+    def __init__(self, client: Optional[AsyncClient] = None):
+        # ▼▼▼ [수정] 비동기 클라이언트(aiohttp) — main.setup_hook에서 주입 ▼▼▼
         self.client = client
-        self._live_brackets: Dict[str, Dict] = {}  # symbol -> {sl_id, tp_ids[], entry_price, side, bars_held, quantity}
+        self._live_brackets: Dict[str, BracketState] = {}
+        # 심볼별 락 — on_tick 갱신과 청산 정리가 겹쳐 SL이 중복 발행되는 것을 방지
+        self._locks: defaultdict[str, asyncio.Lock] = defaultdict(asyncio.Lock)
+        # 청산된 BracketState 재사용 풀 (할당 churn 감소)
+        self._bracket_pool: List[BracketState] = []
         # 레버리지 맵(심볼별), 기본 10x
         self._leverage_by_symbol: Dict[str, float] = {}
+        # 거래소에 실제 반영된 레버리지 — 같으면 futures_change_leverage 호출 생략
+        self._exchange_leverage: Dict[str, int] = {}
         # 거래소 심볼 필터 캐시
         self._filters_cache: Dict[str, Dict[str, float]] = {}
-        print("🚚 [V5.0] 트레이딩 엔진 초기화(리스크 사이징 통합, 멀티TP/트레일/타임스탑, JSON 설정).")
+        # 심볼별 진행 중 거래의 PK (청산 기록 시 PK 조회로 바로 찾는다)
+        self._open_trade_id: Dict[str, int] = {}
+        # clientOrderId 유일성 보장용 일련번호 (같은 ms 안의 다중 주문 대비)
+        self._cid_counter = itertools.count()
+        # 주문/가중치 토큰 버킷 — 버스트 시 429/418 밴 대신 짧게 대기
+        self._order_limiter = AsyncLimiter(ORDER_RATE_PER_SEC, 1)
+        self._weight_limiter = AsyncLimiter(WEIGHT_PER_MIN, 60)
+        # 포지션 조회 캐시: symbol -> (monotonic ts, position dict)
+        self._pos_cache: Dict[str, Tuple[float, dict]] = {}
+        # 유저데이터 스트림(웹소켓)이 밀어주는 포지션/체결가 — REST 폴링 대체
+        self._positions: Dict[str, dict] = {}
+        # 스트림 연결 직후 전체 스냅샷을 받았으면 True — 맵에 없는 심볼은 무포지션으로 간주
+        self._positions_synced = False
+        self._fill_px: Dict[str, float] = {}
+        # 최근 관측 가격(틱/체결) — 파이프라인 진입 시 SL/TP 추정 기준
+        self._last_px: Dict[str, float] = {}
+        self._last_px_at: Dict[str, float] = {}
+        self._user_stream_task: Optional[asyncio.Task] = None
+        logger.info("🚚 [V5.0] 트레이딩 엔진 초기화(리스크 사이징 통합, 멀티TP/트레일/타임스탑, JSON 설정).")
+
+    async def warmup(self) -> None:
+        """
+        keep-alive 커넥션을 미리 열고(futures_ping) 거래소 필터를 적재한다.
+        첫 주문이 TCP/TLS 핸드셰이크 비용을 떠안지 않도록 기동 시 1회 호출.
+        """
+        try:
+            await self.client.futures_ping()
+        except Exception as e:
+            logger.warning("바이낸스 선물 ping 실패: %s", e)
+        if not self._filters_cache:
+            await self._load_exchange_filters()
 
     # -------------------------------------------------------------------------
     # 외부에서 호출: 신규 진입 + 브래킷 자동 부착
     # -------------------------------------------------------------------------
-    def open_with_bracket(
+    async def open_with_bracket(
         self,
         symbol: str,
         side: str,                      # "BUY" | "SELL"
         entry_atr: float,
+        market_regime: str,             # "BULL" | "BEAR" | "SIDEWAYS" — 실행정책 선택
         quantity: Optional[float] = None,   # None 또는 <=0이면 calc_order_qty()로 자동 계산
         entry_type: str = "MARKET",         # "MARKET"|"LIMIT"
         entry_price: Optional[float] = None,
@@ -119,24 +259,30 @@ class TradingEngine:
         4) SL/TP 브래킷 부착(부분익절 가능)
         5) DB 기록/이벤트 발행
         """
-        policy = ExecPolicy.from_config(symbol)
+        # 입력 검증은 설정/필터/REST 조회보다 먼저 (잘못된 호출이 왕복 비용을 치르지 않도록)
         side = side.upper()
-        close_side = "BUY" if side == "SELL" else "SELL"
+        close_side = OPPOSITE[side]
+        qty = float(quantity or 0.0)
+        if qty <= 0 and (entry_atr is None or float(entry_atr) <= 0):
+            logger.warning("⚠️ %s 리스크 사이징 실패: entry_atr가 필요합니다.", symbol)
+            return None
+
+        policy = ExecPolicy.from_config(symbol, market_regime)
+        filt = await self._get_symbol_filters(symbol)
+        if qty > 0:
+            qty = self._quantize_qty(symbol, qty)
+            if qty < float(filt["min_qty"]) or qty <= 0:
+                logger.warning("⚠️ %s 수량 %s < 최소 수량 %s → 진입 스킵", symbol, quantity, filt["min_qty"])
+                return None
 
         # --- 0) 리스크 기반 수량 계산 (quantity가 없거나 ≤0일 때만) -------------------------
-        qty = float(quantity or 0.0)
         if qty <= 0:
-            # 필수 값 체크
-            if entry_atr is None or float(entry_atr) <= 0:
-                print(f"⚠️ {symbol} 리스크 사이징 실패: entry_atr가 필요합니다.")
-                return None
-            last_px = self._fetch_last_price(symbol) if entry_type != "LIMIT" or not entry_price else float(entry_price)
+            last_px = await self._fetch_last_price(symbol) if entry_type != "LIMIT" or not entry_price else float(entry_price)
             if last_px <= 0:
-                print(f"⚠️ {symbol} 리스크 사이징 실패: 참조 가격이 유효하지 않음.")
+                logger.warning("⚠️ %s 리스크 사이징 실패: 참조 가격이 유효하지 않음.", symbol)
                 return None
 
-            filt = self._get_symbol_filters(symbol)
-            equity = self.get_equity_usdt()
+            equity = await self.get_equity_usdt()
             lev = self._get_leverage(symbol)
             margin = 1.0 / max(1.0, lev)
 
@@ -153,246 +299,594 @@ class TradingEngine:
                 min_qty=float(filt["min_qty"]),
             )
             if qty <= 0:
-                print(f"⚠️ {symbol} sizing=0 → 진입 스킵 (equity={equity:.2f}, price={last_px:.4f})")
+                logger.warning("⚠️ %s sizing=0 → 진입 스킵 (equity=%.2f, price=%.4f)", symbol, equity, last_px)
                 return None
 
+        # --- 1') 파이프라인: 시장가 + 단일 TP면 진입/SL/TP를 batchOrders 1회로 ------------
+        if entry_type != "LIMIT" and not policy.partial and float(entry_atr or 0) > 0:
+            return await self._open_pipelined(
+                symbol, side, qty, float(entry_atr), policy, client_order_id_prefix, extra
+            )
+
         # --- 1) 진입 주문 ----------------------------------------------------------------
         try:
             if entry_type == "LIMIT":
                 assert entry_price is not None and entry_price > 0
-                entry = self.client.futures_create_order(
+                entry = await self._create_order(
                     symbol=symbol, side=side, type="LIMIT",
-                    price=round(float(entry_price), 6),
+                    price=self._quantize_price(symbol, float(entry_price)),
                     quantity=qty, timeInForce="GTC",
                     newClientOrderId=self._cid(symbol, client_order_id_prefix, "ENTRYL")
                 )
             else:
-                entry = self.client.futures_create_order(
-                    symbol=symbol, side=side, type="MARKET",
-                    quantity=qty,
-                    newClientOrderId=self._cid(symbol, client_order_id_prefix, "ENTRYM")
+                entry = await self._market_order(
+                    symbol, side, qty, self._cid(symbol, client_order_id_prefix, "ENTRYM")
                 )
-            print(f"➡️  {symbol} {side} {qty} 진입 전송 OK")
+            self._pos_cache.pop(symbol, None)
+            logger.info("➡️  %s %s %s 진입 전송 OK", symbol, side, qty)
         except BinanceAPIException as e:
-            print(f"🚨 진입 주문 실패: {symbol} {side} x{qty} — {e}")
+            logger.error("🚨 진입 주문 실패: %s %s x%s — %s", symbol, side, qty, e)
+            event_bus.safe_publish("ORDER_FAILURE", OrderFailed(symbol, str(e)))
             return None
 
         # --- 2) 체결가 산정 --------------------------------------------------------------
         try:
-            avg_px = float(entry.get("avgPrice") or 0) or self._fetch_last_price(symbol)
-            entry_px = round(avg_px, 6)
+            avg_px = float(entry.get("avgPrice") or 0) or await self._fetch_last_price(symbol)
+            entry_px = float(avg_px)
         except Exception:
-            entry_px = round(self._fetch_last_price(symbol), 6)
+            entry_px = float(await self._fetch_last_price(symbol))
 
         # --- 3) SL/TP 계산 및 주문 전송 ---------------------------------------------------
         sl_d = float(entry_atr) * policy.sl_atr_mult
         if sl_d <= 0:
-            print("⚠️ ATR 기반 SL 거리가 0 이하 — 브래킷 생략")
+            logger.warning("⚠️ ATR 기반 SL 거리가 0 이하 — 브래킷 생략")
             return entry
 
-        if side == "BUY":
-            sl_px = round(entry_px - sl_d, 6)
-            tp_base = round(entry_px + (sl_d * policy.rr), 6)
-        else:
-            sl_px = round(entry_px + sl_d, 6)
-            tp_base = round(entry_px - (sl_d * policy.rr), 6)
+        # 방향 부호(+1 롱 / -1 숏)로 한 번에 계산 후 tickSize로 양자화
+        sign = 1.0 if side == "BUY" else -1.0
+        sl_px = self._quantize_price(symbol, entry_px - sign * sl_d)
+        tp_base = self._quantize_price(symbol, entry_px + sign * sl_d * policy.rr)
 
+        # ▼▼▼ [수정] SL/TP를 한 번의 POST /fapi/v1/batchOrders로 묶어 전송 (최대 5건/요청) ▼▼▼
         # 3-1) SL(손절): reduceOnly + 수량 지정
-        try:
-            sl_order = self.client.futures_create_order(
+        bracket_params: List[Dict[str, Any]] = [dict(
+            symbol=symbol,
+            side=close_side,
+            type="STOP_MARKET",
+            stopPrice=sl_px,
+            reduceOnly=True,
+            quantity=qty,
+            newClientOrderId=self._cid(symbol, client_order_id_prefix, "SL")
+        )]
+
+        # 3-2) TP(익절): 단일 또는 멀티
+        if not policy.partial:
+            bracket_params.append(dict(
                 symbol=symbol,
                 side=close_side,
-                type="STOP_MARKET",
-                stopPrice=sl_px,
+                type="TAKE_PROFIT_MARKET",
+                stopPrice=tp_base,
                 reduceOnly=True,
                 quantity=qty,
-                newClientOrderId=self._cid(symbol, client_order_id_prefix, "SL")
-            )
-        except BinanceAPIException as e:
-            print(f"🚨 SL 주문 실패: {e}")
-            sl_order = {}
-
-        # 3-2) TP(익절): 단일 또는 멀티
-        tp_ids: List[str] = []
-        try:
-            if not policy.partial:
-                tp_single = self.client.futures_create_order(
+                newClientOrderId=self._cid(symbol, client_order_id_prefix, "TP")
+            ))
+        else:
+            # 멀티 TP: 0.5R/1.0R/1.5R 스텝 — 비중은 policy.partial에 따름
+            steps = [0.5, 1.0, 1.5] if len(policy.partial) == 3 else [1.0] * len(policy.partial)
+            # 수량 분할: 마지막 조각은 잔량 보정
+            remain = qty
+            for i, (w, m) in enumerate(zip(policy.partial, steps)):
+                if i < len(policy.partial) - 1:
+                    sub_qty = self._quantize_qty(symbol, qty * float(w))
+                else:
+                    sub_qty = self._quantize_qty(symbol, remain)  # 잔량 모두
+                remain -= sub_qty
+                sub_tp = self._quantize_price(symbol, self._scale_tp(entry_px, tp_base, side, mult=m))
+                bracket_params.append(dict(
                     symbol=symbol,
                     side=close_side,
                     type="TAKE_PROFIT_MARKET",
-                    stopPrice=tp_base,
+                    stopPrice=sub_tp,
                     reduceOnly=True,
-                    quantity=qty,
-                    newClientOrderId=self._cid(symbol, client_order_id_prefix, "TP")
+                    quantity=sub_qty,
+                    newClientOrderId=self._cid(symbol, client_order_id_prefix, f"TP{m}")
+                ))
+
+        results = await self._place_batch(bracket_params)
+
+        sl_order = results[0]
+        if isinstance(sl_order, BaseException) or "code" in sl_order:
+            logger.error("🚨 SL 주문 실패: %s", sl_order)
+            sl_order = {}
+
+        tp_ids: List[str] = []
+        for tp in results[1:]:
+            if isinstance(tp, BaseException) or "code" in tp:
+                logger.error("🚨 TP 주문 실패: %s", tp)
+                continue
+            if "orderId" in tp:
+                tp_ids.append(str(tp["orderId"]))
+        # ▲▲▲ [수정] ▲▲▲
+
+        await self._register_open(symbol, side, entry_px, qty, sl_order, sl_px, tp_base, tp_ids, extra,
+                                  entry_order_id=entry.get("orderId"))
+        return entry
+
+    async def _open_pipelined(self, symbol: str, side: str, qty: float, entry_atr: float,
+                              policy: ExecPolicy, client_order_id_prefix: Optional[str],
+                              extra: Optional[dict]) -> Optional[dict]:
+        """
+        진입(MARKET) + SL/TP(closePosition=true)를 batchOrders 1회로 전송한다.
+        SL/TP는 추정가(최근가) 기준으로 계산하고, 실제 체결가가 1 tick 넘게 어긋나면 SL만 재조정.
+        """
+        est_px = self._last_px.get(symbol)
+        if not est_px or time.monotonic() - self._last_px_at.get(symbol, 0.0) > LAST_PX_TTL:
+            est_px = await self._fetch_last_price(symbol) or est_px or 0.0
+        if est_px <= 0:
+            logger.warning("⚠️ %s 참조 가격이 유효하지 않아 진입 스킵", symbol)
+            return None
+        close_side = OPPOSITE[side]
+        sign = 1.0 if side == "BUY" else -1.0
+        sl_d = entry_atr * policy.sl_atr_mult
+        sl_px = self._quantize_price(symbol, est_px - sign * sl_d)
+        tp_base = self._quantize_price(symbol, est_px + sign * sl_d * policy.rr)
+
+        results = await self._place_batch([
+            dict(symbol=symbol, side=side, type="MARKET", quantity=qty, newOrderRespType="RESULT",
+                 newClientOrderId=self._cid(symbol, client_order_id_prefix, "ENTRYM")),
+            dict(symbol=symbol, side=close_side, type="STOP_MARKET", stopPrice=sl_px, closePosition=True,
+                 newClientOrderId=self._cid(symbol, client_order_id_prefix, "SL")),
+            dict(symbol=symbol, side=close_side, type="TAKE_PROFIT_MARKET", stopPrice=tp_base, closePosition=True,
+                 newClientOrderId=self._cid(symbol, client_order_id_prefix, "TP")),
+        ])
+        entry, sl_order, tp_order = results
+        self._pos_cache.pop(symbol, None)
+
+        if isinstance(entry, BaseException) or "code" in entry:
+            logger.error("🚨 진입 주문 실패: %s %s x%s — %s", symbol, side, qty, entry)
+            event_bus.safe_publish("ORDER_FAILURE", OrderFailed(symbol, str(entry)))
+            # 포지션 없이 남은 브래킷은 정리
+            orphan = [o.get("orderId") for o in (sl_order, tp_order) if isinstance(o, dict) and o.get("orderId")]
+            if orphan:
+                await asyncio.gather(
+                    *[self._cancel_order(symbol=symbol, orderId=oid) for oid in orphan],
+                    return_exceptions=True,
                 )
-                if "orderId" in tp_single:
-                    tp_ids.append(str(tp_single["orderId"]))
+            return None
+        logger.info("➡️  %s %s %s 진입+브래킷 전송 OK", symbol, side, qty)
+
+        entry_px = float(entry.get("avgPrice") or 0) or est_px
+        tp_ids: List[str] = []
+        if isinstance(tp_order, BaseException) or "code" in tp_order:
+            logger.error("🚨 TP 주문 실패: %s", tp_order)
+        elif "orderId" in tp_order:
+            tp_ids.append(str(tp_order["orderId"]))
+
+        if isinstance(sl_order, BaseException) or "code" in sl_order:
+            # 추정가 기준 SL이 거절됨(예: -2021 즉시 발동) → 실제 체결가 기준으로 새로 발행, 그래도 실패하면 청산
+            logger.error("🚨 SL 주문 실패: %s — 체결가 기준 재발행", sl_order)
+            sl_px = self._quantize_price(symbol, entry_px - sign * sl_d)
+            try:
+                sl_order = await self._create_order(
+                    symbol=symbol, side=close_side, type="STOP_MARKET", stopPrice=sl_px, closePosition=True,
+                    newClientOrderId=self._cid(symbol, client_order_id_prefix, "SLre")
+                )
+            except Exception as e:
+                logger.error("🚨 SL 재발행 실패, 포지션 청산: %s %s", symbol, e)
+                await self._flatten_unprotected(symbol, close_side, qty, tp_ids, client_order_id_prefix)
+                event_bus.safe_publish("ORDER_FAILURE", OrderFailed(symbol, f"SL placement failed: {e}"))
+                return None
+
+        # 체결가가 추정가와 1 tick 넘게 다르면 SL 재조정
+        tick = self._filters_cache.get(symbol, DEFAULT_FILTERS)["tick_size"]
+        new_sl = self._quantize_price(symbol, entry_px - sign * sl_d)
+        if sl_order.get("orderId") and abs(entry_px - est_px) > tick and new_sl != sl_px:
+            _, replaced = await asyncio.gather(
+                self._cancel_order(symbol=symbol, orderId=sl_order["orderId"]),
+                self._create_order(
+                    symbol=symbol, side=close_side, type="STOP_MARKET", stopPrice=new_sl, closePosition=True,
+                    newClientOrderId=self._cid(symbol, client_order_id_prefix, "SLadj")
+                ),
+                return_exceptions=True,
+            )
+            if isinstance(replaced, BaseException):
+                logger.error("🚨 SL 재조정 실패: %s", replaced)
             else:
-                # 멀티 TP: 0.5R/1.0R/1.5R 스텝 — 비중은 policy.partial에 따름
-                steps = [0.5, 1.0, 1.5] if len(policy.partial) == 3 else [1.0] * len(policy.partial)
-                # 수량 분할: 마지막 조각은 잔량 보정
-                remain = qty
-                for i, (w, m) in enumerate(zip(policy.partial, steps)):
-                    if i < len(policy.partial) - 1:
-                        sub_qty = round(qty * float(w), 6)
-                    else:
-                        sub_qty = round(remain, 6)  # 잔량 모두
-                    remain -= sub_qty
-                    sub_tp = self._scale_tp(entry_px, tp_base, side, mult=m)
-                    tp = self.client.futures_create_order(
-                        symbol=symbol,
-                        side=close_side,
-                        type="TAKE_PROFIT_MARKET",
-                        stopPrice=sub_tp,
-                        reduceOnly=True,
-                        quantity=sub_qty,
-                        newClientOrderId=self._cid(symbol, client_order_id_prefix, f"TP{m}")
-                    )
-                    if "orderId" in tp:
-                        tp_ids.append(str(tp["orderId"]))
-        except BinanceAPIException as e:
-            print(f"🚨 TP 주문 실패: {e}")
+                sl_order, sl_px = replaced, new_sl
 
-        # 상태 저장 (트레일/타임스탑/정리용)
-        self._live_brackets[symbol] = {
-            "sl_id": sl_order.get("orderId"),
-            "tp_ids": tp_ids,
-            "entry_price": entry_px,
-            "side": side,
-            "bars_held": 0,
-            "quantity": float(qty),
-        }
-
-        # --- 4) DB / 이벤트 --------------------------------------------------------------
-        self._record_trade_open(symbol, side, entry_px, float(qty), extra)
-        event_bus.safe_publish("ORDER_OPEN_SUCCESS", {
-            "symbol": symbol, "side": side, "qty": float(qty), "entry": entry_px,
-            "sl": sl_px, "tp": tp_base, "tp_ids": tp_ids
-        })
+        await self._register_open(symbol, side, entry_px, qty, sl_order, sl_px, tp_base, tp_ids, extra,
+                                  entry_order_id=entry.get("orderId"))
         return entry
 
+    async def _flatten_unprotected(self, symbol: str, close_side: str, qty: float, tp_ids: List[str],
+                                   client_order_id_prefix: Optional[str]) -> None:
+        """SL 없이 남은 포지션을 시장가(reduceOnly)로 정리하고 남은 TP를 취소"""
+        try:
+            await self._create_order(
+                symbol=symbol, side=close_side, type="MARKET", quantity=qty, reduceOnly=True,
+                newClientOrderId=self._cid(symbol, client_order_id_prefix, "FLAT")
+            )
+        except Exception as e:
+            logger.critical("🚨 무방비 포지션 청산 실패: %s %s", symbol, e)
+        finally:
+            self._pos_cache.pop(symbol, None)
+        if tp_ids:
+            await asyncio.gather(
+                *[self._cancel_order(symbol=symbol, orderId=oid) for oid in tp_ids],
+                return_exceptions=True,
+            )
+
+    async def _register_open(self, symbol: str, side: str, entry_px: float, qty: float, sl_order: dict,
+                             sl_px: float, tp_base: float, tp_ids: List[str], extra: Optional[dict],
+                             entry_order_id: Optional[int] = None) -> None:
+        # 상태 저장 (트레일/타임스탑/정리용)
+        async with self._locks[symbol]:
+            st = self._bracket_pool.pop() if self._bracket_pool else BracketState()
+            st.sl_id = sl_order.get("orderId")
+            st.sl_price = sl_px if st.sl_id else 0.0
+            st.tp_ids = tp_ids
+            st.entry_price = entry_px
+            st.side = side
+            st.bars_held = 0
+            st.quantity = float(qty)
+            self._live_brackets[symbol] = st
+
+        # DB / 이벤트 — 기록은 trade_writer 큐에 넣고 배치 커밋 (주문 경로에서 DB 대기 없음)
+        trade_writer.submit(
+            self._record_trade_open, symbol, side, entry_px, float(qty),
+            st.sl_price, tp_base, entry_order_id, extra, time.time_ns(),
+        )
+        event_bus.safe_publish("ORDER_OPEN_SUCCESS", OrderOpened(
+            symbol, side, float(qty), entry_px, sl_px, tp_base, tp_ids
+        ))
+
+    # -------------------------------------------------------------------------
+    # 구 인터페이스 호환 래퍼 (core/tasks, cogs, ui에서 사용)
+    # -------------------------------------------------------------------------
+    async def place_order(self, symbol: str, side: str, quantity: float, market_regime: str,
+                          client_order_id_prefix: Optional[str] = None) -> Optional[dict]:
+        """시장가 단순 진입 (ATR 브래킷 없음)"""
+        return await self.open_with_bracket(
+            symbol, side, entry_atr=0.0, market_regime=market_regime, quantity=quantity,
+            entry_type="MARKET", client_order_id_prefix=client_order_id_prefix,
+        )
+
+    async def place_order_with_bracket(self, symbol: str, side: str, quantity: float, leverage: float,
+                                       entry_atr: float, market_regime: str,
+                                       analysis_context: Optional[dict] = None) -> Optional[dict]:
+        """레버리지 설정 후 시장가 진입 + ATR 브래킷 부착"""
+        if not quantity or quantity <= 0:
+            logger.warning("⚠️ %s 주문 수량이 유효하지 않음 (%s) → 진입 스킵", symbol, quantity)
+            return None
+        await self.set_leverage(symbol, leverage)
+        return await self.open_with_bracket(
+            symbol, side, entry_atr=entry_atr, market_regime=market_regime, quantity=quantity,
+            entry_type="MARKET", extra=analysis_context,
+        )
+
+    async def close_all_positions(self) -> List[str]:
+        """보유 중인 모든 포지션을 동시에 시장가 청산하고, 대상 심볼 목록을 반환"""
+        if self._positions_synced:
+            positions = list(self._positions.values())
+        else:
+            try:
+                positions = await self.client.futures_position_information()
+            except Exception as e:
+                logger.error("🚨 포지션 조회 실패: %s", e)
+                return []
+        symbols = [p["symbol"] for p in positions if float(p.get("positionAmt", 0) or 0) != 0]
+        if symbols:
+            await self.close_batch(symbols, reason="긴급 전체 청산")
+        return symbols
+
+    async def close_batch(self, symbols: List[str], reason: str = "manual") -> List[str]:
+        """
+        여러 심볼을 동시에 전량 청산하고, PnL은 NumPy로 한 번에 계산해 DB에 일괄 반영.
+        반환: 실제로 청산 주문이 체결된 심볼 목록
+        """
+        results = await asyncio.gather(
+            *[self._send_close(sym, None, None) for sym in symbols],
+            return_exceptions=True,
+        )
+        closed: List[str] = []
+        exit_px: List[float] = []
+        events: List[OrderClosed] = []
+        for sym, r in zip(symbols, results):
+            if isinstance(r, BaseException):
+                logger.error("🚨 청산 실패: %s %s", sym, r)
+            elif r is not None:
+                _, q, _, px = r
+                closed.append(sym)
+                exit_px.append(px)
+                events.append(OrderClosed(sym, reason, False, px, q))
+        if closed:
+            trade_writer.submit(
+                self._record_trades_close_batch, closed, np.asarray(exit_px, dtype=np.float64), reason, time.time_ns()
+            )
+            for ev in events:
+                event_bus.safe_publish("ORDER_CLOSE_SUCCESS", ev)
+        return closed
+
     # -------------------------------------------------------------------------
     # 외부에서 호출: 포지션 종료(전량/부분) → 잔여 브래킷 정리
     # -------------------------------------------------------------------------
-    def close_position(
+    async def close_position(
         self,
-        symbol: str,
+        symbol: Any,                        # 심볼 문자열 또는 Trade 객체(구 호출부 호환)
         reason: str = "manual",
         quantity: Optional[float] = None,   # None이면 전체
         client_order_id_prefix: Optional[str] = None,
+        quantity_to_close: Optional[float] = None,  # 구 인터페이스 호환용 별칭
     ) -> Optional[dict]:
         """
         시장가 청산 → 잔여 SL/TP 취소/정리 → DB/이벤트
         """
+        if not isinstance(symbol, str):
+            symbol = symbol.symbol
+        if quantity is None:
+            quantity = quantity_to_close
         try:
-            pos = self._fetch_position(symbol)
-            amt = abs(float(pos.get("positionAmt", 0)))
-            if amt <= 0:
-                print(f"ℹ️ {symbol} 현재 보유 없음")
+            sent = await self._send_close(symbol, quantity, client_order_id_prefix)
+            if sent is None:
                 return None
-
-            # 청산 수량 결정
-            q = amt if quantity is None else min(float(quantity), amt)
-            close_side = "BUY" if float(pos["positionAmt"]) < 0 else "SELL"
-
-            res = self.client.futures_create_order(
-                symbol=symbol, side=close_side, type="MARKET", quantity=q,
-                newClientOrderId=self._cid(symbol, client_order_id_prefix, "CLS")
-            )
-
-            # 잔량 확인 후 브래킷 정리
-            left = amt - q
-            if left <= 1e-12:
-                self._cancel_brackets(symbol)  # 전량 청산 시 전부 취소
-            else:
-                # 부분청산이면 수량 동기화가 필요할 수 있음(상황에 따라 TP 수량을 재발행/유지)
-                pass
+            res, q, left, last_px = sent
 
             # DB / 이벤트
-            last_px = self._fetch_last_price(symbol)
-            self._record_trade_close(symbol, last_px, reason, is_partial=(left > 0))
-            event_bus.safe_publish("ORDER_CLOSE_SUCCESS", {
-                "symbol": symbol, "reason": reason, "is_partial": left > 0
-            })
+            trade_writer.submit(self._record_trade_close, symbol, last_px, reason, left > 0, time.time_ns())
+            event_bus.safe_publish("ORDER_CLOSE_SUCCESS", OrderClosed(symbol, reason, left > 0, last_px, q))
             return res
         except BinanceAPIException as e:
-            print(f"🚨 청산 실패: {e}")
+            logger.error("🚨 청산 실패: %s", e)
+            return None
+
+    async def _send_close(self, symbol: str, quantity: Optional[float],
+                          client_order_id_prefix: Optional[str]) -> Optional[Tuple[dict, float, float, float]]:
+        """시장가 청산 주문 + 브래킷 정리. 반환: (주문 응답, 청산 수량, 잔량, 체결가) / 보유 없으면 None"""
+        pos = await self._fetch_position(symbol)
+        amt = abs(float(pos.get("positionAmt", 0)))
+        if amt <= 0:
+            logger.info("ℹ️ %s 현재 보유 없음", symbol)
             return None
 
+        # 청산 수량 결정
+        q = amt if quantity is None else min(float(quantity), amt)
+        close_side = "BUY" if float(pos["positionAmt"]) < 0 else "SELL"
+
+        res = await self._market_order(
+            symbol, close_side, q, self._cid(symbol, client_order_id_prefix, "CLS")
+        )
+        self._pos_cache.pop(symbol, None)
+
+        # 잔량 확인 후 브래킷 정리
+        left = amt - q
+        if left <= 1e-12:
+            await self._cancel_brackets(symbol)  # 전량 청산 시 전부 취소
+        else:
+            # 부분청산이면 수량 동기화가 필요할 수 있음(상황에 따라 TP 수량을 재발행/유지)
+            pass
+
+        # 체결가는 주문 응답/유저 스트림 값을 우선 사용 (REST 재조회 생략)
+        last_px = (
+            float(res.get("avgPrice") or 0)
+            or self._fill_px.get(symbol)
+            or await self._fetch_last_price(symbol)
+        )
+        return res, q, left, last_px
+
     # -------------------------------------------------------------------------
     # 주기 호출: 타임스탑/트레일링 스탑 업데이트 (캔들 close 혹은 틱마다)
     # -------------------------------------------------------------------------
-    def on_tick(self, symbol: str, last_price: float, last_atr: Optional[float] = None):
+    async def on_tick(self, symbol: str, last_price: float, market_regime: str, last_atr: Optional[float] = None):
         """
         캔들 close 또는 틱 업데이트 때 호출해 브래킷을 갱신한다.
+        market_regime은 의사결정 루프의 현재 거시 레짐 (실행정책 선택).
         last_atr를 넘겨주면 ATR 트레일링에 사용한다.
         """
+        self._last_px[symbol] = float(last_price)
+        self._last_px_at[symbol] = time.monotonic()
         st = self._live_brackets.get(symbol)
         if not st:
             return
-        policy = ExecPolicy.from_config(symbol)
+        policy = ExecPolicy.from_config(symbol, market_regime)
 
-        # 1) 타임스탑
+        lock = self._locks[symbol]
+
+        # 1) 타임스탑 (청산은 락 밖에서 — close_position이 같은 락을 다시 잡는다)
         if policy.time_stop_bars and policy.time_stop_bars > 0:
-            st["bars_held"] = int(st.get("bars_held", 0)) + 1
-            if st["bars_held"] >= policy.time_stop_bars:
-                print(f"⏱️  타임스탑: {symbol} k={policy.time_stop_bars}")
-                self.close_position(symbol, reason="time_stop")
+            async with lock:
+                st.bars_held += 1
+                expired = st.bars_held >= policy.time_stop_bars
+            if expired:
+                logger.info("⏱️  타임스탑: %s k=%s", symbol, policy.time_stop_bars)
+                await self.close_position(symbol, reason="time_stop")
                 return
 
         # 2) 트레일링
         if policy.trailing_mode != "off":
-            try:
-                if policy.trailing_mode == "atr":
-                    atr = float(last_atr or 0.0)
-                    if atr <= 0:
-                        return
-                    trail = atr * max(0.0, policy.trailing_k)
-                else:
-                    trail = float(last_price) * max(0.0, policy.trailing_k) / 100.0
+            async with lock:
+                # 락을 기다리는 사이 청산되었으면 중단
+                if self._live_brackets.get(symbol) is not st:
+                    return
+                await self._trail_stop(symbol, st, policy, last_price, last_atr)
 
-                entry = float(st["entry_price"])
-                side = st["side"]
-                close_side = "BUY" if side == "SELL" else "SELL"
+    async def on_batch_tick(self, prices: Dict[str, float], market_regime: str,
+                            atrs: Optional[Dict[str, float]] = None):
+        """
+        워치리스트 전체를 한 번에 갱신한다. (market_regime: 현재 거시 레짐 — 실행정책 선택)
+        - 타임스탑 만료 심볼은 동시에 청산
+        - 트레일링 SL은 NumPy로 일괄 계산 → tick 이상 움직인 심볼만 재발행 후 기존 SL 취소
+          (신규 SL은 batchOrders 1회로 전송)
+        """
+        atrs = atrs or {}
+        self._last_px.update(prices)
+        self._last_px_at.update(dict.fromkeys(prices, time.monotonic()))
+        symbols = [sym for sym in prices if sym in self._live_brackets]
+        if not symbols:
+            return
 
-                # SL 주문 취소 → 재발행
-                if st.get("sl_id"):
-                    try:
-                        self.client.futures_cancel_order(symbol=symbol, orderId=st["sl_id"])
-                    except BinanceAPIException:
-                        pass
+        # 1) 타임스탑
+        expired: List[str] = []
+        trailing: List[Tuple[str, BracketState, ExecPolicy]] = []
+        for sym in symbols:
+            st = self._live_brackets[sym]
+            policy = ExecPolicy.from_config(sym, market_regime)
+            if policy.time_stop_bars and policy.time_stop_bars > 0:
+                st.bars_held += 1
+                if st.bars_held >= policy.time_stop_bars:
+                    expired.append(sym)
+                    continue
+            if policy.trailing_mode != "off":
+                trailing.append((sym, st, policy))
 
-                if side == "BUY":
-                    new_sl = round(max(entry, float(last_price) - trail), 6)  # BE 보호
-                else:
-                    new_sl = round(min(entry, float(last_price) + trail), 6)
+        if expired:
+            logger.info("⏱️  타임스탑: %s", expired)
+            await asyncio.gather(
+                *[self.close_position(sym, reason="time_stop") for sym in expired],
+                return_exceptions=True,
+            )
+        if not trailing:
+            return
 
-                # 현재 보유 수량
-                pos = self._fetch_position(symbol)
+        # 2) 트레일링 — 벡터화 계산
+        syms = [t[0] for t in trailing]
+        px = np.fromiter((float(prices[sym]) for sym in syms), dtype=np.float64, count=len(syms))
+        trail = np.fromiter(
+            (
+                float(atrs.get(sym) or 0.0) * max(0.0, pol.trailing_k) if pol.trailing_mode == "atr"
+                else float(prices[sym]) * max(0.0, pol.trailing_k) / 100.0
+                for sym, _, pol in trailing
+            ),
+            dtype=np.float64, count=len(syms),
+        )
+        entries = np.fromiter((st.entry_price for _, st, _ in trailing), dtype=np.float64, count=len(syms))
+        is_long = np.fromiter((st.side == "BUY" for _, st, _ in trailing), dtype=bool, count=len(syms))
+        current = np.fromiter((st.sl_price for _, st, _ in trailing), dtype=np.float64, count=len(syms))
+        ticks = np.fromiter(
+            (self._filters_cache.get(sym, DEFAULT_FILTERS)["tick_size"] for sym in syms),
+            dtype=np.float64, count=len(syms),
+        )
+
+        new_sls = np.where(is_long, np.maximum(entries, px - trail), np.minimum(entries, px + trail))
+        # 유리한 방향(롱↑/숏↓)으로 TRAIL_MIN_TICKS 이상 움직인 경우만 갱신
+        moved = np.where(is_long, new_sls - current, current - new_sls)
+        changed = (trail > 0) & ((current <= 0) | (moved >= ticks * TRAIL_MIN_TICKS))
+        idx = np.flatnonzero(changed)
+        if idx.size == 0:
+            return
+
+        targets = [(syms[i], trailing[i][1], self._quantize_price(syms[i], float(new_sls[i]))) for i in idx]
+        async with AsyncExitStack() as stack:
+            for sym, _, _ in sorted(targets, key=lambda t: t[0]):
+                await stack.enter_async_context(self._locks[sym])
+            # 락 대기 중 청산된 심볼 제외
+            targets = [t for t in targets if self._live_brackets.get(t[0]) is t[1]]
+            positions = await asyncio.gather(*[self._fetch_position(sym) for sym, _, _ in targets])
+
+            orders, placed = [], []
+            for (sym, st, new_sl), pos in zip(targets, positions):
                 amt = abs(float(pos.get("positionAmt", 0)))
-                if amt > 0:
-                    new_sl_order = self.client.futures_create_order(
-                        symbol=symbol, side=close_side, type="STOP_MARKET",
-                        stopPrice=new_sl, reduceOnly=True, quantity=amt,
-                        newClientOrderId=self._cid(symbol, None, "SLtrail")
-                    )
-                    st["sl_id"] = new_sl_order.get("orderId")
-                    self._live_brackets[symbol] = st
-                    print(f"🧵 트레일 SL 갱신: {symbol} → {new_sl}")
-            except BinanceAPIException as e:
-                print(f"🚨 트레일링 실패: {e}")
+                if amt <= 0:
+                    continue
+                orders.append(dict(
+                    symbol=sym, side=OPPOSITE[st.side], type="STOP_MARKET",
+                    stopPrice=new_sl, reduceOnly=True, quantity=amt,
+                    newClientOrderId=self._cid(sym, None, "SLtrail")
+                ))
+                placed.append((sym, st, new_sl))
+
+            if not orders:
+                return
+            # 새 SL을 먼저 발행하고, 발행에 성공한 행의 기존 SL만 취소 (실패 시 기존 SL 유지 → 무방비 구간 없음)
+            try:
+                batch_res = await self._place_batch(orders)
+            except Exception as e:
+                batch_res = [e] * len(placed)
+            cancels = []
+            for (sym, st, new_sl), res in zip(placed, batch_res):
+                if isinstance(res, BaseException) or "code" in res:
+                    logger.error("🚨 트레일링 실패: %s %s", sym, res)
+                    continue
+                old_id = st.sl_id
+                st.sl_id = res.get("orderId")
+                st.sl_price = new_sl
+                if old_id:
+                    cancels.append(self._cancel_order(symbol=sym, orderId=old_id))
+                logger.info("🧵 트레일 SL 갱신: %s → %s", sym, new_sl)
+            if cancels:
+                await asyncio.gather(*cancels, return_exceptions=True)
+
+    async def _trail_stop(self, symbol: str, st: BracketState, policy: ExecPolicy,
+                          last_price: float, last_atr: Optional[float]) -> None:
+        """새 SL 발행 → 기존 SL 취소 (호출자가 심볼 락을 잡고 있어야 한다)"""
+        try:
+            if policy.trailing_mode == "atr":
+                atr = float(last_atr or 0.0)
+                if atr <= 0:
+                    return
+                trail = atr * max(0.0, policy.trailing_k)
+            else:
+                trail = float(last_price) * max(0.0, policy.trailing_k) / 100.0
+
+            entry = st.entry_price
+            side = st.side
+            close_side = OPPOSITE[side]
+
+            if side == "BUY":
+                new_sl = max(entry, float(last_price) - trail)  # BE 보호
+            else:
+                new_sl = min(entry, float(last_price) + trail)
+            new_sl = self._quantize_price(symbol, new_sl)
+
+            # 변화가 TRAIL_MIN_TICKS 미만이거나 불리한 방향이면 REST 호출 없이 종료
+            if st.sl_price > 0:
+                tick = self._filters_cache.get(symbol, DEFAULT_FILTERS)["tick_size"]
+                moved = new_sl - st.sl_price if side == "BUY" else st.sl_price - new_sl
+                if moved < tick * TRAIL_MIN_TICKS:
+                    return
+
+            # 현재 보유 수량
+            pos = await self._fetch_position(symbol)
+            amt = abs(float(pos.get("positionAmt", 0)))
+
+            if amt <= 0:
+                return
+
+            # 새 SL 발행 → 성공했을 때만 기존 SL 취소 (실패 시 기존 SL이 그대로 남아 무방비 구간 없음)
+            try:
+                new_sl_order = await self._create_order(
+                    symbol=symbol, side=close_side, type="STOP_MARKET",
+                    stopPrice=new_sl, reduceOnly=True, quantity=amt,
+                    newClientOrderId=self._cid(symbol, None, "SLtrail")
+                )
+            finally:
+                self._pos_cache.pop(symbol, None)
+            old_id = st.sl_id
+            st.sl_id = new_sl_order.get("orderId")
+            st.sl_price = new_sl
+            logger.info("🧵 트레일 SL 갱신: %s → %s", symbol, new_sl)
+            if old_id:
+                try:
+                    await self._cancel_order(symbol=symbol, orderId=old_id)
+                except Exception as e:
+                    logger.warning("⚠️ 기존 SL 취소 실패: %s %s", symbol, e)
+        except BinanceAPIException as e:
+            logger.error("🚨 트레일링 실패: %s", e)
 
     # -------------------------------------------------------------------------
     # 레버리지/심볼 필터/자산 평가
     # -------------------------------------------------------------------------
-    def set_leverage(self, symbol: str, leverage: float):
+    async def set_leverage(self, symbol: str, leverage: float):
         try:
             lev = max(1.0, float(leverage))
         except Exception:
             lev = 10.0
         self._leverage_by_symbol[symbol] = lev
+        target = int(round(lev))
+        if self._exchange_leverage.get(symbol) == target:
+            return
         try:
-            self.client.futures_change_leverage(symbol=symbol, leverage=int(round(lev)))
+            res = await self.client.futures_change_leverage(symbol=symbol, leverage=target)
+            self._exchange_leverage[symbol] = int(res.get("leverage", target)) if isinstance(res, dict) else target
         except Exception:
             # 권한 없거나 현물계정이면 무시
             pass
@@ -400,44 +894,54 @@ class TradingEngine:
     def _get_leverage(self, symbol: str) -> float:
         return float(self._leverage_by_symbol.get(symbol, 10.0))
 
-    def _get_symbol_filters(self, symbol: str) -> Dict[str, float]:
+    async def _get_symbol_filters(self, symbol: str) -> Dict[str, float]:
         """
-        거래소 심볼 필터(최소 주문가치, 스텝, 최소수량)를 캐싱하여 리턴.
+        거래소 심볼 필터(최소 주문가치, tick/step, 최소수량, 정밀도)를 캐싱하여 리턴.
+        최초 1회 futures_exchange_info()로 전 심볼을 한 번에 적재한다.
         """
-        if symbol in self._filters_cache:
-            return self._filters_cache[symbol]
+        if not self._filters_cache:
+            await self._load_exchange_filters()
+        return self._filters_cache.get(symbol, DEFAULT_FILTERS)
 
-        min_notional = 5.0
-        qty_step = 1e-6
-        min_qty = 1e-6
+    async def _load_exchange_filters(self) -> None:
         try:
-            info = self.client.get_symbol_info(symbol)
-            for flt in info.get("filters", []):
+            info = await self.client.futures_exchange_info()
+        except Exception as e:
+            logger.warning("거래소 필터 조회 실패: %s → 기본값 사용", e)
+            return
+
+        for sym in info.get("symbols", []):
+            filt = dict(DEFAULT_FILTERS)
+            for flt in sym.get("filters", []):
                 t = flt.get("filterType")
                 if t in ("NOTIONAL", "MIN_NOTIONAL"):
                     mn = flt.get("minNotional") or flt.get("notional")
                     if mn is not None:
-                        min_notional = float(mn)
-                if t == "LOT_SIZE":
-                    if flt.get("stepSize"): qty_step = float(flt["stepSize"])
-                    if flt.get("minQty"):   min_qty  = float(flt["minQty"])
-        except Exception as e:
-            print(f"[{symbol}] 심볼 필터 조회 실패: {e} → 기본값 사용")
+                        filt["min_notional"] = float(mn)
+                elif t == "LOT_SIZE":
+                    if flt.get("stepSize"): filt["qty_step"] = float(flt["stepSize"])
+                    if flt.get("minQty"):   filt["min_qty"]  = float(flt["minQty"])
+                elif t == "PRICE_FILTER":
+                    if flt.get("tickSize"): filt["tick_size"] = float(flt["tickSize"])
+            filt["price_precision"] = _step_decimals(filt["tick_size"])
+            filt["qty_precision"] = _step_decimals(filt["qty_step"])
+            self._filters_cache[sym["symbol"]] = filt
+
+    def _quantize_price(self, symbol: str, px: float) -> float:
+        f = self._filters_cache.get(symbol, DEFAULT_FILTERS)
+        return _quantize(px, f["tick_size"], int(f["price_precision"]))
 
-        self._filters_cache[symbol] = {
-            "min_notional": min_notional,
-            "qty_step": qty_step,
-            "min_qty": min_qty,
-        }
-        return self._filters_cache[symbol]
+    def _quantize_qty(self, symbol: str, qty: float) -> float:
+        f = self._filters_cache.get(symbol, DEFAULT_FILTERS)
+        return _quantize(qty, f["qty_step"], int(f["qty_precision"]))
 
-    def get_equity_usdt(self) -> float:
+    async def get_equity_usdt(self) -> float:
         """
         계좌 평가금액(USDT). 거래소 API에 맞게 구현하세요.
         (바이낸스 선물 예시)
         """
         try:
-            bal = self.client.futures_account_balance()
+            bal = await self.client.futures_account_balance()
             for b in bal:
                 if (b.get("asset") or "").upper() in ("USDT", "BUSD", "USDC", "FDUSD", "TUSD"):
                     return float(b.get("balance", 0) or 0.0)
@@ -449,8 +953,9 @@ class TradingEngine:
     # 내부 유틸
     # -------------------------------------------------------------------------
     def _cid(self, symbol: str, prefix: Optional[str], tag: str) -> str:
-        t = int(datetime.now(timezone.utc).timestamp() * 1000)
-        return f"{(prefix or 'TE')}-{symbol}-{tag}-{t}"
+        t = time.time_ns() // 1_000_000
+        n = next(self._cid_counter)
+        return f"{(prefix or 'TE')}-{symbol}-{tag}-{t}-{n}"
 
     def _scale_tp(self, entry_px: float, tp_base: float, side: str, mult: float) -> float:
         """
@@ -458,87 +963,266 @@ class TradingEngine:
         """
         if mult == 1.0:
             return tp_base
-        if side == "BUY":
-            r_unit = tp_base - entry_px
-            return round(entry_px + r_unit * mult, 6)
-        else:
-            r_unit = entry_px - tp_base
-            return round(entry_px - r_unit * mult, 6)
+        # (tp_base - entry) 자체가 방향 부호를 포함하므로 롱/숏 공통식
+        return entry_px + (tp_base - entry_px) * mult
 
-    def _cancel_brackets(self, symbol: str):
-        st = self._live_brackets.pop(symbol, None)
-        if not st:
-            return
-        # SL 취소
-        sl_id = st.get("sl_id")
-        if sl_id:
-            try:
-                self.client.futures_cancel_order(symbol=symbol, orderId=sl_id)
-            except BinanceAPIException:
-                pass
-        # TP 취소
-        for oid in st.get("tp_ids", []):
+    async def _cancel_brackets(self, symbol: str):
+        self._pos_cache.pop(symbol, None)
+        async with self._locks[symbol]:
+            st = self._live_brackets.pop(symbol, None)
+            if not st:
+                return
+            # SL/TP 취소 — 동시 전송
+            order_ids = [oid for oid in [st.sl_id, *st.tp_ids] if oid]
+            if order_ids:
+                await asyncio.gather(
+                    *[self._cancel_order(symbol=symbol, orderId=oid) for oid in order_ids],
+                    return_exceptions=True,
+                )
+            # 재사용 풀로 반납
+            st.sl_id = None
+            st.sl_price = 0.0
+            st.tp_ids = []
+            self._bracket_pool.append(st)
+
+    async def _create_order(self, **params) -> dict:
+        async with self._order_limiter:
+            async with self._weight_limiter:
+                return await self.client.futures_create_order(**params)
+
+    async def _market_order(self, symbol: str, side: str, quantity: float, client_order_id: str) -> dict:
+        """시장가 주문 — 클라이언트가 템플릿 경로(futures_market_order)를 지원하면 그쪽을 사용"""
+        fast = getattr(self.client, "futures_market_order", None)
+        async with self._order_limiter:
+            async with self._weight_limiter:
+                if fast is not None:
+                    return await fast(symbol, side, quantity, client_order_id)
+                return await self.client.futures_create_order(
+                    symbol=symbol, side=side, type="MARKET", quantity=quantity,
+                    newOrderRespType="RESULT", newClientOrderId=client_order_id,
+                )
+
+    async def _cancel_order(self, **params) -> dict:
+        async with self._weight_limiter:
+            return await self.client.futures_cancel_order(**params)
+
+    async def _place_batch(self, orders: List[Dict[str, Any]]) -> List[Any]:
+        """
+        POST /fapi/v1/batchOrders — 5건씩 묶어 전송하고 입력 순서대로 결과를 돌려준다.
+        실패한 건은 {"code":..., "msg":...} 또는 예외 객체로 채워진다.
+        """
+        for o in orders:
+            self._pos_cache.pop(o.get("symbol"), None)
+        results: List[Any] = []
+        for i in range(0, len(orders), BATCH_ORDER_LIMIT):
+            chunk = [
+                {k: _batch_value(v) for k, v in o.items() if v is not None}
+                for o in orders[i:i + BATCH_ORDER_LIMIT]
+            ]
             try:
-                self.client.futures_cancel_order(symbol=symbol, orderId=oid)
-            except BinanceAPIException:
-                pass
+                # batchOrders는 주문 수만큼 주문 한도를, 요청당 가중치 5를 소모
+                await self._order_limiter.acquire(len(chunk))
+                await self._weight_limiter.acquire(5)
+                res = await self.client.futures_place_batch_order(batchOrders=chunk)
+                results.extend(res if isinstance(res, list) else [res] * len(chunk))
+            except BinanceAPIException as e:
+                results.extend([e] * len(chunk))
+        return results
 
-    def _fetch_last_price(self, symbol: str) -> float:
+    async def _fetch_last_price(self, symbol: str) -> float:
         try:
-            ob = self.client.futures_symbol_ticker(symbol=symbol)
-            return float(ob["price"])
+            ob = await self.client.futures_symbol_ticker(symbol=symbol)
+            px = float(ob["price"])
+            self._last_px[symbol] = px
+            self._last_px_at[symbol] = time.monotonic()
+            return px
         except Exception:
             return 0.0
 
-    def _fetch_position(self, symbol: str) -> dict:
+    async def _fetch_position(self, symbol: str) -> dict:
+        """
+        포지션 조회 — 유저 스트림 값이 있으면 dict 조회만,
+        없으면 POSITION_CACHE_TTL 이내 캐시, 그 외엔 REST 호출
+        """
+        streamed = self._positions.get(symbol)
+        if streamed is not None:
+            return streamed
+        if self._positions_synced:
+            return {"symbol": symbol, "positionAmt": 0}
+        cached = self._pos_cache.get(symbol)
+        now = time.monotonic()
+        if cached and now - cached[0] < POSITION_CACHE_TTL:
+            return cached[1]
         try:
-            info = self.client.futures_position_information(symbol=symbol)
+            info = await self.client.futures_position_information(symbol=symbol)
             if info:
+                self._pos_cache[symbol] = (now, info[0])
                 return info[0]
         except Exception:
             pass
         return {"positionAmt": 0}
 
+    # -------------------------------------------------------------------------
+    # 유저데이터 스트림: ACCOUNT_UPDATE/ORDER_TRADE_UPDATE로 포지션 상태 유지
+    # -------------------------------------------------------------------------
+    def start_user_stream(self) -> None:
+        if self._user_stream_task is None or self._user_stream_task.done():
+            self._user_stream_task = asyncio.create_task(self._user_stream_loop())
+
+    async def stop_user_stream(self) -> None:
+        task, self._user_stream_task = self._user_stream_task, None
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+    async def _user_stream_loop(self) -> None:
+        while True:
+            try:
+                bsm = BinanceSocketManager(self.client)
+                async with bsm.futures_user_socket() as stream:
+                    logger.info("📡 유저데이터 스트림 연결")
+                    await self._seed_positions()
+                    while True:
+                        self._on_user_event(await stream.recv())
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # 끊긴 동안에는 스트림 값을 믿지 않고 REST로 되돌아간다
+                self._positions.clear()
+                self._positions_synced = False
+                # 끊긴 동안 다른 곳에서 바뀌었을 수 있으므로 레버리지 캐시도 비운다
+                self._exchange_leverage.clear()
+                logger.warning("유저데이터 스트림 오류: %s → 5초 후 재연결", e)
+                await asyncio.sleep(5)
+
+    async def _seed_positions(self) -> None:
+        """
+        스트림 연결 직후 전체 포지션을 REST 1회로 적재한다.
+        이후에는 ACCOUNT_UPDATE만으로 유지되므로 청산 시 포지션 조회가 메모리 조회로 끝난다.
+        """
+        info = await self.client.futures_position_information()
+        for p in info:
+            # 적재 도중 먼저 도착한 스트림 값이 더 최신이므로 덮어쓰지 않는다
+            self._positions.setdefault(p["symbol"], {
+                "symbol": p["symbol"],
+                "positionAmt": p.get("positionAmt", 0),
+                "entryPrice": p.get("entryPrice", 0),
+            })
+        self._positions_synced = True
+
+    def _on_user_event(self, msg: dict) -> None:
+        if not isinstance(msg, dict):
+            return
+        etype = msg.get("e")
+        if etype == "ACCOUNT_UPDATE":
+            for p in msg.get("a", {}).get("P", []):
+                self._positions[p["s"]] = {
+                    "symbol": p["s"],
+                    "positionAmt": p.get("pa", 0),
+                    "entryPrice": p.get("ep", 0),
+                }
+        elif etype == "ACCOUNT_CONFIG_UPDATE":
+            # 앱/웹 등 외부에서 레버리지를 바꾼 경우 캐시를 거래소 값으로 맞춘다
+            ac = msg.get("ac")
+            if ac and "s" in ac and "l" in ac:
+                self._exchange_leverage[ac["s"]] = int(ac["l"])
+        elif etype == "ORDER_TRADE_UPDATE":
+            o = msg.get("o", {})
+            if o.get("X") in ("FILLED", "PARTIALLY_FILLED"):
+                px = float(o.get("ap") or o.get("L") or 0)
+                if px > 0:
+                    self._fill_px[o["s"]] = px
+
     # -------------------------------------------------------------------------
     # DB 기록(프로젝트 스키마에 맞춰 최소한만)
     # -------------------------------------------------------------------------
-    def _record_trade_open(self, symbol: str, side: str, entry_px: float, qty: float, extra: Optional[dict]):
-        try:
-            session = db_manager.session()
-            trade = Trade(
-                symbol=symbol, side=side, status="OPEN",
-                entry_price=entry_px, entry_time=datetime.utcnow(),
-                quantity=qty, meta=extra or {}
+    def _record_trade_open(self, session, symbol: str, side: str, entry_px: float, qty: float, sl_px: float,
+                           tp_px: float, entry_order_id: Optional[int], extra: Optional[dict], ts_ns: int):
+        # 신호 연결/SL/TP/레버리지까지 INSERT 1회로 기록 (후속 UPDATE 없음, 커밋은 trade_writer가 일괄 처리)
+        ctx = extra or {}
+        trade_id = session.execute(_TRADE_INSERT, dict(
+            symbol=symbol, side=side, side_sign=1.0 if side == "BUY" else -1.0, status="OPEN",
+            signal_id=ctx.get("signal_id"), binance_order_id=entry_order_id,
+            leverage=int(self._get_leverage(symbol)), entry_atr=ctx.get("entry_atr"),
+            entry_price=entry_px, entry_time=_utc_from_ns(ts_ns),
+            quantity=qty, stop_loss_price=sl_px or None, take_profit_price=tp_px or None,
+            highest_price_since_entry=entry_px,
+        )).scalar_one()
+        self._open_trade_id[symbol] = trade_id
+
+    def _record_trade_close(self, session, symbol: str, exit_px: float, reason: str, is_partial: bool, ts_ns: int):
+        # PnL 근사 — 진입 시 저장한 side_sign으로 분기 없이 계산, UPDATE 한 번으로 반영
+        pnl = (exit_px - Trade.entry_price) * func.coalesce(Trade.quantity, 0) * Trade.side_sign
+        values = dict(
+            pnl=func.coalesce(Trade.pnl, 0) + pnl,
+            exit_price=exit_px,
+            exit_time=_utc_from_ns(ts_ns),
+            status="PARTIAL" if is_partial else "CLOSED",
+        )
+        live = (Trade.symbol == symbol, Trade.status.in_(["OPEN", "PARTIAL"]))
+
+        def _update(trade_id):
+            stmt = (
+                update(Trade)
+                .where(Trade.id == trade_id, *live)
+                .values(**values)
+                .returning(Trade.id)
+                .execution_options(synchronize_session=False)
             )
-            session.add(trade)
-            session.commit()
-        except Exception as e:
-            # DB 실패는 치명적이지 않게 로그만
-            print(f"⚠️ DB open 기록 실패: {e}")
+            return session.execute(stmt).scalar()
 
-    def _record_trade_close(self, symbol: str, exit_px: float, reason: str, is_partial: bool):
-        try:
-            session = db_manager.session()
-            trade: Trade = session.query(Trade).filter(
-                Trade.symbol == symbol, Trade.status.in_(["OPEN", "PARTIAL"])
-            ).order_by(Trade.entry_time.desc()).first()
-            if not trade:
-                return
-            # PnL 근사(롱/숏 구분)
-            if trade.side == "BUY":
-                pnl = (exit_px - float(trade.entry_price)) * float(trade.quantity or 0)
-            else:
-                pnl = (float(trade.entry_price) - exit_px) * float(trade.quantity or 0)
+        # 메모리 맵의 id는 배치 롤백 뒤 SQLite가 재사용했을 수 있으므로 심볼/상태까지 일치할 때만 믿는다
+        trade_id = self._open_trade_id.get(symbol)
+        updated_id = _update(trade_id) if trade_id is not None else None
+        if updated_id is None:
+            # 맵이 비었거나(재시작) 어긋났으면 인덱스 조회(서브쿼리)로 대체
+            updated_id = _update(
+                select(Trade.id)
+                .where(*live)
+                .order_by(Trade.entry_time.desc())
+                .limit(1)
+                .scalar_subquery()
+            )
+        if updated_id is None:
+            self._open_trade_id.pop(symbol, None)
+            return
 
-            trade.pnl = (trade.pnl or 0) + pnl
-            trade.exit_price = exit_px
-            trade.exit_time = datetime.utcnow()
+        if is_partial:
+            self._open_trade_id[symbol] = updated_id
+        else:
+            self._open_trade_id.pop(symbol, None)
 
-            if is_partial:
-                trade.status = "PARTIAL"
-            else:
-                trade.status = "CLOSED"
+    def _record_trades_close_batch(self, session, symbols: List[str], exit_px: np.ndarray, reason: str,
+                                   ts_ns: int):
+        # 진행 중 거래를 한 번에 읽어 SoA 배열로 PnL을 벡터 계산 → PK 기준 bulk UPDATE(executemany)
+        rows = session.execute(
+            select(Trade.id, Trade.symbol, Trade.side_sign, Trade.entry_price, Trade.quantity, Trade.pnl)
+            .where(Trade.symbol.in_(symbols), Trade.status.in_(["OPEN", "PARTIAL"]))
+            .order_by(Trade.entry_time)
+        ).all()
+        # 심볼당 최신 거래 1건 (메모리 맵에 id가 있으면 그것을 우선)
+        latest = {r.symbol: r for r in rows}
+        for r in rows:
+            if self._open_trade_id.get(r.symbol) == r.id:
+                latest[r.symbol] = r
+        if not latest:
+            return
+        px_by_symbol = dict(zip(symbols, exit_px.tolist()))
+        picked = list(latest.values())
+        exit_arr = np.fromiter((px_by_symbol[r.symbol] for r in picked), dtype=np.float64, count=len(picked))
+        entry = np.fromiter((r.entry_price or 0.0 for r in picked), dtype=np.float64, count=len(picked))
+        qty = np.fromiter((r.quantity or 0.0 for r in picked), dtype=np.float64, count=len(picked))
+        prev = np.fromiter((r.pnl or 0.0 for r in picked), dtype=np.float64, count=len(picked))
+        sign = np.fromiter((r.side_sign or 0.0 for r in picked), dtype=np.float64, count=len(picked))
+        pnl = prev + (exit_arr - entry) * qty * sign
 
-            session.commit()
-        except Exception as e:
-            print(f"⚠️ DB close 기록 실패: {e}")
+        now = _utc_from_ns(ts_ns)
+        session.execute(update(Trade), [
+            {"id": r.id, "pnl": float(p), "exit_price": float(x), "exit_time": now, "status": "CLOSED"}
+            for r, p, x in zip(picked, pnl, exit_arr)
+        ])
+        for r in picked:
+            self._open_trade_id.pop(r.symbol, None)
@@ -9,8 +9,18 @@ V7 — 2018년부터 MacroAnalyzer 레짐 에피소드별 최적화
 - backtesting size 규칙 강제(sanitize)
 """
 
+import os
+
+# 그리드는 코어 수만큼 프로세스로 돌리므로 워커 안의 BLAS/OpenMP 스레드는 1개로 고정
+# (코어 과다 구독 방지). numpy가 처음 import되기 전에 설정해야 적용되며, 사용자가 지정한 값은 유지.
+for _var in ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS", "NUMEXPR_NUM_THREADS"):
+    os.environ.setdefault(_var, "1")
+
 import multiprocessing
-from backtesting import backtesting
+import backtesting
+
+# Backtest.optimize는 `from backtesting import Pool`(패키지 속성)을 참조한다
+# (기존처럼 backtesting.backtesting 서브모듈에 대입하면 적용되지 않음)
 backtesting.Pool = multiprocessing.Pool
 
 import pandas as pd
@@ -19,12 +29,18 @@ import json
 from backtesting import Strategy
 from backtesting.lib import FractionalBacktest
 from binance.client import Client
-from collections import deque
 import sys
-import os
 import math
-from tqdm import tqdm
+import time
+import operator
+import hashlib
+from collections.abc import Mapping
+from dataclasses import asdict, dataclass, fields
+from types import MappingProxyType
 from datetime import datetime
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import lru_cache
+from typing import Optional
 # 한글 라벨
 SYMBOL_NAME = {"BTCUSDT": "비트코인", "ETHUSDT": "이더리움"}
 REGIME_NAME = {"BULL": "강세장(불장)", "BEAR": "약세장(하락장)", "SIDEWAYS": "횡보장"}
@@ -43,16 +59,135 @@ except Exception:
 
 from analysis import indicator_calculator, data_fetcher
 from analysis.confluence_engine import ConfluenceEngine
-from analysis.macro_analyzer import MacroAnalyzer, MacroRegime
+from analysis.macro_analyzer import MacroAnalyzer
 from analysis.risk_sizing import calc_order_qty
 from core.config_manager import config
 
+# (옵션) orjson이 있으면 결과 JSON을 C 구현으로 직렬화
+try:
+    import orjson
+    _HAS_ORJSON = True
+except Exception:
+    _HAS_ORJSON = False
+
 # (선택형 최적화기)
 try:
-    from local_backtesting.optimizers import run_ga, run_bayes
+    from local_backtesting.optimizers import run_ga, run_bayes, run_random, _HAS_SKOPT
     _HAS_OPTIMIZERS = True
 except Exception:
     _HAS_OPTIMIZERS = False
+    _HAS_SKOPT = False
+
+
+# ---- 지표 캐시 ----
+# calculate_all_indicators는 고정 기간만 쓰므로 최적화 파라미터와 무관하다.
+# bt.run()마다 data가 얕은 복사되어 id()가 매번 달라지므로, 내용 기반 키로 캐시한다.
+_IND_CACHE: dict = {}
+
+# OPT_IND_FLOAT32=1 이면 캐시된 지표 프레임의 float64 열을 float32로 저장 (메모리 절반).
+# 가격/EMA 비교가 반올림 경계에서 뒤집힐 수 있어 결과가 미세하게 달라지므로 기본은 끔.
+_IND_FLOAT32 = os.getenv("OPT_IND_FLOAT32", "0") == "1"
+
+
+def _compute_indicators(df: pd.DataFrame) -> pd.DataFrame:
+    ind = indicator_calculator.calculate_all_indicators(df)
+    if _IND_FLOAT32:
+        ind = ind.astype({c: np.float32 for c in ind.select_dtypes(np.float64).columns})
+    return ind
+
+
+def _indicator_cache_key(data) -> tuple:
+    index = data.index
+    return (len(index), index[0], index[-1], hash(np.ascontiguousarray(data.Close).tobytes()))
+
+
+def get_cached_indicators(data) -> pd.DataFrame:
+    """같은 캔들 구간이면 한 번만 계산한 지표 프레임을 재사용 (읽기 전용으로 사용할 것)"""
+    if len(data) == 0:
+        return _compute_indicators(data.df)
+    key = _indicator_cache_key(data)
+    ind = _IND_CACHE.get(key)
+    if ind is None:
+        ind = _compute_indicators(data.df)
+        _IND_CACHE[key] = ind
+    return ind
+
+
+def _run_frame(bt) -> pd.DataFrame:
+    """
+    bt.run()이 전략에 넘기는 프레임. FractionalBacktest는 OHLC에 fractional_unit을 곱한
+    사본으로 돌리므로 원본 df로는 캐시 키(Close 해시)가 맞지 않는다.
+    """
+    return getattr(bt, "_FractionalBacktest__data", bt._data)
+
+
+def preload_indicators(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    optimize 전에 부모 프로세스에서 지표를 미리 계산해 캐시에 넣는다.
+    fork로 만들어지는 워커는 이 캐시를 복사 없이(COW) 물려받아 워커마다 재계산하지 않는다.
+    (OHLC 자체는 backtesting이 SharedMemoryManager로 워커에 넘김)
+    df는 run()이 보는 프레임이어야 한다 → _run_frame(bt)
+    """
+    key = _indicator_cache_key(df)
+    ind = _IND_CACHE.get(key)
+    if ind is None:
+        ind = _compute_indicators(df)
+        _IND_CACHE[key] = ind
+    return ind
+
+
+# 전술 점수는 분석 파라미터(ENGINE_PARAM_KEYS)에만 의존 → 실행정책만 다른 조합끼리 공유
+_SCORE_CACHE: dict = {}
+
+
+def get_cached_scores(data, indicators: pd.DataFrame, analysis_key: tuple, engine) -> np.ndarray:
+    """(캔들 구간, 분석 파라미터)별 봉 단위 전술 점수 배열 (읽기 전용)"""
+    if len(data) == 0:
+        return np.asarray(engine._calculate_tactical_score_vectorized(indicators), dtype=float)
+    key = (_indicator_cache_key(data), analysis_key)
+    scores = _SCORE_CACHE.get(key)
+    if scores is None:
+        scores = np.asarray(engine._calculate_tactical_score_vectorized(indicators), dtype=float)
+        scores.flags.writeable = False
+        _SCORE_CACHE[key] = scores
+    return scores
+
+
+def clear_indicator_cache() -> None:
+    _IND_CACHE.clear()
+    _SCORE_CACHE.clear()
+
+
+def _window_mean(scores: np.ndarray, k: int) -> np.ndarray:
+    """
+    직전 K봉 점수 평균 (앞의 K-1봉은 NaN).
+    누적합 차분 = 봉마다 새 점수 더하고 밀려난 점수 빼는 running sum (K와 무관하게 O(N), 점수는 정수라 오차 없음)
+    """
+    k = max(1, int(k))
+    csum = np.cumsum(scores)
+    avg = np.full(len(csum), np.nan)
+    if len(csum) >= k:
+        avg[k - 1:] = csum[k - 1:]
+        avg[k:] -= csum[:-k]
+        avg[k - 1:] /= k
+    return avg
+
+
+def _entry_sides(avg_scores: np.ndarray, regime: str, threshold: float) -> np.ndarray:
+    """봉별 진입 방향 (+1 BUY / -1 SELL / 0 없음, NaN → 0)"""
+    if regime == "BULL":
+        return np.where(avg_scores >= threshold, 1, 0).astype(np.int8)
+    if regime == "BEAR":
+        return np.where(avg_scores <= -threshold, -1, 0).astype(np.int8)
+    return np.zeros(len(avg_scores), dtype=np.int8)
+
+
+def _ema(close: pd.Series, span: int) -> pd.Series:
+    """
+    폴백 레짐용 EMA — 항상 pandas ewm(adjust=False)를 기준으로 쓴다.
+    TA-Lib은 SMA로 시드하므로 NaN 구간 뒤로도 수백 봉 동안 값이 달라 설치 여부에 따라 에피소드가 바뀐다.
+    """
+    return close.ewm(span=span, adjust=False).mean()
 
 
 # ---- 안전 폴백: 전략 설정 읽기 ----
@@ -90,30 +225,46 @@ def get_strategy_configs_safe(regime: str):
     }
 
 
-def _to_jsonable_dict(d: dict) -> dict:
-    def conv(x):
-        try:
-            import numpy as np  # noqa
-            if isinstance(x, (np.integer,)):
-                return int(x)
-            if isinstance(x, (np.floating,)):
-                return float(x)
-            if isinstance(x, (np.bool_,)):
-                return bool(x)
-        except Exception:
-            pass
-        if isinstance(x, pd.Timestamp):
-            return x.isoformat()
-        if isinstance(x, (int, float, bool, str)) or x is None:
-            return x
+def _json_identity(x):
+    return x
+
+
+def _json_fallback(x):
+    try:
+        return float(x)
+    except Exception:
         try:
-            return float(x)
+            return int(x)
         except Exception:
-            try:
-                return int(x)
-            except Exception:
-                return str(x)
-    return {k: conv(v) for k, v in d.items()}
+            return str(x)
+
+
+# 타입 → JSON 변환 함수. MRO 순서로 처음 걸리는 항목을 쓰고, 타입별 해석 결과는 캐시한다.
+_JSON_CONV = {
+    np.bool_: bool,
+    np.integer: int,
+    np.floating: float,
+    pd.Timestamp: lambda x: x.isoformat(),
+    bool: _json_identity,
+    int: _json_identity,
+    float: _json_identity,
+    str: _json_identity,
+    type(None): _json_identity,
+}
+_JSON_CONV_CACHE: dict = {}
+
+
+def _to_jsonable(x):
+    t = type(x)
+    fn = _JSON_CONV_CACHE.get(t)
+    if fn is None:
+        fn = next((_JSON_CONV[base] for base in t.__mro__ if base in _JSON_CONV), _json_fallback)
+        _JSON_CONV_CACHE[t] = fn
+    return fn(x)
+
+
+def _to_jsonable_dict(d: dict) -> dict:
+    return {k: _to_jsonable(v) for k, v in d.items()}
 
 
 # === 신규: 2018-01-01부터 4h 전구간 수집 ===
@@ -140,6 +291,26 @@ def fetch_klines_since_2018(binance_client: Client, symbol: str, interval: str =
     return df
 
 
+def label_runs_to_periods(labels: pd.Series, min_bars: int = 300) -> dict:
+    """
+    정렬된 시계열 라벨에서 같은 값이 이어지는 구간을 {값: [{"start","end"}, ...]}로 압축.
+    경계는 인접 원소 비교 한 번으로 찾고, 구간 길이(봉 수)는 인덱스 차로 계산 (min_bars 미만 제외).
+    """
+    vals = labels.to_numpy()
+    if len(vals) == 0:
+        return {}
+    change = np.flatnonzero(vals[1:] != vals[:-1]) + 1
+    starts = np.r_[0, change]
+    ends = np.r_[change - 1, len(vals) - 1]
+    keep = (ends - starts + 1) >= min_bars
+
+    index = labels.index
+    out: dict = {}
+    for s, e in zip(starts[keep], ends[keep]):
+        out.setdefault(vals[s], []).append({"start": index[s], "end": index[e]})
+    return out
+
+
 # === 신규: MacroAnalyzer 레짐을 연속 구간으로 압축 ===
 def collapse_regimes_to_periods(df: pd.DataFrame, macro_data: dict) -> dict:
     """
@@ -148,39 +319,40 @@ def collapse_regimes_to_periods(df: pd.DataFrame, macro_data: dict) -> dict:
     너무 짧은 구간(4h 300봉 ≈ 50일) 제거.
     """
     ma = MacroAnalyzer()
-    regimes = []
-    for ts in tqdm(df.index, desc="레짐 레이블링"):
-        regime, _, _ = ma.diagnose_macro_regime_for_date(ts, macro_data)
-        regimes.append(regime.name if isinstance(regime, MacroRegime) else str(regime))
-    ser = pd.Series(regimes, index=df.index, name="Regime")
-
-    periods = {"BULL": [], "BEAR": [], "SIDEWAYS": []}
-    if ser.empty:
-        return periods
-
-    prev = ser.iloc[0]
-    run_start = ser.index[0]
-    # 연속 구간 찾기
-    for i in range(1, len(ser)):
-        t = ser.index[i]
-        r = ser.iloc[i]
-        if r != prev:
-            periods.setdefault(prev, []).append({"start": run_start, "end": ser.index[i-1]})
-            run_start = t
-            prev = r
-    periods.setdefault(prev, []).append({"start": run_start, "end": ser.index[-1]})
-
-    # 최소 길이 필터
-    MIN_BARS = 300
+    ser = ma.diagnose_macro_regime_series(df.index, macro_data)
+
     cleaned = {"BULL": [], "BEAR": [], "SIDEWAYS": []}
-    for k, lst in periods.items():
-        for p in lst:
-            mask = (df.index >= p["start"]) & (df.index <= p["end"])
-            if mask.sum() >= MIN_BARS:
-                cleaned[k].append(p)
+    for k, lst in label_runs_to_periods(ser, min_bars=300).items():
+        cleaned.setdefault(k, []).extend(lst)
     return cleaned
 
 
+# strategies_optimized.json에 기록하는 최적 파라미터 (한 번에 꺼내 지역변수로 풀어 쓴다)
+_STRATEGY_PARAM_GETTER = operator.attrgetter(
+    "ema_short", "ema_long", "score_strong_trend",
+    "rsi_period", "rsi_oversold", "score_oversold",
+    "score_macd_cross_up", "adx_threshold", "score_adx_strong",
+)
+
+
+@lru_cache(maxsize=None)
+def _cached_strategy_configs(regime: str, version: int) -> MappingProxyType:
+    """
+    레짐별 전략 설정 템플릿 (읽기 전용). config.version을 키에 넣어 설정이 다시
+    로드되면 자동으로 새로 읽는다. 수정할 때는 _clone_strategies로 복사해서 쓴다.
+    """
+    cfg = get_strategy_configs_safe(regime) or {}
+    return MappingProxyType({
+        name: MappingProxyType(dict(sub)) if isinstance(sub, Mapping) else sub
+        for name, sub in cfg.items()
+    })
+
+
+def _clone_strategies(cfg: Mapping) -> dict:
+    """전략명 → 파라미터 dict 구조를 한 단계씩 복사 (아래에서 덮어쓰는 값은 모두 스칼라)"""
+    return {name: dict(sub) if isinstance(sub, Mapping) else sub for name, sub in cfg.items()}
+
+
 def segment_data_by_regime(klines_df: pd.DataFrame, macro_data: dict) -> dict:
     """
     (참고용) 전체 시계열에 대해 일자별 레짐을 라벨링한 뒤 단순 필터링으로 분할.
@@ -189,17 +361,13 @@ def segment_data_by_regime(klines_df: pd.DataFrame, macro_data: dict) -> dict:
     """
     print("\n...과거 데이터 전체에 대한 거시 경제 분석을 시작합니다...")
     ma = MacroAnalyzer()
-    regimes = []
-    for dt in tqdm(klines_df.index, desc="과거 시장 상황 분석 중"):
-        regime, _, _ = ma.diagnose_macro_regime_for_date(dt, macro_data)
-        regimes.append(regime.name if isinstance(regime, MacroRegime) else str(regime))
     klines_df = klines_df.copy()
-    klines_df['Regime'] = regimes
-    out = {
-        "BULL": klines_df[klines_df['Regime'] == 'BULL'],
-        "BEAR": klines_df[klines_df['Regime'] == 'BEAR'],
-        "SIDEWAYS": klines_df[klines_df['Regime'] == 'SIDEWAYS']
-    }
+    # category(int8 코드)로 두고 groupby 한 번에 분할 — 레짐별 마스크 비교/복사 3회 대신
+    klines_df['Regime'] = pd.Categorical(
+        ma.diagnose_macro_regime_series(klines_df.index, macro_data).values,
+        categories=["BULL", "BEAR", "SIDEWAYS"],
+    )
+    out = {name: grp for name, grp in klines_df.groupby('Regime', observed=False)}
     print("...거시 경제 분석 및 데이터 구간 선별 완료!")
     print(f"   - 강세장(BULL) 데이터: {len(out['BULL'])}개 캔들")
     print(f"   - 약세장(BEAR) 데이터: {len(out['BEAR'])}개 캔들")
@@ -207,6 +375,83 @@ def segment_data_by_regime(klines_df: pd.DataFrame, macro_data: dict) -> dict:
     return out
 
 
+# ---- 분석 엔진 캐시 ----
+# 그리드의 수많은 bt.run마다 엔진(+ ping 하는 Client, 전략 객체)을 새로 만들지 않도록
+# 실제로 달라지는 분석 파라미터 조합별로 하나만 만든다 (전략 analyze는 상태 없음).
+ENGINE_PARAM_KEYS = (
+    "ema_short", "ema_long", "score_strong_trend",
+    "rsi_period", "rsi_oversold", "rsi_overbought", "score_oversold", "score_overbought",
+    "score_macd_cross_up", "adx_threshold", "score_adx_strong",
+    "score_bb_breakout_up", "score_chop_trending",
+)
+
+
+@lru_cache(maxsize=64)
+def _get_engine(analysis_key: tuple) -> ConfluenceEngine:
+    """analysis_key: ENGINE_PARAM_KEYS 순서의 정수 튜플"""
+    (ema_short, ema_long, score_strong_trend,
+     rsi_period, rsi_oversold, rsi_overbought, score_oversold, score_overbought,
+     score_macd_cross_up, adx_threshold, score_adx_strong,
+     score_bb_breakout_up, score_chop_trending) = analysis_key
+    strategy_configs = {
+        "TrendStrategy": {
+            "enabled": True,
+            "ema_short": ema_short,
+            "ema_long": ema_long,
+            "score_strong_trend": score_strong_trend,
+        },
+        "OscillatorStrategy": {
+            "enabled": True,
+            "rsi_period": rsi_period,
+            "rsi_oversold": rsi_oversold,
+            "rsi_overbought": rsi_overbought,
+            "score_oversold": score_oversold,
+            "score_overbought": score_overbought,
+            "stoch_k": 14, "stoch_d": 3, "stoch_smooth_k": 3,
+            "mfi_period": 14, "obv_ema_period": 20,
+            "stoch_oversold": 20, "stoch_overbought": 80,
+            "mfi_oversold": 20, "mfi_overbought": 80,
+            "score_inflow": 2, "score_outflow": -2,
+        },
+        "ComprehensiveStrategy": {
+            "enabled": True,
+            "score_macd_cross_up": score_macd_cross_up,
+            "score_macd_cross_down": -score_macd_cross_up,
+            "adx_threshold": adx_threshold,
+            "score_adx_strong": score_adx_strong,
+            "score_bb_breakout_up": score_bb_breakout_up,
+            "score_bb_breakout_down": -score_bb_breakout_up,
+            "score_chop_trending": score_chop_trending,
+            "score_ichimoku_bull": 4, "score_ichimoku_bear": -4,
+            "score_psar_bull": 3, "score_psar_bear": -3,
+            "score_vortex_bull": 2, "score_vortex_bear": -2,
+            "bb_len": 20, "bb_std": 2.0, "score_bb_squeeze": 3,
+            "cci_length": 20, "cci_constant": 0.015,
+            "cci_overbought": 100, "cci_oversold": -100,
+            "score_cci_overbought": -3, "score_cci_oversold": 3,
+            "score_cmf_positive": 2, "score_cmf_negative": -2,
+            "chop_sideways_th": 60, "score_chop_sideways": -3,
+            "stochrsi_oversold": 20, "stochrsi_overbought": 80,
+            "score_stochrsi_oversold": 3, "score_stochrsi_overbought": -3,
+            "score_trix_cross_up": 4, "score_trix_cross_down": -4,
+            "score_efi_cross_up": 3, "score_efi_cross_down": -3,
+            "score_kc_breakout_up": 4, "score_kc_breakout_down": -4,
+            "score_ppo_bull": 2, "score_ppo_bear": -2,
+        },
+    }
+    return ConfluenceEngine(Client("", "", ping=False), strategy_configs=strategy_configs)
+
+
+# 3분할 익절 시 TP 거리 배수 (기준 TP 대비)
+_TP_STEPS_3 = np.array([0.5, 1.0, 1.5])
+
+
+@lru_cache(maxsize=8)
+def _parse_partials(spec: str) -> tuple:
+    """"0.3,0.3,0.4" → (0.3, 0.3, 0.4), 비어 있으면 (1.0,)"""
+    return tuple(float(x.strip()) for x in spec.split(",") if x.strip()) or (1.0,)
+
+
 class OptoRunner(Strategy):
     """
     분석(ConfluenceEngine) + 실행정책 시뮬(부분익절/타임스탑/트레일링)
@@ -249,70 +494,63 @@ class OptoRunner(Strategy):
     market_regime = "BULL"
 
     # ====== 상태 ======
-    _recent_scores: deque
+    _scores: np.ndarray
+    _avg_scores: np.ndarray
     _in_pos: bool
     _side: str
     _entry_px: float
     _entry_atr: float
     _sl_px: float
-    _tp_plan: list
+    _tp_px: np.ndarray                  # 멀티 TP 계획 (가격/수량/체결 여부 병렬 배열)
+    _tp_qty: np.ndarray
+    _tp_size: list                      # _tp_qty를 진입 시 한 번 정규화한 주문 size (None이면 스킵)
+    _tp_done: np.ndarray
+    _tp_sign: int                       # BUY=+1, SELL=-1
     _bars_held: int
+    _atr: np.ndarray
+    _close: np.ndarray
+    _high: np.ndarray
+    _low: np.ndarray
+    _idx: int
 
     def init(self):
-        # 분석 엔진 초기화
-        strategy_configs = {
-            "TrendStrategy": {
-                "enabled": True,
-                "ema_short": int(self.ema_short),
-                "ema_long": int(self.ema_long),
-                "score_strong_trend": int(self.score_strong_trend),
-            },
-            "OscillatorStrategy": {
-                "enabled": True,
-                "rsi_period": int(self.rsi_period),
-                "rsi_oversold": int(self.rsi_oversold),
-                "rsi_overbought": int(self.rsi_overbought),
-                "score_oversold": int(self.score_oversold),
-                "score_overbought": int(self.score_overbought),
-                "stoch_k": 14, "stoch_d": 3, "stoch_smooth_k": 3,
-                "mfi_period": 14, "obv_ema_period": 20,
-                "stoch_oversold": 20, "stoch_overbought": 80,
-                "mfi_oversold": 20, "mfi_overbought": 80,
-                "score_inflow": 2, "score_outflow": -2,
-            },
-            "ComprehensiveStrategy": {
-                "enabled": True,
-                "score_macd_cross_up": int(self.score_macd_cross_up),
-                "score_macd_cross_down": -int(self.score_macd_cross_up),
-                "adx_threshold": int(self.adx_threshold),
-                "score_adx_strong": int(self.score_adx_strong),
-                "score_bb_breakout_up": int(self.score_bb_breakout_up),
-                "score_bb_breakout_down": -int(self.score_bb_breakout_up),
-                "score_chop_trending": int(self.score_chop_trending),
-                "score_ichimoku_bull": 4, "score_ichimoku_bear": -4,
-                "score_psar_bull": 3, "score_psar_bear": -3,
-                "score_vortex_bull": 2, "score_vortex_bear": -2,
-                "bb_len": 20, "bb_std": 2.0, "score_bb_squeeze": 3,
-                "cci_length": 20, "cci_constant": 0.015,
-                "cci_overbought": 100, "cci_oversold": -100,
-                "score_cci_overbought": -3, "score_cci_oversold": 3,
-                "score_cmf_positive": 2, "score_cmf_negative": -2,
-                "chop_sideways_th": 60, "score_chop_sideways": -3,
-                "stochrsi_oversold": 20, "stochrsi_overbought": 80,
-                "score_stochrsi_oversold": 3, "score_stochrsi_overbought": -3,
-                "score_trix_cross_up": 4, "score_trix_cross_down": -4,
-                "score_efi_cross_up": 3, "score_efi_cross_down": -3,
-                "score_kc_breakout_up": 4, "score_kc_breakout_down": -4,
-                "score_ppo_bull": 2, "score_ppo_bear": -2,
-            },
-        }
-        self.engine = ConfluenceEngine(Client("", ""), strategy_configs=strategy_configs)
+        # 분석 엔진 (파라미터 조합별 캐시)
+        analysis_key = tuple(int(getattr(self, k)) for k in ENGINE_PARAM_KEYS)
+        self.engine = _get_engine(analysis_key)
 
         # 지표 캐시
-        self.indicators = indicator_calculator.calculate_all_indicators(self.data.df)
-
-        # 점수 윈도우
-        self._recent_scores = deque(maxlen=int(self.trend_entry_confirm_count))
+        self.indicators = get_cached_indicators(self.data)
+        # 봉별 전술 점수는 해당 행까지의 지표에만 의존 → 분석 파라미터 조합마다 한 번만 전체 계산
+        self._scores = get_cached_scores(self.data, self.indicators, analysis_key, self.engine)
+
+        # 점수 윈도우: 직전 K봉 평균 (앞의 K-1봉은 NaN → 진입 판단 생략)
+        self._avg_scores = _window_mean(self._scores, int(self.trend_entry_confirm_count))
+        # 봉별 진입 방향 — 레짐/임계 비교를 루프 밖에서 한 번에
+        self._entry_side = _entry_sides(self._avg_scores, self.market_regime, float(self.open_threshold))
+
+        # ATR 배열: 기존 `get("ATRr_14", 0) or get("ATR_14", 0)` 규칙 그대로 (NaN은 0 → 진입 생략)
+        ind = self.indicators
+        atr_r = ind["ATRr_14"].to_numpy(dtype=float) if "ATRr_14" in ind else np.zeros(len(ind))
+        atr_b = ind["ATR_14"].to_numpy(dtype=float) if "ATR_14" in ind else np.zeros(len(ind))
+        self._atr = np.nan_to_num(np.where(atr_r != 0, atr_r, atr_b), nan=0.0)
+
+        # 가격 배열 (init 시점의 data는 전체 길이 → 봉 인덱스로 바로 조회)
+        self._close = np.asarray(self.data.Close)
+        self._high = np.asarray(self.data.High)
+        self._low = np.asarray(self.data.Low)
+        self._idx = 0
+
+        # 실행정책 스칼라 (봉마다 속성 조회/캐스팅하지 않도록)
+        self._trail_mode = (self.exec_trailing_mode or "off").lower()
+        self._trail_k = float(self.exec_trailing_k or 0)
+        self._time_stop_bars = int(self.exec_time_stop_bars or 0)
+        # 트레일링 모드는 run 동안 고정 → 모드별 구현을 한 번만 골라 바인딩 (봉마다 문자열 비교 X)
+        if self._trail_mode == "off" or self._trail_k <= 0:
+            self._maybe_trailing = self._trail_off
+        elif self._trail_mode == "atr":
+            self._maybe_trailing = self._trail_atr
+        else:
+            self._maybe_trailing = self._trail_percent
 
         # 실행 상태
         self._in_pos = False
@@ -320,39 +558,34 @@ class OptoRunner(Strategy):
         self._entry_px = np.nan
         self._entry_atr = np.nan
         self._sl_px = np.nan
-        self._tp_plan = []  # [{"px":float,"qty":float,"done":False}, ...]
+        self._clear_tp_plan()
         self._bars_held = 0
 
-        # exec_partial 파싱(상대 비율로 사용)
+        # exec_partial 파싱(상대 비율로 사용) — 탐색공간의 문자열 값은 몇 개뿐이라 캐시
         if isinstance(self.exec_partial, str):
-            parts = [p.strip() for p in self.exec_partial.split(",") if p.strip()]
-            self._partials = [float(x) for x in parts] if parts else [1.0]
+            self._partials = _parse_partials(self.exec_partial)
         elif isinstance(self.exec_partial, (list, tuple)):
-            self._partials = [float(x) for x in self.exec_partial]
+            self._partials = tuple(float(x) for x in self.exec_partial)
         else:
-            self._partials = [1.0]
+            self._partials = (1.0,)
 
     # ---- 내부 유틸 ----
-    @staticmethod
-    def _scale_tp(entry_px: float, tp_base: float, side: str, mult: float) -> float:
-        if mult == 1.0:
-            return tp_base
-        if side == "BUY":
-            r = tp_base - entry_px
-            return entry_px + r * mult
-        else:
-            r = entry_px - tp_base
-            return entry_px - r * mult
-
     def _reset_pos_state(self):
         self._in_pos = False
         self._side = None
         self._entry_px = np.nan
         self._entry_atr = np.nan
         self._sl_px = np.nan
-        self._tp_plan = []
+        self._clear_tp_plan()
         self._bars_held = 0
 
+    def _clear_tp_plan(self):
+        self._tp_px = np.empty(0)
+        self._tp_qty = np.empty(0)
+        self._tp_size = []
+        self._tp_done = np.zeros(0, dtype=bool)
+        self._tp_sign = 0
+
 
     # === backtesting 규칙을 만족시키는 size 정규화 ===
     @staticmethod
@@ -375,13 +608,11 @@ class OptoRunner(Strategy):
     def _maybe_enter(self, side: str):
         if self._in_pos:
             return
-        idx = len(self.data) - 1
-        cur = self.indicators.iloc[idx]
-        atr = cur.get("ATRr_14", 0) or cur.get("ATR_14", 0)
-        if not atr or np.isnan(atr) or atr <= 0:
+        atr = self._atr[self._idx] if self._idx < len(self._atr) else 0.0
+        if atr <= 0:
             return
 
-        px = float(self.data.Close[-1])
+        px = self._close[self._idx]
         sl_d = float(atr) * float(self.sl_atr_multiplier)  # 손절 거리
         rr = float(self.risk_reward_ratio)
 
@@ -429,45 +660,42 @@ class OptoRunner(Strategy):
         self._bars_held = 0
 
         # 멀티 TP 계획
-        steps = [0.5, 1.0, 1.5] if len(self._partials) == 3 else [1.0] * len(self._partials)
-        self._tp_plan = []
-        remain = float(qty)
-        for i, (w, m) in enumerate(zip(self._partials, steps)):
-            tp_px = self._scale_tp(px, tp_base, side, m)
-            if i < len(self._partials) - 1:
-                sub_qty = float(qty * float(w))
-            else:
-                sub_qty = float(remain)
-            remain -= sub_qty
-            self._tp_plan.append({"px": tp_px, "qty": sub_qty, "done": False})
+        n = len(self._partials)
+        steps = _TP_STEPS_3 if n == 3 else np.ones(n)
+        # TP_i = px + (tp_base - px) * step_i  (step 1.0은 tp_base 그대로)
+        self._tp_px = np.where(steps == 1.0, tp_base, px + (tp_base - px) * steps)
+        # 마지막 TP는 앞 단계들을 차례로 뺀 잔량
+        head = float(qty) * np.asarray(self._partials[:-1], dtype=float)
+        self._tp_qty = np.append(head, np.subtract.reduce(np.r_[float(qty), head]))
+        self._tp_size = [self._sanitize_size(q) for q in self._tp_qty.tolist()]
+        self._tp_done = np.zeros(n, dtype=bool)
+        self._tp_sign = 1 if side == "BUY" else -1
 
     def _maybe_exit_by_tp(self):
-        if not self._in_pos or not self._tp_plan:
+        if not self._in_pos or not len(self._tp_px):
             return
-        last = float(self.data.Close[-1])
-        for item in self._tp_plan:
-            if item["done"]:
+        sign = self._tp_sign
+        last = self._close[self._idx]
+        # 아직 체결 안 된 TP 중 이번 봉 가격이 도달한 것 (BUY: last >= px, SELL: last <= px)
+        hits = np.flatnonzero(~self._tp_done & (sign * last >= sign * self._tp_px))
+        for i in hits:
+            safe_qty = self._tp_size[i]
+            if safe_qty is None:
                 continue
-            hit = (last >= item["px"]) if self._side == "BUY" else (last <= item["px"])
-            if hit:
-                safe_qty = self._sanitize_size(item["qty"])
-                if safe_qty is None:
-                    item["done"] = True
-                    continue
-                if self._side == "BUY":
-                    self.sell(size=safe_qty)
-                else:
-                    self.buy(size=safe_qty)
-                item["done"] = True
+            if sign > 0:
+                self.sell(size=safe_qty)
+            else:
+                self.buy(size=safe_qty)
+        self._tp_done[hits] = True
 
-        if all(x["done"] for x in self._tp_plan):
+        if self._tp_done.all():
             self._reset_pos_state()
 
     def _maybe_exit_by_sl(self):
         if not self._in_pos:
             return
-        last_low = float(self.data.Low[-1])
-        last_high = float(self.data.High[-1])
+        last_low = self._low[self._idx]
+        last_high = self._high[self._idx]
         touched = (last_low <= self._sl_px) if self._side == "BUY" else (last_high >= self._sl_px)
         if touched:
             self.position.close()
@@ -476,7 +704,7 @@ class OptoRunner(Strategy):
     def _maybe_time_stop(self):
         if not self._in_pos:
             return
-        k = int(self.exec_time_stop_bars or 0)
+        k = self._time_stop_bars
         if k > 0:
             self._bars_held += 1
             if self._bars_held >= k:
@@ -484,24 +712,27 @@ class OptoRunner(Strategy):
                 self._reset_pos_state()
 
     def _maybe_trailing(self):
+        """init에서 모드별 구현(_trail_off/_trail_atr/_trail_percent)으로 교체됨"""
+        self._trail_off()
+
+    def _trail_off(self):
+        return
+
+    def _trail_atr(self):
         if not self._in_pos:
             return
-        mode = (self.exec_trailing_mode or "off").lower()
-        if mode == "off":
+        atr = float(self._entry_atr or 0)
+        if atr <= 0:
             return
-        last = float(self.data.Close[-1])
-        if mode == "atr":
-            atr = float(self._entry_atr or 0)
-            k = float(self.exec_trailing_k or 0)
-            if atr <= 0 or k <= 0:
-                return
-            trail = atr * k
-        else:
-            k = float(self.exec_trailing_k or 0)
-            if k <= 0:
-                return
-            trail = last * (k / 100.0)
+        self._apply_trail(self._close[self._idx], atr * self._trail_k)
+
+    def _trail_percent(self):
+        if not self._in_pos:
+            return
+        last = self._close[self._idx]
+        self._apply_trail(last, last * (self._trail_k / 100.0))
 
+    def _apply_trail(self, last: float, trail: float):
         if self._side == "BUY":
             new_sl = max(self._entry_px, last - trail)
             self._sl_px = max(self._sl_px, new_sl)
@@ -511,27 +742,14 @@ class OptoRunner(Strategy):
 
     # ---- 백테스트 루프 ----
     def next(self):
-        idx = len(self.data) - 1
-        cur = self.indicators.iloc[:idx + 1]
-        if len(cur) < int(self.trend_entry_confirm_count):
+        idx = self._idx = len(self.data) - 1
+        if idx >= len(self._avg_scores) or np.isnan(self._avg_scores[idx]):
             return
 
-        current_score, _ = self.engine._calculate_tactical_score(cur)
-        self._recent_scores.append(current_score)
-        if len(self._recent_scores) < int(self.trend_entry_confirm_count):
-            return
-
-        avg_score = sum(self._recent_scores) / len(self._recent_scores)
-
-        # 진입 판단
-        side = None
-        if self.market_regime == "BULL" and avg_score >= float(self.open_threshold):
-            side = "BUY"
-        elif self.market_regime == "BEAR" and avg_score <= -float(self.open_threshold):
-            side = "SELL"
-
-        if (not self._in_pos) and side:
-            self._maybe_enter(side)
+        # 진입 판단 (init에서 계산한 방향 배열 조회)
+        side = self._entry_side[idx]
+        if side and not self._in_pos:
+            self._maybe_enter("BUY" if side > 0 else "SELL")
 
         # 보유 중 관리
         if self._in_pos:
@@ -541,78 +759,161 @@ class OptoRunner(Strategy):
             self._maybe_time_stop()
 
 
-# 결과 요약에 표시할 파라미터 키
-BEST_PARAM_KEYS = [
+@dataclass(frozen=True, slots=True)
+class BestParams:
+    """최적화 결과 파라미터 — 그리드/GA/Bayes 결과를 한 번에 타입 변환해 고정"""
     # 실행정책(임계 포함)
-    "open_threshold","risk_reward_ratio","sl_atr_multiplier","trend_entry_confirm_count",
-    "exec_partial","exec_time_stop_bars","exec_trailing_mode","exec_trailing_k",
+    open_threshold: float
+    risk_reward_ratio: float
+    sl_atr_multiplier: float
+    trend_entry_confirm_count: int
+    exec_partial: str
+    exec_time_stop_bars: int
+    exec_trailing_mode: str
+    exec_trailing_k: float
     # 리스크 사이징
-    "risk_per_trade","max_exposure_frac",
+    risk_per_trade: float
+    max_exposure_frac: float
     # 분석 파라미터
-    "ema_short","ema_long","score_strong_trend",
-    "rsi_period","rsi_oversold","score_oversold",
-    "score_macd_cross_up","adx_threshold","score_adx_strong",
-]
+    ema_short: int
+    ema_long: int
+    score_strong_trend: int
+    rsi_period: int
+    rsi_oversold: int
+    score_oversold: int
+    score_macd_cross_up: int
+    adx_threshold: int
+    score_adx_strong: int
+
+    @classmethod
+    def from_source(cls, src) -> "BestParams":
+        """src: 최적 Strategy 인스턴스 또는 파라미터 dict (없는 키는 OptoRunner 기본값)"""
+        if isinstance(src, Mapping):
+            get = lambda k: src.get(k, getattr(OptoRunner, k))
+        else:
+            get = lambda k: getattr(src, k, getattr(OptoRunner, k))
+        return cls(**{f.name: f.type(get(f.name)) for f in fields(cls)})
+
+
+# 결과 요약에 표시할 파라미터 키
+BEST_PARAM_KEYS = [f.name for f in fields(BestParams)]
+
+def _opto_constraint(p) -> bool:
+    """그리드 제약 (lambda 대신 모듈 함수 → spawn 방식에서도 피클 가능)"""
+    return p.ema_short < p.ema_long and p.risk_reward_ratio > p.sl_atr_multiplier
+
+
+# 그리드 탐색용 bt.optimize 인자 (grid 분기/폴백 공통)
+GRID_KW = dict(
+    # 분석/임계
+    open_threshold=[10, 12, 14, 16],
+    risk_reward_ratio=[1.8, 2.0, 2.5, 3.0],
+    sl_atr_multiplier=[1.2, 1.5, 1.8, 2.2],
+    trend_entry_confirm_count=[2, 3, 4],
+    ema_short=[12, 16, 20, 24],
+    ema_long=[40, 50, 60, 80],
+    score_strong_trend=[3, 4, 5],
+    rsi_oversold=[20, 25, 30],
+    score_oversold=[3, 4, 5],
+    rsi_period=[14],
+    score_macd_cross_up=[2, 3, 4],
+    adx_threshold=[18, 22, 25, 28],
+    score_adx_strong=[2, 3, 4],
+    # 실행정책
+    exec_partial=["1.0", "0.3,0.3,0.4"],
+    exec_time_stop_bars=[0, 8, 12, 16],
+    exec_trailing_mode=["off", "atr", "percent"],
+    exec_trailing_k=[0.0, 1.0, 1.5, 2.0],
+    # 리스크 사이징
+    risk_per_trade=[0.005, 0.01, 0.015, 0.02],
+    max_exposure_frac=[0.2, 0.3, 0.4],
+    maximize='Calmar Ratio',
+    constraint=_opto_constraint,
+)
 
 
 # ---- 공통 유틸: 파라미터→백테스트 실행 ----
-def run_backtest_with_params(
-    df_capitalized: pd.DataFrame,
-    params: dict,
-    initial_cash: int,
-    symbol: str,
-    regime: str
-):
-    """공통 목표함수용 런너. 선호: Calmar → Sharpe → Return (가드 포함)"""
-    # 전략 컨텍스트
+# 목표함수가 보는 (통계 키, 없을 때 기본값) — run_backtest_with_params에서 이 순서로 배열화
+_OBJECTIVE_STATS = (
+    ("Max. Drawdown [%]", 0.0),
+    ("Calmar Ratio", None),
+    ("Sharpe Ratio", None),
+    ("Return [%]", 0.0),
+)
+
+
+def _min_trades(dataset_len: int) -> int:
+    """=== 동적 min_trades 완화 ==="""
+    min_trades_env = int(os.getenv("OPT_MIN_TRADES", 50))
+    min_trades_dyn = max(10, dataset_len // 100)  # 대략 100봉당 1건, 하한 10
+    return min(min_trades_env, min_trades_dyn)
+
+
+def _has_entry_signal(frame: pd.DataFrame, params: dict, regime: str) -> bool:
+    """
+    백테스트 없이 캐시된 지표/점수로 진입 신호 봉이 하나라도 있는지 확인.
+    신호가 없으면 주문이 한 건도 나가지 않으므로 결과는 항상 '거래 수 부족' 거절이다.
+    frame: run()이 보는 프레임 (_run_frame(bt))
+    """
+    p = lambda k: params.get(k, getattr(OptoRunner, k))
+    analysis_key = tuple(int(p(k)) for k in ENGINE_PARAM_KEYS)
+    engine = _get_engine(analysis_key)
+    scores = get_cached_scores(frame, preload_indicators(frame), analysis_key, engine)
+    avg = _window_mean(scores, int(p("trend_entry_confirm_count")))
+    return bool(_entry_sides(avg, regime, float(p("open_threshold"))).any())
+
+
+def _make_backtest(df: pd.DataFrame, symbol: str, regime: str, initial_cash: int) -> FractionalBacktest:
+    """
+    에피소드용 백테스트 객체 (전략 컨텍스트 설정 포함).
+    run()은 호출마다 새 전략 인스턴스를 만들므로 하나를 만들어 모든 시도/재평가에 재사용한다.
+    """
     OptoRunner.symbol = symbol
     OptoRunner.market_regime = regime
-
-    bt = FractionalBacktest(
-        df_capitalized,
-        OptoRunner,
+    return FractionalBacktest(
+        df, OptoRunner,
         cash=initial_cash,
         commission=.002,
         margin=1 / 10,           # 10x 레버리지
         finalize_trades=True,
     )
-    stats = bt.run(**params)
 
-    # === 동적 min_trades 완화 ===
-    min_trades_env = int(os.getenv("OPT_MIN_TRADES", 50))
-    dataset_len = len(df_capitalized) if hasattr(df_capitalized, "__len__") else 0
-    min_trades_dyn = max(10, dataset_len // 100)  # 대략 100봉당 1건, 하한 10
-    min_trades = min(min_trades_env, min_trades_dyn)
 
-    mdd_floor = float(os.getenv("OPT_MDD_FLOOR_PCT", 3.0))
+def run_backtest_with_params(
+    df_capitalized: pd.DataFrame,
+    params: dict,
+    initial_cash: int,
+    symbol: str,
+    regime: str,
+    bt: Optional[FractionalBacktest] = None,
+):
+    """공통 목표함수용 런너. 선호: Calmar → Sharpe → Return (가드 포함). bt를 주면 재사용"""
+    if bt is None:
+        bt = _make_backtest(df_capitalized, symbol, regime, initial_cash)
+    stats = bt.run(**params)
 
-    def _f(x, default=float("nan")):
-        try:
-            return float(x)
-        except Exception:
-            return default
+    min_trades = _min_trades(len(df_capitalized) if hasattr(df_capitalized, "__len__") else 0)
 
-    def _finite(x):
-        return (x is not None) and not (isinstance(x, float) and (math.isnan(x) or math.isinf(x)))
+    mdd_floor = float(os.getenv("OPT_MDD_FLOOR_PCT", 3.0))
 
     trades = int(stats.get("# Trades", 0) or 0)
-    mdd = abs(_f(stats.get("Max. Drawdown [%]", 0), 0.0))
-
-    calmar = _f(stats.get("Calmar Ratio"))
-    sharpe = _f(stats.get("Sharpe Ratio"))
-    retpct = _f(stats.get("Return [%]"), 0.0)
-
     if trades < min_trades:
         return stats, -1e12, f"Rejected: few trades (<{min_trades})"
 
-    if mdd < mdd_floor:
-        if _finite(sharpe):
+    # [MaxDD, Calmar, Sharpe, Return] 한 번에 변환 (None → NaN), 유한성도 한 번에 판정
+    mdd, calmar, sharpe, retpct = vals = np.array(
+        [stats.get(k, d) for k, d in _OBJECTIVE_STATS], dtype=float
+    )
+    ok = np.isfinite(vals)
+
+    if abs(mdd) < mdd_floor:
+        if ok[2]:
             return stats, float(sharpe), "Sharpe Ratio (fallback)"
         return stats, float(retpct), "Return [%] (fallback)"
 
-    if _finite(calmar):
+    if ok[1]:
         return stats, float(calmar), "Calmar Ratio"
-    if _finite(sharpe):
+    if ok[2]:
         return stats, float(sharpe), "Sharpe Ratio"
     return stats, float(retpct), "Return [%]"
 
@@ -656,12 +957,301 @@ def grid_choice_count(param_spaces):
 
 def choose_method_auto(param_spaces):
     env = os.getenv("OPT_METHOD", "auto").lower()
-    if env in ("grid", "ga", "bayes"):
+    if env in ("grid", "ga", "bayes", "random"):
         return env
     combos = grid_choice_count(param_spaces)
-    if combos <= 3000:
+    if combos <= 3000 or not _HAS_OPTIMIZERS:
         return "grid"
-    return "bayes" if _HAS_OPTIMIZERS else "grid"
+    # skopt가 없으면 bayes는 60회 순수 랜덤이 되므로, 국소 개선이 붙은 random 탐색 사용
+    return "bayes" if _HAS_SKOPT else "random"
+
+
+def _run_grid(bt: FractionalBacktest):
+    """GRID_KW로 bt.optimize 실행 → (best_params, metric_name, metric_value)"""
+    stats = bt.optimize(**GRID_KW)
+    metric_name = GRID_KW["maximize"]
+    metric_value = float(stats[metric_name]) if metric_name in stats and pd.notna(stats[metric_name]) else 0.0
+    return stats._strategy, metric_name, metric_value
+
+
+# 경로별 마지막으로 기록한 내용의 해시 (같은 내용이면 다시 쓰지 않음)
+_LAST_WRITTEN = {}
+
+# 결과 파일 전용 writer (1개 스레드 → 같은 파일 쓰기 순서 보장)
+_JSON_WRITER = ThreadPoolExecutor(max_workers=1, thread_name_prefix="json-writer")
+
+
+def _read_json(path: str):
+    """파일을 바이트로 한 번에 읽어 파싱 (orjson 우선, 디코드 오류는 json.JSONDecodeError 계열)"""
+    with open(path, 'rb') as f:
+        raw = f.read()
+    return orjson.loads(raw) if _HAS_ORJSON else json.loads(raw)
+
+
+def _json_bytes(obj, indent=None) -> bytes:
+    # orjson 들여쓰기는 2칸 고정 → indent=2/None 일 때만 사용 (그 외 들여쓰기는 표준 json)
+    if _HAS_ORJSON and indent in (None, 2):
+        opt = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        if indent == 2:
+            opt |= orjson.OPT_INDENT_2
+        try:
+            return orjson.dumps(obj, option=opt)
+        except TypeError:
+            pass
+    return json.dumps(obj, indent=indent, ensure_ascii=False).encode('utf-8')
+
+
+def _write_json_async(path: str, obj, indent=None) -> Future:
+    """직렬화(스냅샷)는 호출 스레드에서, 디스크 쓰기는 writer 스레드에서 수행"""
+    return _JSON_WRITER.submit(_write_bytes_atomic, path, _json_bytes(obj, indent))
+
+
+def _write_bytes_atomic(path: str, raw: bytes) -> bool:
+    """
+    임시 파일에 쓴 뒤 os.replace로 교체 (쓰는 도중 중단돼도 기존 파일이 깨지지 않음).
+    디스크의 내용과 바이트 단위로 같으면 쓰지 않는다. (기록 여부 반환)
+    """
+    digest = hashlib.blake2b(raw, digest_size=16).digest()
+    try:
+        size = os.path.getsize(path)
+    except OSError:
+        size = -1
+    if size == len(raw):
+        if _LAST_WRITTEN.get(path) != digest:
+            # 이번 실행에서 처음 보는 파일(재시작 등)은 실제 내용으로 확인
+            try:
+                with open(path, 'rb') as f:
+                    if hashlib.blake2b(f.read(), digest_size=16).digest() == digest:
+                        _LAST_WRITTEN[path] = digest
+            except OSError:
+                pass
+        if _LAST_WRITTEN.get(path) == digest:
+            return False
+    tmp = path + ".tmp"
+    with open(tmp, 'wb') as f:
+        f.write(raw)
+    os.replace(tmp, path)
+    _LAST_WRITTEN[path] = digest
+    return True
+
+
+def _init_episode_worker():
+    """에피소드 워커(데몬 프로세스)는 자식 프로세스를 만들 수 없으므로 내부 optimize는 스레드 풀 사용"""
+    import backtesting as _bt_pkg
+    from multiprocessing.dummy import Pool as _ThreadPool
+    _bt_pkg.Pool = _ThreadPool
+
+
+def _optimize_episode(symbol, regime, ep_idx, s_ts, e_ts, df, initial_cash, method):
+    """
+    에피소드 1개 최적화 + 재평가 + HTML 리포트.
+    반환: (symbol, regime, tag, settings_entry, best_params) — 전략 설정 구성과 JSON 병합/저장은 메인 프로세스에서.
+    """
+    clear_indicator_cache()  # 이전 에피소드 지표는 더 이상 쓰지 않음
+
+    print(
+        f"\n{'-'*60}\n"
+        f"⏱️ [{symbol} | {SYMBOL_NAME.get(symbol, symbol)}] "
+        f"{REGIME_NAME.get(regime, regime)} 에피소드 #{ep_idx}\n"
+        f"    기간: {s_ts.date()} → {e_ts.date()}  |  캔들 수: {len(df)}\n"
+        f"{'-'*60}"
+    )
+
+    # 백테스트 객체는 에피소드당 하나 (그리드/목표함수 시도/재평가 공용)
+    bt = _make_backtest(df, symbol, regime, initial_cash)
+    # 캐시 키는 run()이 실제로 보는 (단위 환산된) 프레임 기준이어야 적중한다
+    preload_indicators(_run_frame(bt))
+
+    # === 최적화 분기 ===
+    if method == "grid":
+        best_params, metric_name, metric_value = _run_grid(bt)
+
+    elif method in ("ga", "bayes", "random") and _HAS_OPTIMIZERS:
+        param_spaces = get_param_spaces()
+        space_keys = sorted(param_spaces)
+        # GA/Bayes는 choices로 스냅된 같은 조합을 자주 다시 묻는다 → 스냅 결과 튜플로 메모
+        obj_cache = {}
+        # 진입 신호가 전혀 없는 조합은 백테스트 없이 거절 (min_trades가 0이면 거절 대상이 아니므로 끔)
+        frame = _run_frame(bt)
+        reject_no_signal = _min_trades(len(df)) > 0
+
+        def objective(eval_params: dict) -> float:
+            snapped = {}
+            for k, s in param_spaces.items():
+                v = eval_params.get(k)
+                ch = s.get("choices")
+                if ch:
+                    v = v if v in ch else ch[0]
+                snapped[k] = v
+            if snapped.get("ema_short", 0) >= snapped.get("ema_long", 1):
+                return -1e12
+            if snapped.get("risk_reward_ratio", 0) <= snapped.get("sl_atr_multiplier", 0):
+                return -1e12
+            key = tuple(snapped[k] for k in space_keys)
+            score = obj_cache.get(key)
+            if score is None:
+                if reject_no_signal and not _has_entry_signal(frame, snapped, regime):
+                    score = -1e12  # 주문 0건 → run_backtest_with_params의 '거래 수 부족'과 같은 값
+                else:
+                    _, score, _ = run_backtest_with_params(df, snapped, initial_cash, symbol, regime, bt=bt)
+                obj_cache[key] = score
+            return score  # 큰 값이 좋음
+
+        if method == "ga":
+            best_params_dict, metric_value = run_ga(objective, param_spaces)
+        elif method == "random":
+            best_params_dict, metric_value = run_random(objective, param_spaces)
+        else:
+            import numpy as _np
+            def objective_min(eval_params: dict) -> float:
+                s = objective(eval_params)
+                return -float(s) if (s is not None and _np.isfinite(s)) else 1e12
+            best_params_dict, metric_value_min = run_bayes(objective_min, param_spaces)
+            metric_value = -float(metric_value_min)
+
+        best_params = best_params_dict
+        metric_name = "Objective"
+
+    else:
+        # 폴백: grid
+        best_params, metric_name, metric_value = _run_grid(bt)
+
+    print(
+        f"\n--- ✅ [{symbol} | {SYMBOL_NAME.get(symbol, symbol)}] "
+        f"{REGIME_NAME.get(regime, regime)} 에피소드 #{ep_idx} 최적화 완료! "
+        f"(평가지표: {metric_name} = {metric_value:.3f}) ---"
+    )
+
+    # === 공통: 베스트 파라미터 재평가 + 리포트/로그 + 저장 ===
+    best_params = BestParams.from_source(best_params)
+    best_kv = asdict(best_params)
+    print("   📊 Best Params:", json.dumps(_to_jsonable_dict(best_kv), ensure_ascii=False))
+    print(f"   🏆 {metric_name}: {metric_value:.4f}")
+
+    # 재평가
+    stats_eval = bt.run(**best_kv)
+
+    def _g(name, default=0.0):
+        try:
+            v = stats_eval.get(name, default)
+            return float(v) if v is not None else default
+        except Exception:
+            return default
+
+    trades = int(stats_eval.get("# Trades", 0) or 0)
+    wins = int(stats_eval.get("# Winning Trades", 0) or 0)
+    winrate = (wins / trades * 100.0) if trades else 0.0
+    ret_pct = _g("Return [%]")
+    cagr = _g("Return (Ann.) [%]")
+    mdd = _g("Max. Drawdown [%]")
+    pf = _g("Profit Factor")
+    exposure = _g("Exposure Time [%]")
+    calmar = stats_eval.get("Calmar Ratio", None)
+    sharpe = stats_eval.get("Sharpe Ratio", None)
+
+    print(
+        f"   ── 성과 요약 (재평가) │ {symbol} {SYMBOL_NAME.get(symbol, symbol)} │ "
+        f"{REGIME_NAME.get(regime, regime)} ─────────────"
+    )
+    print(f"   • 총수익률: {ret_pct:.2f}%  |  연환산수익률: {cagr:.2f}%  |  최대낙폭: {mdd:.2f}%")
+    print(f"   • 승률: {winrate:.2f}%       |  수익요인(PF): {pf:.3f}     |  거래수: {trades}")
+    print(f"   • 노출시간: {exposure:.2f}% |  칼마비율: {calmar}        |  샤프지수: {sharpe}")
+
+    # === HTML 리포트 저장 (local_backtesting/results/<SYMBOL>/...) ===
+    # Bokeh 렌더링은 에피소드마다 수 초가 걸리므로 REPORT_HTML=on 일 때만 생성
+    tag = f"{s_ts.date()}_{e_ts.date()}"
+    if os.getenv("REPORT_HTML", "off").lower() in ("1", "on", "true"):
+        results_root = os.path.join(os.path.dirname(__file__), "results", symbol)
+        os.makedirs(results_root, exist_ok=True)
+        html_path = os.path.join(results_root, f"{symbol}_{regime}_{tag}_best.html")
+        try:
+            bt.plot(results=stats_eval, open_browser=False, filename=html_path)
+            print(
+                f"   🧾 리포트 저장 완료: {html_path}  "
+                f"({symbol} {SYMBOL_NAME.get(symbol, symbol)} | {REGIME_NAME.get(regime, regime)} | 에피소드 #{ep_idx})"
+            )
+
+        except Exception as e:
+            print(f"   [WARN] HTML plot failed: {e}")
+
+    # ===== 결과 정리(JSON 저장은 메인 프로세스) =====
+    settings_entry = {
+        **{
+            "OPEN_TH": int(best_params.open_threshold),
+            "RR_RATIO": best_params.risk_reward_ratio,
+            "SL_ATR_MULTIPLIER": best_params.sl_atr_multiplier,
+            "TREND_ENTRY_CONFIRM_COUNT": best_params.trend_entry_confirm_count,
+            # 실행정책
+            "exec_partial": best_params.exec_partial,
+            "exec_time_stop_bars": best_params.exec_time_stop_bars,
+            "exec_trailing_mode": best_params.exec_trailing_mode,
+            "exec_trailing_k": best_params.exec_trailing_k,
+            # 리스크 사이징
+            "risk_per_trade": best_params.risk_per_trade,
+            "max_exposure_frac": best_params.max_exposure_frac,
+            "OPTIMIZED_METRIC": metric_name,
+            "VALUE": float(round(metric_value or 0.0, 4)),
+        },
+        "SUMMARY": {
+            "Return_%": round(ret_pct, 4),
+            "CAGR_%": round(cagr, 4),
+            "MaxDD_%": round(mdd, 4),
+            "WinRate_%": round(winrate, 4),
+            "ProfitFactor": round(pf, 4),
+            "Exposure_%": round(exposure, 4),
+            "Calmar": None if (calmar is None or (isinstance(calmar,float) and (math.isnan(calmar) or math.isinf(calmar)))) else round(float(calmar), 4),
+            "Sharpe": None if (sharpe is None or (isinstance(sharpe,float) and (math.isnan(sharpe) or math.isinf(sharpe)))) else round(float(sharpe), 4),
+            "Trades": trades,
+            "Period": {"start": s_ts.isoformat(), "end": e_ts.isoformat()}
+        }
+    }
+
+    # (2) 전략 점수/지표 파라미터는 메인 프로세스가 레짐별로 모아서 한 번에 구성
+    return symbol, regime, tag, settings_entry, best_params
+
+
+def _build_strategy_dict(template: Mapping, best_params: "BestParams") -> dict:
+    """레짐 전략 설정 템플릿 위에 최적 파라미터를 덮어쓴 strategies_optimized.json 항목 (순수 함수)"""
+    base_strategies = _clone_strategies(template)
+
+    (ema_short, ema_long, score_strong_trend, rsi_period, rsi_os, soc_os,
+     macd_up, adx_threshold, score_adx_strong) = _STRATEGY_PARAM_GETTER(best_params)
+
+    # 기존 설정 위에 최적값을 덮어쓴 하위 dict를 한 번에 만들어 교체
+    base_strategies["TrendStrategy"] = {
+        **base_strategies.get("TrendStrategy", {}),
+        "ema_short": ema_short,
+        "ema_long": ema_long,
+        "score_strong_trend": score_strong_trend,
+    }
+    base_strategies["OscillatorStrategy"] = {
+        **base_strategies.get("OscillatorStrategy", {}),
+        "rsi_period": rsi_period,
+        "rsi_oversold": rsi_os,
+        "rsi_overbought": 100 - rsi_os,
+        "score_oversold": soc_os,
+        "score_overbought": -soc_os,
+    }
+    base_strategies["ComprehensiveStrategy"] = {
+        **base_strategies.get("ComprehensiveStrategy", {}),
+        "score_macd_cross_up": macd_up,
+        "score_macd_cross_down": -macd_up,
+        "adx_threshold": adx_threshold,
+        "score_adx_strong": score_adx_strong,
+    }
+    return base_strategies
+
+
+def _optimize_episode_task(args):
+    return _optimize_episode(*args)
+
+
+# fork 워커가 물려받는 에피소드 작업 목록 — 인덱스만 넘겨 에피소드 df를 피클링하지 않는다
+_EPISODE_TASKS: list = []
+
+
+def _optimize_episode_at(i: int):
+    return _optimize_episode(*_EPISODE_TASKS[i])
 
 
 if __name__ == '__main__':
@@ -681,14 +1271,12 @@ if __name__ == '__main__':
     strategies_optimized_file = os.path.join(project_root, "strategies_optimized.json")
 
     try:
-        with open(optimal_settings_file, 'r', encoding='utf-8') as f:
-            all_settings = json.load(f)
+        all_settings = _read_json(optimal_settings_file)
     except (FileNotFoundError, json.JSONDecodeError):
         all_settings = {}
 
     try:
-        with open(strategies_optimized_file, 'r', encoding='utf-8') as f:
-            all_strategies = json.load(f)
+        all_strategies = _read_json(strategies_optimized_file)
     except (FileNotFoundError, json.JSONDecodeError):
         all_strategies = {"BULL": {}, "BEAR": {}, "SIDEWAYS": {}}
 
@@ -702,6 +1290,8 @@ if __name__ == '__main__':
     print(f"\n[OPT] 선택된 최적화 알고리즘: {method.upper()}  "
           f"(ENV OPT_METHOD={os.getenv('OPT_METHOD','auto')})")
 
+    # (symbol, regime, 에피소드) 작업을 모두 모은 뒤 한 풀에서 병렬 실행
+    tasks = []
     for symbol in symbols_to_optimize:
         print(f"\n\n{'='*68}\n📦 전체 데이터 로드: {symbol} (since 2018-01-01)\n{'='*68}")
         # 2018년부터 전구간 캔들 확보
@@ -716,39 +1306,20 @@ if __name__ == '__main__':
         # 폴백: 매크로 비어있으면 EMA200/MACD
         if not periods_by_regime["BULL"] and not periods_by_regime["BEAR"]:
             print("⚠️ 매크로 periods 비어있음 → EMA200/MACD 폴백으로 구간 작성")
-            df_tmp = klines.copy()
-            ema200 = df_tmp["Close"].ewm(span=200, adjust=False).mean()
-            ema12 = df_tmp["Close"].ewm(span=12, adjust=False).mean()
-            ema26 = df_tmp["Close"].ewm(span=26, adjust=False).mean()
-            macd = ema12 - ema26
-
-            def _mask_to_periods(mask_ser):
-                periods = []
-                run = None
-                prev_t = None
-                for t, m in mask_ser.items():
-                    if m and run is None:
-                        run = {"start": t}
-                    if (not m) and run is not None:
-                        run["end"] = prev_t
-                        periods.append(run)
-                        run = None
-                    prev_t = t
-                if run is not None:
-                    run["end"] = mask_ser.index[-1]
-                    periods.append(run)
-                # 최소 길이 필터(300 bars)
-                out = []
-                MIN_BARS = 300
-                for p in periods:
-                    mask = (mask_ser.index >= p["start"]) & (mask_ser.index <= p["end"])
-                    if mask.sum() >= MIN_BARS:
-                        out.append(p)
-                return out
-
-            mask_bull = (df_tmp["Close"] > ema200) & (macd > 0)
-            periods_by_regime["BULL"] = _mask_to_periods(mask_bull)
-            periods_by_regime["BEAR"] = _mask_to_periods(~mask_bull)
+            # 프레임 복사 없이 NumPy 배열로 한 번에 (EMA_200 열이 이미 있으면 재사용)
+            close_s = klines["Close"]
+            close = close_s.to_numpy(dtype=float)
+            if "EMA_200" in klines.columns:
+                ema200 = klines["EMA_200"].to_numpy(dtype=float)
+            else:
+                ema200 = _ema(close_s, 200).to_numpy()
+            macd = _ema(close_s, 12).to_numpy() - _ema(close_s, 26).to_numpy()
+
+            mask_bull = pd.Series((close > ema200) & (macd > 0), index=klines.index)
+            # 최소 길이 필터(300 bars) — True 구간은 BULL, False 구간은 BEAR
+            runs = label_runs_to_periods(mask_bull, min_bars=300)
+            periods_by_regime["BULL"] = runs.get(True, [])
+            periods_by_regime["BEAR"] = runs.get(False, [])
 
         # 에피소드별 최적화
         for regime in ["BULL", "BEAR"]:
@@ -757,7 +1328,7 @@ if __name__ == '__main__':
                 print(f"[SKIP] {symbol}/{regime}: 매크로 에피소드가 없습니다.")
                 continue
 
-            print(f"\n--- 🔬 [{symbol}] '{regime}' 에피소드 {len(episodes)}개 최적화 ---")
+            print(f"\n--- 🔬 [{symbol}] '{regime}' 에피소드 {len(episodes)}개 최적화 대기열 추가 ---")
             for ep_idx, ep in enumerate(episodes, start=1):
                 s_ts = pd.to_datetime(ep["start"])
                 e_ts = pd.to_datetime(ep["end"])
@@ -769,245 +1340,69 @@ if __name__ == '__main__':
 
                 df = df.copy()
                 df.columns = [c.capitalize() for c in df.columns]
-
-                print(
-                    f"\n{'-'*60}\n"
-                    f"⏱️ [{symbol} | {SYMBOL_NAME.get(symbol, symbol)}] "
-                    f"{REGIME_NAME.get(regime, regime)} 에피소드 #{ep_idx}\n"
-                    f"    기간: {s_ts.date()} → {e_ts.date()}  |  캔들 수: {len(df)}\n"
-                    f"{'-'*60}"
-                )
-
-                # === 최적화 분기 ===
-                if method == "grid":
-                    OptoRunner.symbol = symbol
-                    OptoRunner.market_regime = regime
-                    bt = FractionalBacktest(
-                        df, OptoRunner,
-                        cash=initial_cash, commission=.002, margin=1/10,
-                        finalize_trades=True
-                    )
-                    stats = bt.optimize(
-                        # 분석/임계
-                        open_threshold=[10, 12, 14, 16],
-                        risk_reward_ratio=[1.8, 2.0, 2.5, 3.0],
-                        sl_atr_multiplier=[1.2, 1.5, 1.8, 2.2],
-                        trend_entry_confirm_count=[2, 3, 4],
-                        ema_short=[12, 16, 20, 24],
-                        ema_long=[40, 50, 60, 80],
-                        score_strong_trend=[3, 4, 5],
-                        rsi_oversold=[20, 25, 30],
-                        score_oversold=[3, 4, 5],
-                        rsi_period=[14],
-                        score_macd_cross_up=[2, 3, 4],
-                        adx_threshold=[18, 22, 25, 28],
-                        score_adx_strong=[2, 3, 4],
-                        # 실행정책
-                        exec_partial=["1.0", "0.3,0.3,0.4"],
-                        exec_time_stop_bars=[0, 8, 12, 16],
-                        exec_trailing_mode=["off", "atr", "percent"],
-                        exec_trailing_k=[0.0, 1.0, 1.5, 2.0],
-                        # 리스크 사이징
-                        risk_per_trade=[0.005, 0.01, 0.015, 0.02],
-                        max_exposure_frac=[0.2, 0.3, 0.4],
-                        maximize='Calmar Ratio',
-                        constraint=lambda p: p.ema_short < p.ema_long and p.risk_reward_ratio > p.sl_atr_multiplier
-                    )
-                    best_params = stats._strategy
-                    metric_name = 'Calmar Ratio'
-                    metric_value = float(stats[metric_name]) if metric_name in stats and pd.notna(stats[metric_name]) else 0.0
-
-                elif method in ("ga", "bayes") and _HAS_OPTIMIZERS:
-                    param_spaces = get_param_spaces()
-                    def objective(eval_params: dict) -> float:
-                        snapped = {}
-                        for k, s in param_spaces.items():
-                            v = eval_params.get(k)
-                            ch = s.get("choices")
-                            if ch:
-                                v = v if v in ch else ch[0]
-                            snapped[k] = v
-                        if snapped.get("ema_short", 0) >= snapped.get("ema_long", 1):
-                            return -1e12
-                        if snapped.get("risk_reward_ratio", 0) <= snapped.get("sl_atr_multiplier", 0):
-                            return -1e12
-                        _, score, _ = run_backtest_with_params(df, snapped, initial_cash, symbol, regime)
-                        return score  # 큰 값이 좋음
-
-                    if method == "ga":
-                        best_params_dict, metric_value = run_ga(objective, param_spaces)
-                    else:
-                        import numpy as _np
-                        def objective_min(eval_params: dict) -> float:
-                            s = objective(eval_params)
-                            return -float(s) if (s is not None and _np.isfinite(s)) else 1e12
-                        best_params_dict, metric_value_min = run_bayes(objective_min, param_spaces)
-                        metric_value = -float(metric_value_min)
-
-                    class _Wrap: ...
-                    best_params = _Wrap()
-                    for k, v in best_params_dict.items():
-                        setattr(best_params, k, v)
-                    metric_name = "Objective"
-
+                tasks.append((symbol, regime, ep_idx, s_ts, e_ts, df, initial_cash, method))
+
+    # 에피소드마다 파일 전체를 다시 쓰지 않고 끝에서 한 번 저장
+    # (OPT_SAVE_EACH_EPISODE=1이면 중간 저장 — 변경이 있을 때만, OPT_SAVE_INTERVAL_SEC 간격으로 묶어서)
+    save_each = os.getenv("OPT_SAVE_EACH_EPISODE", "0") == "1"
+    save_interval = float(os.getenv("OPT_SAVE_INTERVAL_SEC", "5"))
+    flush_state = {"dirty": False, "at": 0.0}
+
+    # 디스크 쓰기는 writer 스레드에 넘기고 바로 다음 에피소드 결과를 받는다
+    pending_writes = []
+    # 레짐별로 (제출 순서상) 마지막 에피소드의 best_params
+    best_by_regime = {}
+
+    def _flush_results():
+        flush_state["dirty"] = False
+        flush_state["at"] = time.monotonic()
+        # 성공한 쓰기만 정리 (실패는 끝에서 result()로 드러낸다)
+        pending_writes[:] = [f for f in pending_writes if not f.done() or f.exception() is not None]
+        pending_writes.append(_write_json_async(optimal_settings_file, all_settings, indent=2))
+        # 레짐별 최신 best_params로 전략 설정을 한 번에 재구성 (파일에만 있는 레짐은 유지)
+        version = getattr(config, "version", 0)
+        all_strategies.update({
+            r: _build_strategy_dict(_cached_strategy_configs(r, version), p)
+            for r, p in best_by_regime.items()
+        })
+        pending_writes.append(_write_json_async(strategies_optimized_file, all_strategies, indent=2))
+
+    def _save_result(result):
+        symbol, regime, tag, settings_entry, best_params = result
+        by_tag = all_settings.setdefault(f"{regime}", {}).setdefault(symbol, {})
+        # 이전 실행/에피소드와 같은 결과면 파일을 다시 쓸 이유가 없다
+        if by_tag.get(tag) != settings_entry or best_by_regime.get(regime) != best_params:
+            flush_state["dirty"] = True
+        by_tag[tag] = settings_entry
+        best_by_regime[regime] = best_params
+        if (save_each and flush_state["dirty"]
+                and time.monotonic() - flush_state["at"] >= save_interval):
+            _flush_results()
+
+    # 에피소드 병렬도 (1이면 순차 실행 + optimize 내부 프로세스 풀 사용)
+    episode_workers = int(os.getenv("OPT_EPISODE_WORKERS", min(os.cpu_count() or 1, 4)))
+    try:
+        if episode_workers > 1 and len(tasks) > 1:
+            _EPISODE_TASKS[:] = tasks  # Pool 생성(fork) 전에 채워야 워커에 보인다
+            with multiprocessing.Pool(processes=min(episode_workers, len(tasks)),
+                                      initializer=_init_episode_worker) as pool:
+                # imap은 제출 순서대로 결과를 돌려주므로 저장 순서가 순차 실행과 같다
+                if multiprocessing.get_start_method() == "fork":
+                    results = pool.imap(_optimize_episode_at, range(len(tasks)))
                 else:
-                    # 폴백: grid
-                    OptoRunner.symbol = symbol
-                    OptoRunner.market_regime = regime
-                    bt = FractionalBacktest(
-                        df, OptoRunner,
-                        cash=initial_cash, commission=.002, margin=1/10,
-                        finalize_trades=True
-                    )
-                    stats = bt.optimize(
-                        open_threshold=[10, 12, 14, 16],
-                        risk_reward_ratio=[1.8, 2.0, 2.5, 3.0],
-                        sl_atr_multiplier=[1.2, 1.5, 1.8, 2.2],
-                        trend_entry_confirm_count=[2, 3, 4],
-                        ema_short=[12, 16, 20, 24],
-                        ema_long=[40, 50, 60, 80],
-                        score_strong_trend=[3, 4, 5],
-                        rsi_oversold=[20, 25, 30],
-                        score_oversold=[3, 4, 5],
-                        rsi_period=[14],
-                        score_macd_cross_up=[2, 3, 4],
-                        adx_threshold=[18, 22, 25, 28],
-                        score_adx_strong=[2, 3, 4],
-                        exec_partial=["1.0", "0.3,0.3,0.4"],
-                        exec_time_stop_bars=[0, 8, 12, 16],
-                        exec_trailing_mode=["off", "atr", "percent"],
-                        exec_trailing_k=[0.0, 1.0, 1.5, 2.0],
-                        risk_per_trade=[0.005, 0.01, 0.015, 0.02],
-                        max_exposure_frac=[0.2, 0.3, 0.4],
-                        maximize='Calmar Ratio',
-                        constraint=lambda p: p.ema_short < p.ema_long and p.risk_reward_ratio > p.sl_atr_multiplier
-                    )
-                    best_params = stats._strategy
-                    metric_name = 'Calmar Ratio'
-                    metric_value = float(stats[metric_name]) if metric_name in stats and pd.notna(stats[metric_name]) else 0.0
-
-                print(
-                    f"\n--- ✅ [{symbol} | {SYMBOL_NAME.get(symbol, symbol)}] "
-                    f"{REGIME_NAME.get(regime, regime)} 에피소드 #{ep_idx} 최적화 완료! "
-                    f"(평가지표: {metric_name} = {metric_value:.3f}) ---"
-                )
-
-                # === 공통: 베스트 파라미터 재평가 + 리포트/로그 + 저장 ===
-                best_kv = {k: getattr(best_params, k) for k in BEST_PARAM_KEYS if hasattr(best_params, k)}
-                print("   📊 Best Params:", json.dumps(_to_jsonable_dict(best_kv), ensure_ascii=False))
-                print(f"   🏆 {metric_name}: {metric_value:.4f}")
-
-                # 재평가
-                bt_eval = FractionalBacktest(
-                    df, OptoRunner,
-                    cash=initial_cash, commission=.002, margin=1/10,
-                    finalize_trades=True
-                )
-                best_kwargs = {k: getattr(best_params, k) for k in BEST_PARAM_KEYS if hasattr(best_params, k)}
-                stats_eval = bt_eval.run(**best_kwargs)
-
-                def _g(name, default=0.0):
-                    try:
-                        v = stats_eval.get(name, default)
-                        return float(v) if v is not None else default
-                    except Exception:
-                        return default
-
-                trades = int(stats_eval.get("# Trades", 0) or 0)
-                wins = int(stats_eval.get("# Winning Trades", 0) or 0)
-                winrate = (wins / trades * 100.0) if trades else 0.0
-                ret_pct = _g("Return [%]")
-                cagr = _g("Return (Ann.) [%]")
-                mdd = _g("Max. Drawdown [%]")
-                pf = _g("Profit Factor")
-                exposure = _g("Exposure Time [%]")
-                calmar = stats_eval.get("Calmar Ratio", None)
-                sharpe = stats_eval.get("Sharpe Ratio", None)
-
-                print(
-                    f"   ── 성과 요약 (재평가) │ {symbol} {SYMBOL_NAME.get(symbol, symbol)} │ "
-                    f"{REGIME_NAME.get(regime, regime)} ─────────────"
-                )
-                print(f"   • 총수익률: {ret_pct:.2f}%  |  연환산수익률: {cagr:.2f}%  |  최대낙폭: {mdd:.2f}%")
-                print(f"   • 승률: {winrate:.2f}%       |  수익요인(PF): {pf:.3f}     |  거래수: {trades}")
-                print(f"   • 노출시간: {exposure:.2f}% |  칼마비율: {calmar}        |  샤프지수: {sharpe}")
-
-                # === HTML 리포트 저장 (local_backtesting/results/<SYMBOL>/...) ===
-                results_root = os.path.join(os.path.dirname(__file__), "results", symbol)
-                os.makedirs(results_root, exist_ok=True)
-                tag = f"{s_ts.date()}_{e_ts.date()}"
-                html_path = os.path.join(results_root, f"{symbol}_{regime}_{tag}_best.html")
-                try:
-                    bt_eval.plot(open_browser=False, filename=html_path)
-                    print(
-                        f"   🧾 리포트 저장 완료: {html_path}  "
-                        f"({symbol} {SYMBOL_NAME.get(symbol, symbol)} | {REGIME_NAME.get(regime, regime)} | 에피소드 #{ep_idx})"
-                    )
-
-                except Exception as e:
-                    print(f"   [WARN] HTML plot failed: {e}")
-
-                # ===== 결과 저장(JSON) =====
-                all_settings.setdefault(f"{regime}", {}).setdefault(symbol, {})
-                all_settings[regime][symbol][tag] = {
-                    **{
-                        "OPEN_TH": int(getattr(best_params, "open_threshold")),
-                        "RR_RATIO": float(getattr(best_params, "risk_reward_ratio")),
-                        "SL_ATR_MULTIPLIER": float(getattr(best_params, "sl_atr_multiplier")),
-                        "TREND_ENTRY_CONFIRM_COUNT": int(getattr(best_params, "trend_entry_confirm_count")),
-                        # 실행정책
-                        "exec_partial": getattr(best_params, "exec_partial", "1.0"),
-                        "exec_time_stop_bars": int(getattr(best_params, "exec_time_stop_bars", 0)),
-                        "exec_trailing_mode": getattr(best_params, "exec_trailing_mode", "off"),
-                        "exec_trailing_k": float(getattr(best_params, "exec_trailing_k", 0.0)),
-                        # 리스크 사이징
-                        "risk_per_trade": float(getattr(best_params, "risk_per_trade", 0.01)),
-                        "max_exposure_frac": float(getattr(best_params, "max_exposure_frac", 0.30)),
-                        "OPTIMIZED_METRIC": metric_name,
-                        "VALUE": float(round(metric_value or 0.0, 4)),
-                    },
-                    "SUMMARY": {
-                        "Return_%": round(ret_pct, 4),
-                        "CAGR_%": round(cagr, 4),
-                        "MaxDD_%": round(mdd, 4),
-                        "WinRate_%": round(winrate, 4),
-                        "ProfitFactor": round(pf, 4),
-                        "Exposure_%": round(exposure, 4),
-                        "Calmar": None if (calmar is None or (isinstance(calmar,float) and (math.isnan(calmar) or math.isinf(calmar)))) else round(float(calmar), 4),
-                        "Sharpe": None if (sharpe is None or (isinstance(sharpe,float) and (math.isnan(sharpe) or math.isinf(sharpe)))) else round(float(sharpe), 4),
-                        "Trades": trades,
-                        "Period": {"start": s_ts.isoformat(), "end": e_ts.isoformat()}
-                    }
-                }
-                with open(optimal_settings_file, 'w', encoding='utf-8') as f:
-                    json.dump(all_settings, f, indent=4, ensure_ascii=False)
-
-                # (2) 전략 점수/지표 파라미터 저장
-                base_strategies = get_strategy_configs_safe(regime)
-                base_strategies = json.loads(json.dumps(base_strategies))  # deep copy
-                base_strategies.setdefault("TrendStrategy", {})
-                base_strategies.setdefault("OscillatorStrategy", {})
-                base_strategies.setdefault("ComprehensiveStrategy", {})
-
-                base_strategies["TrendStrategy"]["ema_short"] = int(getattr(best_params, "ema_short"))
-                base_strategies["TrendStrategy"]["ema_long"] = int(getattr(best_params, "ema_long"))
-                base_strategies["TrendStrategy"]["score_strong_trend"] = int(getattr(best_params, "score_strong_trend"))
-
-                base_strategies["OscillatorStrategy"]["rsi_period"] = int(getattr(best_params, "rsi_period"))
-                rsi_os = int(getattr(best_params, "rsi_oversold"))
-                base_strategies["OscillatorStrategy"]["rsi_oversold"] = rsi_os
-                base_strategies["OscillatorStrategy"]["rsi_overbought"] = 100 - rsi_os
-                soc_os = int(getattr(best_params, "score_oversold"))
-                base_strategies["OscillatorStrategy"]["score_oversold"] = soc_os
-                base_strategies["OscillatorStrategy"]["score_overbought"] = -soc_os
-
-                base_strategies["ComprehensiveStrategy"]["score_macd_cross_up"] = int(getattr(best_params, "score_macd_cross_up"))
-                base_strategies["ComprehensiveStrategy"]["score_macd_cross_down"] = -int(getattr(best_params, "score_macd_cross_up"))
-                base_strategies["ComprehensiveStrategy"]["adx_threshold"] = int(getattr(best_params, "adx_threshold"))
-                base_strategies["ComprehensiveStrategy"]["score_adx_strong"] = int(getattr(best_params, "score_adx_strong"))
-
-                all_strategies[regime] = base_strategies or {}
-                with open(strategies_optimized_file, 'w', encoding='utf-8') as f:
-                    json.dump(all_strategies, f, indent=2, ensure_ascii=False)
-
-                print(f"   💾 저장 완료 → {optimal_settings_file}, {strategies_optimized_file}")
+                    # spawn 워커는 부모 전역을 물려받지 못하므로 작업(df 포함)을 직접 전달
+                    results = pool.imap(_optimize_episode_task, tasks)
+                for result in results:
+                    _save_result(result)
+        else:
+            for task in tasks:
+                _save_result(_optimize_episode(*task))
+    finally:
+        # 중단/예외 시에도 그때까지 끝난 에피소드 결과는 남긴다
+        if flush_state["dirty"]:
+            _flush_results()
+        # 종료 전에 남은 쓰기를 모두 기다린다 (쓰기 실패는 여기서 예외로 드러남)
+        for fut in pending_writes:
+            fut.result()
+        if flush_state["at"]:
+            print(f"   💾 저장 완료 → {optimal_settings_file}, {strategies_optimized_file}")
@@ -38,7 +38,7 @@ except Exception:
 # ==== 프로젝트 모듈 임포트 ====
 from core.config_manager import config
 from analysis import indicator_calculator
-from local_backtesting.backtest_optimizer import OptoRunner  # 최적화 시 사용한 전략 재사용
+from local_backtesting.backtest_optimizer import OptoRunner, _to_jsonable_dict  # 최적화 시 사용한 전략/직렬화 재사용
 
 # 멀티프로세싱
 backtesting.Pool = multiprocessing.Pool
@@ -47,33 +47,6 @@ backtesting.Pool = multiprocessing.Pool
 RESULTS_ROOT = os.path.join(project_root, "local_backtesting", "results")
 
 
-# ---------------- 유틸: JSON 직렬화 ----------------
-def _to_jsonable_dict(d: dict) -> dict:
-    def conv(x):
-        try:
-            import numpy as np  # noqa
-            if isinstance(x, (np.integer,)):
-                return int(x)
-            if isinstance(x, (np.floating,)):
-                return float(x)
-            if isinstance(x, (np.bool_,)):
-                return bool(x)
-        except Exception:
-            pass
-        if isinstance(x, pd.Timestamp):
-            return x.isoformat()
-        if isinstance(x, (int, float, bool, str)) or x is None:
-            return x
-        try:
-            return float(x)
-        except Exception:
-            try:
-                return int(x)
-            except Exception:
-                return str(x)
-    return {k: conv(v) for k, v in d.items()}
-
-
 # ---------------- 기간 → 캔들 수 ----------------
 def _candles_per_day(timeframe: str) -> int:
     tf = timeframe.lower().strip()
@@ -218,6 +218,57 @@ def run_bayes(objective: Callable[[Dict[str, Any]], float],
     return best_p or {}, float(best_s)
 
 
+# =============================================================================
+# 무작위 탐색 + 국소 개선 (외부 라이브러리 불필요)
+# =============================================================================
+
+def run_random(objective: Callable[[Dict[str, Any]], float],
+               param_spaces: Dict[str, Dict[str, Any]],
+               n_calls: int = 300,
+               refine_frac: float = 0.3,
+               random_state: int = 42) -> Tuple[Dict[str, Any], float]:
+    """
+    전체 그리드 대신 n_calls 회만 평가:
+      - (1 - refine_frac) 비율은 중복 없는 무작위 표본
+      - 나머지는 현재 최고점 주변 이웃 값 돌연변이로 국소 개선(hill climbing)
+    반환: (best_params_dict, best_score) — 목적함수는 '큰 값이 좋음'
+    """
+    random.seed(random_state)
+    samplers = _build_samplers(param_spaces)
+    keys = list(samplers.keys())
+    seen: Dict[tuple, float] = {}
+
+    def _evaluate(p: Dict[str, Any]) -> float:
+        key = tuple(p[k] for k in keys)
+        if key not in seen:
+            try:
+                val = float(objective(p))
+            except Exception:
+                val = -1e18
+            seen[key] = -1e18 if math.isnan(val) else val
+        return seen[key]
+
+    best_p, best_s = None, -1e18
+    n_explore = max(1, int(n_calls * (1.0 - refine_frac)))
+    tries = 0
+    while len(seen) < n_explore and tries < n_explore * 5:
+        tries += 1
+        p = _sample_params(samplers)
+        s = _evaluate(p)
+        if best_p is None or s > best_s:
+            best_p, best_s = p, s
+
+    tries = 0
+    while len(seen) < n_calls and tries < n_calls * 5:
+        tries += 1
+        cand = _mutate_params(samplers, best_p, prob=0.2)
+        s = _evaluate(cand)
+        if s > best_s:
+            best_p, best_s = cand, s
+
+    return dict(best_p or {}), float(best_s)
+
+
 # =============================================================================
 # 유전 알고리즘 (간단 구현, 외부 라이브러리 불필요)
 # =============================================================================
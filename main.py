@@ -3,16 +3,30 @@
 import discord
 from discord.ext import commands
 from binance.client import Client
+from execution.binance_client import FastAsyncClient, KeepAliveHTTPAdapter, keepalive_socket_factory
+import aiohttp
 import asyncio
 
+# ---- (옵션) uvloop이 있으면 더 빠른 이벤트 루프 사용 (Windows 미지원) ----
+try:
+    import uvloop
+    _HAS_UVLOOP = True
+except Exception:
+    _HAS_UVLOOP = False
+
 # 1. 핵심 모듈 임포트
 from core.config_manager import config
+from core.log_queue import setup_queue_logging, stop_queue_logging
+from database.trade_writer import trade_writer
 from execution.trading_engine import TradingEngine
 from analysis.confluence_engine import ConfluenceEngine
 from risk_management.position_sizer import PositionSizer
 from core.tasks import BackgroundTasks
 from ui.views import ControlPanelView
 
+# 로그 포맷/출력은 백그라운드 스레드에서 처리 (이벤트 루프 블로킹 방지)
+setup_queue_logging(config.log_level)
+
 # 2. 봇 클래스 정의 및 엔진 초기화
 intents = discord.Intents.default()
 intents.message_content = True
@@ -28,6 +42,10 @@ class FTM3Bot(commands.Bot):
             self.binance_client = Client(config.api_key, config.api_secret, testnet=config.is_testnet)
             if config.is_testnet:
                 self.binance_client.FUTURES_URL = 'https://testnet.binancefuture.com'
+            # 동기 클라이언트도 커넥션 풀을 키워 여러 스레드/작업이 연결을 재사용하도록
+            self.binance_client.session.mount(
+                "https://", KeepAliveHTTPAdapter(pool_connections=32, pool_maxsize=64, pool_block=False)
+            )
             self.binance_client.ping()
             print(f"✅ 바이낸스 연결 성공. (환경: {config.trade_mode})")
         except Exception as e:
@@ -36,7 +54,9 @@ class FTM3Bot(commands.Bot):
             raise RuntimeError("Binance connection failed") from e
             
         # 핵심 엔진들 초기화 및 봇 속성으로 등록
-        self.trading_engine = TradingEngine(self.binance_client)
+        # ▼▼▼ [수정] 트레이딩 엔진은 비동기 클라이언트를 setup_hook에서 주입받는다 ▼▼▼
+        self.async_binance_client: FastAsyncClient = None
+        self.trading_engine = TradingEngine()
         self.confluence_engine = ConfluenceEngine(self.binance_client)
         self.position_sizer = PositionSizer(self.binance_client)
         
@@ -46,6 +66,34 @@ class FTM3Bot(commands.Bot):
         # 다른 모듈(cogs)에서 panel embed 함수를 참조할 수 있도록 bot 객체에 할당
         self.get_panel_embed = self.background_tasks.get_panel_embed
 
+    async def setup_hook(self):
+        """이벤트 루프가 준비된 뒤 비동기 바이낸스 클라이언트를 만들어 트레이딩 엔진에 연결합니다."""
+        # TLS 세션을 뜨겁게 유지하도록 커넥션 풀을 넉넉히 잡는다
+        connector = aiohttp.TCPConnector(
+            limit=50, limit_per_host=50, keepalive_timeout=75,
+            socket_factory=keepalive_socket_factory,
+        )
+        self.async_binance_client = await FastAsyncClient.create(
+            config.api_key, config.api_secret,
+            testnet=config.is_testnet,
+            session_params={"connector": connector},
+        )
+        self.trading_engine.client = self.async_binance_client
+        # 첫 주문 전에 TLS 연결/거래소 필터를 미리 데워둔다
+        await self.trading_engine.warmup()
+        # 포지션/체결 정보는 유저데이터 웹소켓으로 받아 REST 폴링을 줄인다
+        self.trading_engine.start_user_stream()
+        print("✅ 비동기 바이낸스 클라이언트 준비 완료.")
+
+    async def close(self):
+        if self.async_binance_client is not None:
+            await self.trading_engine.stop_user_stream()
+            await self.async_binance_client.close_connection()
+        # 큐에 남은 거래 기록을 모두 커밋한 뒤 종료
+        await trade_writer.stop()
+        await super().close()
+        stop_queue_logging()
+
 # 봇 인스턴스 생성
 bot = FTM3Bot(command_prefix='!', intents=intents)
 
@@ -108,6 +156,10 @@ if __name__ == "__main__":
     if not config.discord_bot_token:
         print("🚨 .env 파일에 DISCORD_BOT_TOKEN이 설정되지 않았습니다. 봇을 실행할 수 없습니다.")
     else:
+        if _HAS_UVLOOP:
+            # bot.run() 내부의 asyncio.run()이 uvloop 루프를 사용하도록 정책 지정
+            asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+            print("⚡ uvloop 이벤트 루프를 사용합니다.")
         try:
             bot.run(config.discord_bot_token)
         except RuntimeError as e:
@@ -0,0 +1,51 @@
+# 파일명: test/test_backtest_optimizer_helpers.py
+# 옵티마이저의 순수 헬퍼 (점수 윈도우 평균, 진입 방향, 레짐 구간 압축)
+
+import pytest
+import numpy as np
+import pandas as pd
+
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# 옵티마이저는 지표 계산(pandas_ta)을 import 시점에 불러온다
+pytest.importorskip("pandas_ta")
+from local_backtesting.backtest_optimizer import _entry_sides, _window_mean, label_runs_to_periods
+
+
+@pytest.mark.parametrize("k", [1, 2, 3, 7])
+def test_window_mean_matches_window_sums(k):
+    # 점수는 정수라 누적합 차분도 오차 없이 창 합계와 같아야 한다
+    scores = np.random.default_rng(3).integers(-10, 11, 50).astype(float)
+    out = _window_mean(scores, k)
+    assert np.isnan(out[:k - 1]).all()
+    expected = [scores[i - k + 1:i + 1].sum() / k for i in range(k - 1, len(scores))]
+    assert out[k - 1:].tolist() == expected
+
+
+def test_window_mean_shorter_than_window():
+    assert np.isnan(_window_mean(np.array([1.0, 2.0]), 3)).all()
+    assert len(_window_mean(np.array([]), 3)) == 0
+
+
+def test_entry_sides_by_regime():
+    avg = np.array([np.nan, -5.0, -2.0, 0.0, 2.0, 5.0])
+    assert _entry_sides(avg, "BULL", 2.0).tolist() == [0, 0, 0, 0, 1, 1]
+    assert _entry_sides(avg, "BEAR", 2.0).tolist() == [0, -1, -1, 0, 0, 0]
+    assert _entry_sides(avg, "SIDEWAYS", 2.0).tolist() == [0] * 6
+
+
+def test_label_runs_to_periods():
+    index = pd.date_range("2024-01-01", periods=10, freq="4h")
+    labels = pd.Series(["BULL"] * 4 + ["BEAR"] * 2 + ["BULL"] * 4, index=index)
+
+    periods = label_runs_to_periods(labels, min_bars=3)
+    assert periods == {
+        "BULL": [
+            {"start": index[0], "end": index[3]},
+            {"start": index[6], "end": index[9]},
+        ],
+    }
+    assert label_runs_to_periods(labels, min_bars=1)["BEAR"] == [{"start": index[4], "end": index[5]}]
+    assert label_runs_to_periods(labels.iloc[:0]) == {}
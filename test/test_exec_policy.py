@@ -0,0 +1,49 @@
+# 파일명: test/test_exec_policy.py
+# 실행정책은 (심볼, 시장 레짐)별로 optimal_settings.json에서 골라야 한다 (BEAR에서 BULL 리스크 설정 사용 금지)
+
+import json
+
+import pytest
+
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.config_manager import config
+from execution.trading_engine import ExecPolicy
+
+
+@pytest.fixture
+def optimal_settings(tmp_path, monkeypatch):
+    """레짐별로 SL/RR이 다른 최적화 결과 파일을 임시로 로드"""
+    settings = {
+        "BULL": {"BTCUSDT": {"OPEN_TH": 12, "RR_RATIO": 3.0, "SL_ATR_MULTIPLIER": 1.5}},
+        "BEAR": {"BTCUSDT": {"OPEN_TH": 12, "RR_RATIO": 1.5, "SL_ATR_MULTIPLIER": 2.0}},
+        "SIDEWAYS": {},
+    }
+    path = tmp_path / "optimal_settings.json"
+    path.write_text(json.dumps(settings), encoding="utf-8")
+    monkeypatch.setattr(config, "optimal_settings_path", str(path))
+    config.maybe_reload(force=True)
+    yield settings
+    monkeypatch.undo()
+    config.maybe_reload(force=True)
+
+
+def test_bull_and_bear_policies_differ(optimal_settings):
+    bull = ExecPolicy.from_config("BTCUSDT", "BULL")
+    bear = ExecPolicy.from_config("BTCUSDT", "bear")  # 대소문자 무관
+    assert (bull.sl_atr_mult, bull.rr) == (1.5, 3.0)
+    assert (bear.sl_atr_mult, bear.rr) == (2.0, 1.5)
+
+
+def test_missing_regime_uses_global_defaults(optimal_settings):
+    """해당 레짐 설정이 없으면 다른 레짐(BULL)이 아니라 전역 기본값"""
+    sideways = ExecPolicy.from_config("BTCUSDT", "SIDEWAYS")
+    assert sideways.sl_atr_mult == getattr(config, "sl_atr_multiplier", 1.5)
+    assert sideways.rr == getattr(config, "risk_reward_ratio", 2.0)
+
+
+def test_regime_is_required():
+    with pytest.raises(TypeError):
+        ExecPolicy.from_config("BTCUSDT")
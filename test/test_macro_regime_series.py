@@ -0,0 +1,46 @@
+# 파일명: test/test_macro_regime_series.py
+# 전 구간 일괄 진단(diagnose_macro_regime_series)이 날짜별 진단과 같은 레짐을 내는지 확인
+
+import pytest
+import numpy as np
+import pandas as pd
+
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from analysis.macro_analyzer import MacroAnalyzer
+
+
+@pytest.fixture
+def macro_data():
+    """영업일 기준 일봉 거시 지표 (normalize된 인덱스) — 값은 임계값 양쪽을 오가도록 생성"""
+    rng = np.random.default_rng(11)
+    days = pd.bdate_range("2021-02-01", "2021-12-31")
+    n = len(days)
+    nasdaq = pd.DataFrame({"Close": 100 + rng.normal(0, 2, n).cumsum()}, index=days)
+    nasdaq["SMA_200"] = nasdaq["Close"].rolling(20).mean()
+    vix = pd.DataFrame({"Close": rng.uniform(10, 35, n)}, index=days)
+    vix["SMA_20"] = vix["Close"].rolling(20).mean()
+    hy = pd.Series(4 + rng.normal(0, 0.3, n).cumsum() * 0.1, index=days)
+    yc = pd.Series(rng.uniform(-0.5, 1.0, n), index=days)
+    return {"nasdaq": nasdaq, "vix": vix, "hy_spread": hy, "t10y2y": yc}
+
+
+def test_series_matches_per_date(macro_data):
+    # 거시 데이터 시작 전 구간과 주말(직전 영업일 값 사용)이 포함되도록 4h 인덱스 생성
+    index = pd.date_range("2021-01-15", "2021-12-31", freq="4h", tz="UTC")
+    analyzer = MacroAnalyzer()
+
+    series = analyzer.diagnose_macro_regime_series(index, macro_data)
+    expected = [analyzer.diagnose_macro_regime_for_date(ts, macro_data)[0].name for ts in index]
+
+    assert series.index.equals(index)
+    assert series.tolist() == expected
+    assert {"BULL", "BEAR", "SIDEWAYS"} <= set(expected)
+
+
+def test_series_without_macro_data_is_sideways():
+    index = pd.date_range("2021-01-01", periods=10, freq="4h")
+    series = MacroAnalyzer().diagnose_macro_regime_series(index, {"nasdaq": None, "vix": None})
+    assert (series == "SIDEWAYS").all()
@@ -0,0 +1,63 @@
+# 파일명: test/test_strategy_vectorized.py
+# 백테스트는 analyze_vectorized 점수만 쓰므로, 봉마다 접두 구간으로 analyze()를 부른 합계와 같아야 한다.
+
+import pytest
+import numpy as np
+import pandas as pd
+
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from analysis.strategies.trend_strategy import TrendStrategy
+from analysis.strategies.oscillator_strategy import OscillatorStrategy
+from analysis.strategies.comprehensive_strategy import ComprehensiveStrategy
+
+N_BARS = 300
+
+# 각 전략이 읽는 지표 컬럼 (기본 파라미터 기준)
+INDICATOR_COLUMNS = [
+    "EMA_20", "EMA_50",
+    "MFI_14", "OBV", "RSI_14", "STOCHk_14_3_3",
+    "MACD_12_26_9", "MACDs_12_26_9", "ADX_14", "ISA_9", "ISB_26",
+    "PSARl_0.02_0.2", "PSARs_0.02_0.2", "VTXP_14", "VTXM_14", "TRIX_30_9", "TRIXs_30_9",
+    "BBL_20_2.0", "BBU_20_2.0", "BBB_20_2.0", "CCI_20_0.015", "STOCHRSId_14_14_3_3",
+    "KCL_20_2", "KCU_20_2", "CMF_20", "EFI_13", "PPO_12_26_9", "PPOs_12_26_9", "CHOP_14_1_100",
+]
+
+
+@pytest.fixture
+def indicator_frame():
+    """임계값 양쪽을 오가는 난수 지표 + 곳곳의 NaN (지표 워밍업/결측 흉내)"""
+    rng = np.random.default_rng(7)
+    close = 100 + rng.normal(0, 1, N_BARS).cumsum()
+    df = pd.DataFrame({"close": close})
+    for col in INDICATOR_COLUMNS:
+        if col.startswith(("EMA", "ISA", "ISB", "BBL", "BBU", "KCL", "KCU", "PSAR")):
+            vals = close + rng.normal(0, 2, N_BARS)
+        elif col.startswith(("CCI",)):
+            vals = rng.normal(0, 150, N_BARS)
+        elif col.startswith(("MACD", "TRIX", "CMF", "EFI", "PPO", "VTX", "OBV")):
+            vals = rng.normal(0, 1, N_BARS)
+        else:
+            vals = rng.uniform(0, 100, N_BARS)
+        vals[rng.random(N_BARS) < 0.1] = np.nan
+        df[col] = vals
+    # PSAR은 롱/숏 중 한쪽만 값이 있다
+    long_side = rng.random(N_BARS) < 0.5
+    df.loc[long_side, "PSARs_0.02_0.2"] = np.nan
+    df.loc[~long_side, "PSARl_0.02_0.2"] = np.nan
+    return df
+
+
+@pytest.mark.parametrize("strategy_cls", [TrendStrategy, OscillatorStrategy, ComprehensiveStrategy])
+def test_analyze_vectorized_matches_per_bar(strategy_cls, indicator_frame):
+    """analyze_vectorized(df)[i] == sum(analyze(df.iloc[:i+1]).values())"""
+    strategy = strategy_cls(params={})
+    vectorized = strategy.analyze_vectorized(indicator_frame)
+    assert len(vectorized) == len(indicator_frame)
+
+    # ComprehensiveStrategy.analyze는 직전 봉(iloc[-2])을 읽으므로 두 번째 봉부터 비교
+    for i in range(1, len(indicator_frame)):
+        expected = sum(strategy.analyze(indicator_frame.iloc[:i + 1]).values())
+        assert vectorized[i] == pytest.approx(expected), f"bar {i}"
@@ -0,0 +1,31 @@
+# 파일명: test/test_trading_engine_helpers.py
+# 주문 가격/수량 양자화 헬퍼 (거래소 tickSize/stepSize 배수로 내림)
+
+import pytest
+
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from execution.trading_engine import _quantize, _step_decimals
+
+
+@pytest.mark.parametrize("step, decimals", [(0.01, 2), (0.001, 3), (0.5, 1), (1, 0), (10, 0)])
+def test_step_decimals(step, decimals):
+    assert _step_decimals(step) == decimals
+
+
+@pytest.mark.parametrize("x, step, expected", [
+    (0.123456, 0.001, 0.123),
+    (1.9999, 0.01, 1.99),   # 반올림이 아니라 내림
+    (0.3, 0.1, 0.3),        # 부동소수 나눗셈(0.3/0.1=2.999...)이면 0.2가 되는 경우
+    (7.3, 0.5, 7.0),
+    (1234.5, 10, 1230),
+    (65432.17, 0.1, 65432.1),
+])
+def test_quantize_floors_to_step(x, step, expected):
+    assert _quantize(x, step, _step_decimals(step)) == expected
+
+
+def test_quantize_below_step_is_zero():
+    assert _quantize(0.0004, 0.001, 3) == 0.0